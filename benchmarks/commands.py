@@ -0,0 +1,249 @@
+"""
+Times real commands end to end without Discord.
+Cogs are loaded into the actual bot against synthetic guilds
+(see benchmarks.offline), each command is invoked repeatedly
+and its timings and allocations can be saved as a baseline
+to compare a later commit against.
+
+    python -m benchmarks.commands
+    python -m benchmarks.commands about users -n 200 --save main
+    python -m benchmarks.commands --compare main
+"""
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import time
+import tracemalloc
+import traceback
+
+from discord.ext import commands
+
+from benchmarks import offline
+
+BASELINES = os.path.join(os.path.dirname(__file__), "baselines")
+DEFAULT_COMMANDS = [
+    "about",
+    "users",
+    "socket",
+    "avgping",
+    "uptime",
+    "lines",
+    "emotecount",
+    "topservers",
+    "guild",
+    "sss",
+    "bothealth",
+]
+METRICS = ("mean", "p50", "p95", "p99", "max", "peak_kib", "retained_kib")
+
+
+def percentile(ordered, fraction):
+    """Nearest rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(int(round(fraction * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def git_commit():
+    try:
+        output = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode().strip()
+
+
+class Harness:
+    """Invokes commands as the bot owner in the largest guild."""
+
+    def __init__(self, bot, *, mock=False):
+        self.bot = bot
+        self.mock = mock
+        self.author = offline.owner(bot)
+        self.channel = self.author.guild.text_channels[0]
+
+    async def context(self, command):
+        message = offline.make_message(
+            self.bot, self.channel, self.author, self.bot.constants.prefix + command
+        )
+        ctx = await self.bot.get_context(message)
+        if self.mock:
+            from cogs.manager import mock_context
+
+            ctx = mock_context(ctx)
+        return ctx
+
+    async def invoke(self, command):
+        """Seconds taken and the error raised, if any."""
+        ctx = await self.context(command)
+        if ctx.command is None:
+            raise LookupError(f"No command named {command!r}")
+        start = time.perf_counter()
+        try:
+            await ctx.command.invoke(ctx)
+        except commands.CommandError as e:
+            return time.perf_counter() - start, e
+        return time.perf_counter() - start, None
+
+    async def measure(self, command, number, warmup=3, allocations=10):
+        for _ in range(warmup):
+            await self.invoke(command)
+
+        timings = []
+        errors = []
+        for _ in range(number):
+            seconds, error = await self.invoke(command)
+            timings.append(seconds * 1000)
+            if error is not None:
+                errors.append(error)
+
+        # Allocations on separate runs, tracemalloc slows everything down
+        peaks = []
+        retained = []
+        for _ in range(allocations):
+            tracemalloc.start()
+            await self.invoke(command)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peaks.append(peak / 1024)
+            retained.append(current / 1024)
+
+        timings.sort()
+        error = None
+        if errors:
+            error = traceback.format_exception_only(type(errors[0]), errors[0])[-1].strip()
+        return {
+            "runs": number,
+            "errors": len(errors),
+            "error": error,
+            "mean": sum(timings) / len(timings),
+            "p50": percentile(timings, 0.50),
+            "p95": percentile(timings, 0.95),
+            "p99": percentile(timings, 0.99),
+            "max": timings[-1],
+            "peak_kib": sum(peaks) / len(peaks),
+            "retained_kib": sum(retained) / len(retained),
+        }
+
+
+def save(name, results, settings):
+    os.makedirs(BASELINES, exist_ok=True)
+    path = os.path.join(BASELINES, f"{name}.json")
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(
+            {
+                "commit": git_commit(),
+                "created": datetime.datetime.utcnow().isoformat(),
+                "settings": settings,
+                "results": results,
+            },
+            fp,
+            indent=2,
+        )
+    return path
+
+
+def load(name):
+    with open(os.path.join(BASELINES, f"{name}.json"), encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+def compare(baseline, results, threshold):
+    """
+    Rows of (command, metric, before, after, change) plus whether
+    any of mean, p95 or peak memory grew by more than threshold.
+    """
+    rows = []
+    regressed = False
+    for command, after in results.items():
+        before = baseline["results"].get(command)
+        if before is None:
+            continue
+        for metric in METRICS:
+            if not before[metric]:
+                continue
+            change = after[metric] / before[metric] - 1
+            flagged = metric in ("mean", "p95", "peak_kib") and change > threshold
+            regressed = regressed or flagged
+            rows.append((command, metric, before[metric], after[metric], change, flagged))
+    return rows, regressed
+
+
+def print_results(results):
+    width = max(len(c) for c in results)
+    print(
+        f"{'command':<{width}} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+        f"{'max':>8} {'peak':>9} {'kept':>9} errors"
+    )
+    for command, r in results.items():
+        print(
+            f"{command:<{width}} {r['mean']:>6.2f}ms {r['p50']:>6.2f}ms {r['p95']:>6.2f}ms "
+            f"{r['p99']:>6.2f}ms {r['max']:>6.2f}ms {r['peak_kib']:>6.0f}KiB "
+            f"{r['retained_kib']:>6.0f}KiB {r['errors']}"
+        )
+        if r["error"]:
+            print(f"{'':<{width}} {r['error']}")
+
+
+def print_comparison(baseline, rows):
+    print(f"\nagainst {baseline['commit'] or 'baseline'} from {baseline['created'][:16]}")
+    for command, metric, before, after, change, flagged in rows:
+        mark = "  REGRESSED" if flagged else ""
+        print(f"{command:<16} {metric:<13} {before:>9.2f} -> {after:>9.2f} {change:>+7.1%}{mark}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("commands", nargs="*", default=DEFAULT_COMMANDS)
+    parser.add_argument("-n", "--number", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--allocations", type=int, default=10)
+    parser.add_argument("--guilds", type=int, default=200)
+    parser.add_argument("--members", type=int, default=5000, help="size of the largest guild")
+    parser.add_argument("--delay", type=float, default=0.0, help="simulated REST round trip")
+    parser.add_argument("--mock", action="store_true", help="suppress http and db like elapse")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="NAME")
+    parser.add_argument("--compare", metavar="NAME")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    # Guild sizes fall off like a real bot's, a few big and a long tail
+    sizes = [max(args.members // (index + 1), 2) for index in range(args.guilds)]
+    settings = {k: getattr(args, k) for k in ("guilds", "members", "delay", "mock", "seed")}
+
+    import main as candybot
+
+    loop = candybot.bot.loop
+    bot, http = loop.run_until_complete(
+        offline.load_candybot(sizes, delay=args.delay, seed=args.seed)
+    )
+    harness = Harness(bot, mock=args.mock)
+
+    results = {}
+    for command in args.commands:
+        results[command] = loop.run_until_complete(
+            harness.measure(command, args.number, args.warmup, args.allocations)
+        )
+    print(f"{len(bot.guilds)} guilds, {len(bot.users):,} users, {args.number} runs each\n")
+    print_results(results)
+
+    status = 0
+    if args.compare:
+        baseline = load(args.compare)
+        if baseline["settings"] != settings:
+            print(f"\nwarning: baseline ran with {baseline['settings']}")
+        rows, regressed = compare(baseline, results, args.threshold)
+        print_comparison(baseline, rows)
+        status = int(regressed)
+    if args.save:
+        print(f"\nsaved {save(args.save, results, settings)}")
+    raise SystemExit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Overhead of the dispatch profiler on a handler, disabled and enabled.
+
+    python -m benchmarks.dispatch
+"""
+import asyncio
+import time
+
+import discord
+
+from utilities import profiler
+
+
+async def on_message(message):
+    pass
+
+
+async def failing(message):
+    raise ValueError(message)
+
+
+async def bench(client, number):
+    start = time.perf_counter()
+    for _ in range(number // 1000):
+        await asyncio.gather(
+            *(client._schedule_event(on_message, "message", None) for _ in range(1000))
+        )
+    return (time.perf_counter() - start) / number
+
+
+def main():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    client = discord.Client(loop=loop)
+    client.dispatch_profiler = profiler.DispatchProfiler(client)
+    number = 200_000
+
+    base = loop.run_until_complete(bench(client, number))
+    client.dispatch_profiler.enable()
+    client.dispatch_profiler.disable()
+    assert "_schedule_event" not in vars(client)
+    off = loop.run_until_complete(bench(client, number))
+    client.dispatch_profiler.enable()
+    on = loop.run_until_complete(bench(client, number))
+    print(f"discord.py {base * 1e9:.0f}ns, profiler off {off * 1e9:.0f}ns, on {on * 1e9:.0f}ns per event")
+
+    async def errors():
+        client.on_error = lambda *a, **k: asyncio.sleep(0)
+        await client._schedule_event(failing, "message", "boom")
+
+    loop.run_until_complete(errors())
+    (row,) = [r for r in client.dispatch_profiler.report() if r["handler"] == "failing"]
+    assert row["calls"] == 1 and row["errors"] == 1
+    (row,) = [r for r in client.dispatch_profiler.report() if r["handler"] == "on_message"]
+    assert row["calls"] == number
+    loop.run_until_complete(client.close())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Emoji name search and per-guild counts against a synthetic bot.
+
+    python -m benchmarks.emojis
+"""
+import random
+
+from benchmarks import synthetic
+from utilities import indexes
+
+
+def linear_find(bot, name):
+    # The filter SearchEmojiConverter used to run for every argument.
+    name = name.lower()
+    return [e for e in bot.emojis if e.name.lower() == name]
+
+
+def linear_count(bot):
+    # The loop emotecount used to run.
+    return {g.id: len([e for e in g.emojis]) for g in bot.guilds}
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'emojis':>8} | {'find scan':>10} | {'find index':>10} | {'count scan':>10} | {'count index':>11}")
+    for guilds in (100, 1_000, 10_000):
+        bot = synthetic.add_emojis(synthetic.make_bot([1] * guilds, user_pool=100), 50)
+        index = indexes.EmojiIndex(bot)
+        index.build()
+        targets = [e.name for e in rng.sample(bot.emojis, 50)]
+
+        for name in targets:
+            assert index.find(name) == linear_find(bot, name)
+        assert {g.id: sum(index.count(g)) for g in bot.guilds} == linear_count(bot)
+
+        find_scan = synthetic.timeit(
+            lambda: [linear_find(bot, t) for t in targets], number=1
+        ) / len(targets)
+        find_fast = synthetic.timeit(
+            lambda: [index.find(t) for t in targets], number=100
+        ) / len(targets)
+        count_scan = synthetic.timeit(lambda: linear_count(bot), number=3)
+        count_fast = synthetic.timeit(
+            lambda: [index.count(g) for g in bot.guilds], number=3
+        )
+        print(
+            f"{guilds * 50:>8,} | {find_scan * 1e3:>8.2f}ms | {find_fast * 1e6:>8.2f}us"
+            f" | {count_scan * 1e3:>8.2f}ms | {count_fast * 1e3:>9.2f}ms"
+        )
+
+        # Emoji updates re-key the guild and keep the totals right
+        guild = bot.guilds[0]
+        static, animated = index.total()
+        removed = guild.emojis.pop()
+        index.emojis_update(guild, guild.emojis)
+        assert sum(index.total()) == static + animated - 1
+        assert index.find(removed.name) == [
+            e for e in linear_find(bot, removed.name) if e is not removed
+        ]
+
+
+if __name__ == "__main__":
+    main()
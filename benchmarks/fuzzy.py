@@ -0,0 +1,59 @@
+"""
+Fuzzy name search, difflib over every name against a kept trigram
+index, with the one-off cost of building that index.
+
+    python -m benchmarks.fuzzy
+"""
+import difflib
+import random
+
+from benchmarks import synthetic
+from utilities import fuzzy, utils
+
+
+def difflib_search(term, names, limit=3):
+    # The full pass utils.disambiguate used to run.
+    findings = [
+        {"result": name, "ratio": difflib.SequenceMatcher(None, term.lower(), name.lower()).ratio()}
+        for name in names
+    ]
+    findings.sort(key=lambda x: x["ratio"], reverse=True)
+    return findings[:limit]
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'names':>8} | {'difflib':>10} | {'build':>10} | {'index':>10}")
+    for size in (1_000, 10_000, 50_000):
+        names = [synthetic.random_name(rng) for _ in range(size)]
+        terms = rng.sample(names, 10)
+        terms += [name[: max(3, len(name) // 2)] for name in rng.sample(names, 10)]
+
+        build = synthetic.timeit(
+            lambda: fuzzy.FuzzyIndex((name, name, None) for name in set(names)), number=1
+        )
+        index = fuzzy.FuzzyIndex((name, name, None) for name in set(names))
+
+        slow = synthetic.timeit(
+            lambda: [difflib_search(t, names) for t in terms], number=1
+        ) / len(terms)
+        fast = synthetic.timeit(
+            lambda: [utils.disambiguate(t, index) for t in terms], number=20
+        ) / len(terms)
+
+        # within narrows the search to a subset, as helpers.choose does
+        subset = set(rng.sample(names, 5)) | {terms[0]}
+        found = utils.disambiguate(terms[0], index, 10, within=subset)
+        assert found[0]["ratio"] == 1 and {m["result"] for m in found} == subset
+
+        for term in terms[:10]:
+            assert index.search(term)[0]["ratio"] == 1
+            assert difflib_search(term, names)[0]["ratio"] == 1
+
+        print(
+            f"{size:>8,} | {slow * 1e3:>8.2f}ms | {build * 1e3:>8.1f}ms | {fast * 1e3:>8.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Guild name lookups against a synthetic bot in tens of thousands of guilds.
+
+    python -m benchmarks.guilds
+"""
+import random
+
+from benchmarks import synthetic
+from utilities import indexes
+
+
+def linear_search(bot, argument):
+    # The scan BotServer used to run for every argument.
+    return [s for s in bot.guilds if argument.lower() in s.name.lower()]
+
+
+def linear_find(bot, name):
+    name = name.lower()
+    return [g for g in bot.guilds if g.name.lower() == name]
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'guilds':>8} | {'lookup':>9} | {'scan':>10} | {'index':>10}")
+    for count in (1_000, 10_000, 50_000):
+        bot = synthetic.make_bot([1] * count, user_pool=100)
+        index = indexes.GuildIndex(bot)
+        build = synthetic.timeit(index.build, number=1)
+        targets = [g.name for g in rng.sample(bot.guilds, 50)]
+        partial = [name[1:-1] for name in targets]
+
+        for name, part in zip(targets, partial):
+            assert index.find(name) == linear_find(bot, name)
+            assert index.search(part) == linear_search(bot, part)
+
+        for label, scan, fast, terms in (
+            ("exact", linear_find, index.find, targets),
+            ("substring", linear_search, index.search, partial),
+        ):
+            slow = synthetic.timeit(
+                lambda: [scan(bot, t) for t in terms], number=3
+            ) / len(terms)
+            quick = synthetic.timeit(
+                lambda: [fast(t) for t in terms], number=100
+            ) / len(terms)
+            print(
+                f"{count:>8,} | {label:>9} | {slow * 1e6:>8.1f}us | {quick * 1e6:>8.2f}us"
+            )
+
+        closest = synthetic.timeit(
+            lambda: [index.closest(t) for t in partial], number=5
+        ) / len(partial)
+        print(
+            f"{'':>8} | build {build * 1e3:.1f}ms, fuzzy {closest * 1e3:.2f}ms"
+        )
+
+        # Renames and removals keep the index consistent
+        guild = rng.choice(bot.guilds)
+        guild.name = "renamed guild"
+        index.add(guild)
+        assert index.find("Renamed Guild") == [guild]
+        assert guild in index.search("renamed")
+        del bot._guilds[guild.id]
+        index.remove(guild)
+        assert index.find("renamed guild") == []
+
+
+if __name__ == "__main__":
+    main()
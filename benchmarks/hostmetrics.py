@@ -0,0 +1,35 @@
+"""
+Cost of psutil calls on the event loop against reading the sampler.
+
+    python -m benchmarks.hostmetrics
+"""
+import time
+
+import psutil
+
+from benchmarks import synthetic
+from utilities import hostmetrics
+
+
+def main():
+    process = psutil.Process()
+    full = synthetic.timeit(process.memory_full_info, number=50)
+    virtual = synthetic.timeit(psutil.virtual_memory, number=50)
+    sampler = hostmetrics.HostSampler(interval=0.05, history=100)
+    sample = synthetic.timeit(sampler.sample, number=50)
+    latest = synthetic.timeit(sampler.latest, number=100_000)
+    print(f"memory_full_info: {full * 1e3:.2f}ms, virtual_memory: {virtual * 1e3:.2f}ms")
+    print(f"full sample on the thread: {sample * 1e3:.2f}ms")
+    print(f"latest() on the loop: {latest * 1e9:.0f}ns")
+    print("(hostinfo also used to block for 1s in cpu_percent(interval=1))")
+
+    sampler.start()
+    time.sleep(1)
+    sampler.stop()
+    sampler.join()
+    assert len(sampler.samples) > 10
+    print(f"\ncpu trend: {hostmetrics.sparkline(sampler.trend('cpu', points=20))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Latency recording and percentiles, datetime deque against streaming histograms.
+
+    python -m benchmarks.latency
+"""
+import collections
+import datetime
+import random
+import statistics
+
+from benchmarks import synthetic
+from utilities import latency
+
+
+def exact(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def main():
+    rng = random.Random(1)
+    # Lognormal around 80ms with a long tail, like message receive lag
+    samples = [rng.lognormvariate(4.4, 0.6) for _ in range(200_000)]
+
+    deque = collections.deque(maxlen=500)
+    stream = iter(samples)
+
+    def record_deque():
+        now = datetime.datetime.utcnow()
+        deque.append((now, datetime.timedelta(milliseconds=next(stream))))
+
+    old_record = synthetic.timeit(record_deque, number=100_000)
+    old_mean = synthetic.timeit(
+        lambda: statistics.mean(lat.total_seconds() for ts, lat in deque), number=100
+    )
+
+    tracker = latency.LatencyTracker()
+    stream = iter(samples)
+    new_record = synthetic.timeit(
+        lambda: tracker.record("message", next(stream) / 1000), number=200_000
+    )
+    new_summary = synthetic.timeit(lambda: tracker.summary("message", "1h"), number=100)
+
+    print(f"record: deque {old_record * 1e6:.2f}us, histogram {new_record * 1e6:.2f}us")
+    print(f"query:  mean of 500 {old_mean * 1e6:.1f}us, p50/p95/p99 over 1h {new_summary * 1e6:.1f}us")
+
+    summary = tracker.summary("message", "1h")
+    print(f"\n{'':>4} | {'exact':>9} | {'histogram':>9} | {'error':>6}")
+    for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+        truth = exact(samples, q)
+        error = abs(summary[name] - truth) / truth
+        assert error < latency.PRECISION, (name, truth, summary[name])
+        print(f"{name:>4} | {truth:>7.2f}ms | {summary[name]:>7.2f}ms | {error:>5.2%}")
+
+    # Windows only see their own slots
+    rolling = latency.RollingHistogram()
+    for second in range(3600):
+        rolling.record(second % 100 + 1, now=second)
+    assert rolling.window(60, now=3599).count == 60
+    assert rolling.window(3600, now=3599).count == 3600
+    assert rolling.window(3600, now=3599 + 1800).count == 1800
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Concurrent command load against the offline bot, for capacity
+planning. Messages from random members of random guilds go
+through process_commands at a target rate, see utilities.loadgen.
+
+    python -m benchmarks.load --rate 200 --concurrency 50 --duration 30
+    python -m benchmarks.load --mock --delay 0.05 about users
+"""
+import argparse
+import random
+
+from benchmarks import offline
+from utilities import loadgen
+
+DEFAULT_COMMANDS = ["about", "users", "uptime", "avgping", "socket", "ping"]
+
+
+def message_factory(bot, commands, *, owners=0.0, seed=0):
+    """
+    make_message for LoadGenerator. Authors are random members
+    of random guilds, a fraction owners so owner commands run.
+    """
+    rng = random.Random(seed)
+    guilds = [g for g in bot.guilds if g.text_channels]
+    weights = [g.member_count for g in guilds]  # Busy guilds send more
+    owner = offline.owner(bot)
+    prefix = bot.constants.prefix
+
+    def make_message():
+        if rng.random() < owners:
+            author = owner
+            channel = owner.guild.text_channels[0]
+        else:
+            guild = rng.choices(guilds, weights)[0]
+            author = rng.choice(guild.members)
+            while author.bot:
+                author = rng.choice(guild.members)
+            channel = rng.choice(guild.text_channels)
+        return offline.make_message(bot, channel, author, prefix + rng.choice(commands))
+
+    return make_message
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("commands", nargs="*", default=DEFAULT_COMMANDS)
+    parser.add_argument("--rate", type=float, default=50.0)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--guilds", type=int, default=500)
+    parser.add_argument("--members", type=int, default=5000, help="size of the largest guild")
+    parser.add_argument("--owners", type=float, default=0.0, help="fraction sent by the owner")
+    parser.add_argument("--delay", type=float, default=0.0, help="simulated REST round trip")
+    parser.add_argument("--mock", action="store_true", help="suppress http and db like elapse")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import main as candybot
+
+    loop = candybot.bot.loop
+    sizes = [max(args.members // (index + 1), 2) for index in range(args.guilds)]
+    bot, http = loop.run_until_complete(
+        offline.load_candybot(sizes, delay=args.delay, seed=args.seed)
+    )
+
+    handler = None
+    if args.mock:
+        from cogs.manager import mock_context
+
+        async def handler(message):
+            if message.author.bot:
+                return
+            await bot.invoke(mock_context(await bot.get_context(message)))
+
+    generator = loadgen.LoadGenerator(
+        bot,
+        message_factory(bot, args.commands, owners=args.owners, seed=args.seed),
+        rate=args.rate,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        handler=handler,
+    )
+    report = loop.run_until_complete(generator.run())
+
+    print(f"{len(bot.guilds)} guilds, {len(bot.users):,} users, commands {', '.join(args.commands)}")
+    print("\n".join(loadgen.format_report(report)))
+    print(f"REST calls {sum(http.calls.values()):,}")
+    for (method, path), calls in http.calls.most_common(5):
+        print(f"  {calls:>7,} {method} {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Viewing a full rotated log, cat through the sh command against
+the block reader that only reads the page shown.
+
+    python -m benchmarks.logview
+"""
+import datetime
+import os
+import random
+import re
+import shutil
+import subprocess
+import tempfile
+
+from discord.ext.commands import Paginator
+
+from benchmarks import synthetic
+from utilities import logview
+
+
+def write_logs(root, backups=5, size=32 * 1024 ** 2):
+    # Same layout and record format as the rotating handlers in main.py
+    path = os.path.join(root, "info.log")
+    when = datetime.datetime(2021, 5, 1)
+    names = [f"{path}.{n}" for n in range(backups, 0, -1)] + [path]
+    for name in names:
+        with open(name, "w", encoding="utf-8") as f:
+            written = 0
+            while written < size:
+                when += datetime.timedelta(seconds=random.randint(0, 3))
+                line = f"{when:%Y-%m-%d %H:%M:%S}: [INFO] INFO_LOGGER || event {random.getrandbits(64):x}\n"
+                if random.random() < 0.01:
+                    line += "Traceback (most recent call last):\n  File \"x.py\", line 1\nValueError: nope\n"
+                written += f.write(line)
+    return path, when
+
+
+def cat(path):
+    # What the logger commands used to do
+    names = logview.rotated(path) + [path]
+    process = subprocess.run(["cat"] + names, stdout=subprocess.PIPE)
+    text = process.stdout.decode()
+    pages = Paginator(prefix="```prolog", max_size=1800)  # As TextPageSource
+    for line in text.split("\n"):
+        pages.add_line(line)
+    return pages.pages
+
+
+def main():
+    root = tempfile.mkdtemp()
+    try:
+        path, last = write_logs(root, size=8 * 1024 ** 2)
+        total = sum(os.path.getsize(p) for p in logview.rotated(path) + [path])
+
+        full = synthetic.timeit(lambda: cat(path), number=1)
+        first = synthetic.timeit(lambda: logview.LogPages(logview.LogFile(path)).page(0), number=20)
+
+        pages = logview.LogPages(logview.LogFile(path))
+        pages.page(0)
+        deep = synthetic.timeit(lambda: pages.page(len(pages.bounds) + 50), number=20) / 50
+
+        until = last - datetime.timedelta(hours=30)
+        seek = synthetic.timeit(lambda: logview.LogPages(logview.LogFile(path), until=until).page(0), number=20)
+
+        pattern = re.compile("Traceback")
+        grep = synthetic.timeit(lambda: logview.LogPages(logview.LogFile(path), pattern=pattern).page(0), number=5)
+
+        # Newest page matches the tail of the concatenated files
+        with open(path, encoding="utf-8") as f:
+            tail = f.read().splitlines()
+        lines = logview.LogPages(logview.LogFile(path)).page(0)
+        assert lines == tail[-len(lines):]
+
+        # Seeking lands on the first record at or after the time
+        log = logview.LogFile(path)
+        pos = log.seek(until)
+        stamp = log.stamp(pos, log.line_end(pos)).decode()
+        assert stamp >= f"{until:%Y-%m-%d %H:%M:%S}"
+        before = log.line_start(pos)
+        while log.stamp(before, log.line_end(before)) is None:
+            before = log.line_start(before)
+        assert log.stamp(before, log.line_end(before)).decode() < stamp
+
+        # Every filtered line matches
+        for line in logview.LogPages(log, pattern=pattern).page(3):
+            assert pattern.search(line)
+
+        log.close()
+
+        # Truncating the live log while it is open, as pm2 flush does,
+        # leaves lines missing instead of crashing the reader
+        log = logview.LogFile(path)
+        os.truncate(path, log.segments[-1].size // 2)
+        pages = logview.LogPages(log)
+        assert pages.page(0) is not None and pages.page(40) is not None
+        assert log.seek(last) <= log.size
+        log.close()
+
+        print(f"{total / 1024 ** 2:.0f} MiB over 6 files")
+        print(
+            f"cat {full * 1e3:.0f}ms, first page {first * 1e3:.2f}ms, "
+            f"each older page {deep * 1e3:.3f}ms, seek + page {seek * 1e3:.2f}ms, "
+            f"grep page {grep * 1e3:.2f}ms"
+        )
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
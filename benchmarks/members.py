@@ -0,0 +1,65 @@
+"""
+Member and user name lookups against synthetic guilds.
+
+    python -m benchmarks.members
+"""
+import random
+
+from benchmarks import synthetic
+from utilities import indexes
+
+
+def linear_find(guild, name):
+    # The scan the converters used to run for every argument.
+    name = name.lower()
+    return [
+        m
+        for m in guild.members
+        if (m.nick and m.nick.lower() == name) or m.name.lower() == name
+    ]
+
+
+def linear_find_user(bot, name, discriminator):
+    for user in bot.users:
+        if user.name == name and user.discriminator == discriminator:
+            return user
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'members':>8} | {'scan':>10} | {'index':>10} | {'build':>10}")
+    for size in (1_000, 10_000, 100_000):
+        bot = synthetic.make_bot([size])
+        guild = bot.guilds[0]
+        targets = rng.sample(guild.members, 50)
+
+        index = indexes.MemberIndex(bot)
+        build = synthetic.timeit(lambda: indexes.GuildMemberIndex(guild), number=1)
+        index.get(guild)
+
+        scan = synthetic.timeit(
+            lambda: [linear_find(guild, m.name) for m in targets], number=3
+        ) / len(targets)
+        fast = synthetic.timeit(
+            lambda: [index.find(guild, m.name) for m in targets], number=100
+        ) / len(targets)
+        for member in targets:
+            assert index.find(guild, member.name) == linear_find(guild, member.name)
+
+        print(
+            f"{size:>8,} | {scan * 1e6:>8.1f}us | {fast * 1e6:>8.2f}us | {build * 1e3:>8.1f}ms"
+        )
+
+    user = rng.choice(bot.users)
+    scan = synthetic.timeit(
+        lambda: linear_find_user(bot, user.name, user.discriminator), number=10
+    )
+    index.find_user(user.name, user.discriminator)
+    fast = synthetic.timeit(
+        lambda: index.find_user(user.name, user.discriminator), number=1000
+    )
+    print(f"\nuser tag lookup: scan {scan * 1e6:.1f}us, index {fast * 1e6:.2f}us")
+
+
+if __name__ == "__main__":
+    main()
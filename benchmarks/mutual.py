@@ -0,0 +1,65 @@
+"""
+Mutual guild lookups and the memory overhead of the reverse index.
+
+    python -m benchmarks.mutual
+"""
+import random
+
+from benchmarks import synthetic
+from utilities import indexes
+
+
+def linear_shared(bot, user_id):
+    # The nested loop sss used to run.
+    shared = []
+    for guild in bot.guilds:
+        for member in guild.members:
+            if member.id == user_id:
+                shared.append(guild.id)
+    return shared
+
+
+def main():
+    rng = random.Random(1)
+    print(
+        f"{'guilds':>7} | {'members':>9} | {'scan':>10} | {'index':>9} | {'build':>9} | {'overhead':>9}"
+    )
+    for guilds, pool in ((100, 20_000), (1_000, 50_000), (5_000, 100_000)):
+        sizes = [rng.choice((50, 200, 1_000, 5_000)) for _ in range(guilds)]
+        bot = synthetic.make_bot(sizes, user_pool=pool)
+        index = indexes.MutualGuildIndex(bot)
+        build = synthetic.timeit(index.build, number=1)
+        targets = [u.id for u in rng.sample(bot.users, 20)]
+
+        for user_id in targets:
+            assert sorted(g.id for g in index.guilds(user_id)) == sorted(
+                linear_shared(bot, user_id)
+            )
+
+        scan = synthetic.timeit(
+            lambda: [linear_shared(bot, u) for u in targets[:3]], number=1
+        ) / 3
+        fast = synthetic.timeit(
+            lambda: [index.guilds(u) for u in targets], number=100
+        ) / len(targets)
+        usage = index.memory_usage()
+        print(
+            f"{guilds:>7,} | {sum(sizes):>9,} | {scan * 1e3:>8.1f}ms | {fast * 1e6:>7.2f}us"
+            f" | {build * 1e3:>7.0f}ms | {usage['bytes'] / 1024 ** 2:>6.2f}MiB"
+        )
+        print(
+            f"{'':>7} | {usage['users']:,} users, {usage['links']:,} links,"
+            f" {usage['bytes'] / usage['links']:.0f} bytes per link"
+        )
+
+        # A member leaving drops only that guild
+        guild = bot.guilds[0]
+        member = guild.members[0]
+        before = len(index.guilds(member.id))
+        del guild._members[member.id]
+        index.member_remove(member)
+        assert len(index.guilds(member.id)) == before - 1
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Runs the real bot without a gateway connection.
+Guilds, members and channels are fed into discord.py's own cache
+from gateway shaped payloads, REST calls are answered locally and
+the database is whatever pool the bot was configured with, so
+point config.json's postgres at a local scratch database.
+"""
+import asyncio
+import collections
+import datetime
+import itertools
+import random
+
+import discord
+
+from benchmarks import synthetic
+
+EXCLUDE_COGS = {"music"}  # Connects to a lavalink node on load
+EPOCH = datetime.datetime(2021, 1, 1)
+
+_snowflakes = itertools.count(discord.utils.time_snowflake(EPOCH))
+
+
+def snowflake():
+    return next(_snowflakes)
+
+
+def user_payload(user):
+    return {
+        "id": str(user.id),
+        "username": user.name,
+        "discriminator": user.discriminator,
+        "avatar": None,
+        "bot": user.bot,
+    }
+
+
+def guild_payload(guild, me, rng, *, channels=10):
+    """Gateway GUILD_CREATE payload for a synthetic.FakeGuild."""
+    everyone = {
+        "id": str(guild.id),
+        "name": "@everyone",
+        "permissions_new": str(discord.Permissions.general().value),
+        "position": 0,
+        "color": 0,
+    }
+    admin = {
+        "id": str(snowflake()),
+        "name": "Admin",
+        "permissions_new": str(discord.Permissions.all().value),
+        "position": 1,
+        "color": 0,
+    }
+    members = []
+    presences = []
+    for member in itertools.chain(guild.members, [me]):
+        joined = EPOCH + datetime.timedelta(minutes=rng.randint(0, 500000))
+        members.append(
+            {
+                "user": user_payload(member),
+                "nick": getattr(member, "nick", None),
+                "roles": [admin["id"]] if member is me else [],
+                "joined_at": joined.isoformat(),
+                "deaf": False,
+                "mute": False,
+            }
+        )
+        status = getattr(member, "status", discord.Status.online)
+        presences.append(
+            {
+                "user": {"id": str(member.id)},
+                "status": str(status),
+                "activities": [],
+                "client_status": {},
+            }
+        )
+    return {
+        "id": str(guild.id),
+        "name": guild.name,
+        "owner_id": str(guild.members[0].id) if guild.members else str(me.id),
+        "region": "us-east",
+        "member_count": len(members),
+        "large": len(members) >= 250,
+        "features": [],
+        "roles": [everyone, admin],
+        "emojis": [
+            {
+                "id": str(e.id),
+                "name": e.name,
+                "animated": e.animated,
+                "roles": [],
+                "require_colons": True,
+                "managed": False,
+                "available": True,
+            }
+            for e in guild.emojis
+        ],
+        "channels": [
+            {
+                "id": str(snowflake()),
+                "type": 0 if index < channels - 2 else 2,
+                "name": f"channel-{index}",
+                "position": index,
+                "permission_overwrites": [],
+            }
+            for index in range(channels)
+        ],
+        "members": members,
+        "presences": presences,
+        "voice_states": [],
+    }
+
+
+class LocalHTTP:
+    """
+    Answers HTTPClient.request without the network. Message
+    creates echo back a message payload, everything else gets
+    an empty object. An optional delay stands in for the REST
+    round trip.
+    """
+
+    def __init__(self, bot, delay=0.0):
+        self.bot = bot
+        self.delay = delay
+        self.calls = collections.Counter()  # (method, path) -> requests
+
+    async def request(self, route, *, files=None, form=None, **kwargs):
+        self.calls[(route.method, route.path)] += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if route.method == "POST" and route.path == "/channels/{channel_id}/messages":
+            payload = kwargs.get("json") or {}
+            return {
+                "id": str(snowflake()),
+                "channel_id": str(route.channel_id),
+                "author": user_payload(self.bot.user),
+                "content": payload.get("content") or "",
+                "timestamp": datetime.datetime.utcnow().isoformat(),
+                "edited_timestamp": None,
+                "tts": False,
+                "mention_everyone": False,
+                "mentions": [],
+                "mention_roles": [],
+                "attachments": [],
+                "embeds": [payload["embed"]] if payload.get("embed") else [],
+                "pinned": False,
+                "type": 0,
+            }
+        return {}
+
+
+def populate(bot, guild_sizes, *, emojis=10, seed=0):
+    """
+    Logs bot in as a synthetic user and fills its connection
+    state with one guild per entry in guild_sizes.
+    """
+    rng = random.Random(seed)
+    fake = synthetic.add_emojis(synthetic.make_bot(guild_sizes, seed=seed), emojis, seed=seed)
+    me = synthetic.FakeUser(snowflake(), "Candybot", "0001", bot=True)
+
+    state = bot._connection
+    state.user = discord.ClientUser(state=state, data=user_payload(me))
+    for guild in fake.guilds:
+        state._add_guild_from_data(guild_payload(guild, me, rng))
+    return fake
+
+
+def install_http(bot, delay=0.0):
+    http = LocalHTTP(bot, delay)
+    bot.http.request = http.request
+    if hasattr(bot, "latencies"):
+        bot.latencies.install(bot.http)  # Keep timing REST calls
+    return http
+
+
+def make_message(bot, channel, author, content):
+    """A discord.Message as it would arrive from the gateway."""
+    data = {
+        "id": str(snowflake()),
+        "channel_id": str(channel.id),
+        "guild_id": str(channel.guild.id),
+        "author": user_payload(author),
+        "content": content,
+        "timestamp": datetime.datetime.utcnow().isoformat(),
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    }
+    return discord.Message(state=bot._connection, channel=channel, data=data)
+
+
+async def load_candybot(guild_sizes, *, emojis=10, delay=0.0, seed=0, exclude=EXCLUDE_COGS):
+    """
+    The real Candybot with its cogs loaded against synthetic
+    guilds. Needs config.json and the Postgres it points at.
+    """
+    import main
+    from settings import database
+
+    bot = main.bot
+    populate(bot, guild_sizes, emojis=emojis, seed=seed)
+    http = install_http(bot, delay)
+    await database.initialize(bot)
+    for cog in main.COGS:
+        if cog not in exclude:
+            bot.load_extension(f"cogs.{cog}")
+    bot.ready = True
+    return bot, http
+
+
+def owner(bot):
+    """The owner's Member in the largest guild, so every check passes."""
+    guild = max(bot.guilds, key=lambda g: g.member_count)
+    member = guild.get_member(bot.owner_ids[0])
+    if member is None:
+        # Owners are not in the synthetic pool, add one with the admin role
+        admin = guild.roles[-1]
+        user = synthetic.FakeUser(bot.owner_ids[0], "Owner", "0001")
+        data = {
+            "user": user_payload(user),
+            "roles": [str(admin.id)],
+            "joined_at": EPOCH.isoformat(),
+            "deaf": False,
+            "mute": False,
+        }
+        member = discord.Member(data=data, guild=guild, state=bot._connection)
+        guild._add_member(member)
+    return member
@@ -0,0 +1,101 @@
+"""
+Showing the first page of a large text, splitting everything up
+front as TextPageSource did against the lazy textpages.TextPages.
+
+    python -m benchmarks.pages
+"""
+import asyncio
+import io
+import random
+import time
+import tracemalloc
+
+from discord.ext.commands import Paginator
+
+from utilities import pagination
+from utilities import textpages
+
+
+def make_text(lines=400000):
+    random.seed(0)
+    words = ["event", "guild", "member", "None", "True", "0x7f3a", "=", "->", "{}"]
+    return "\n".join(
+        " ".join(random.choice(words) for _ in range(random.randint(1, 20)))
+        for _ in range(lines)
+    )
+
+
+def eager(text):
+    # What TextPageSource did before showing anything
+    pages = Paginator(prefix="```prolog", max_size=1800)
+    for line in text.split("\n"):
+        pages.add_line(line)
+    return pages.pages
+
+
+async def lazy(source, number=0):
+    pages = textpages.TextPages(source, prefix="```prolog", max_size=1800)
+    return await pages.page(number), pages
+
+
+async def chunks(text, size=4096):
+    for index in range(0, len(text), size):
+        yield text[index : index + size]
+
+
+def measure(func):
+    """Seconds and peak KiB allocated by one call of func."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    text = make_text()
+    data = text.encode()
+
+    full, full_time, full_peak = measure(lambda: eager(text))
+    (first, pages), first_time, first_peak = measure(lambda: loop.run_until_complete(lazy(text)))
+    assert first == full[0] and pages.pages is None
+
+    (_, stream), stream_time, stream_peak = measure(
+        lambda: loop.run_until_complete(lazy(chunks(text)))
+    )
+    (_, binary), file_time, file_peak = measure(
+        lambda: loop.run_until_complete(lazy(io.BytesIO(data)))
+    )
+    assert len(stream.text) < len(text) and len(binary.text) < len(text)
+
+    # Every page matches the eager split, and the count resolves at the end
+    for source in (text, io.BytesIO(data), chunks(text)):
+        pages = textpages.TextPages(source, prefix="```prolog", max_size=1800)
+        for number in (0, 10, len(full) // 2, len(full) - 1, 3):
+            assert loop.run_until_complete(pages.page(number)) == full[number]
+        assert loop.run_until_complete(pages.page(len(full))) is None
+        assert pages.pages == len(full)
+
+    # The menu source opens and closes over both kinds of source
+    for source in (text, io.BytesIO(data)):
+        menu_source = pagination.TextPageSource(source, prefix="```prolog")
+        loop.run_until_complete(menu_source.prepare())
+        loop.run_until_complete(menu_source.close())
+        assert not menu_source.lock.locked()
+
+    pages = textpages.TextPages(text, prefix="```prolog", max_size=1800)
+    loop.run_until_complete(pages.page(20))
+    estimate = pages.estimate
+
+    print(f"{len(text) / 1024 ** 2:.1f}MiB text, {len(full):,} pages, estimate after 20 pages {estimate:,}")
+    print(f"split everything   {full_time * 1e3:8.1f}ms {full_peak:10,.0f}KiB peak")
+    print(f"lazy first page    {first_time * 1e3:8.2f}ms {first_peak:10,.0f}KiB peak")
+    print(f"  from a stream    {stream_time * 1e3:8.2f}ms {stream_peak:10,.0f}KiB peak")
+    print(f"  from a file      {file_time * 1e3:8.2f}ms {file_peak:10,.0f}KiB peak")
+
+
+if __name__ == "__main__":
+    main()
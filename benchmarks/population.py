@@ -0,0 +1,107 @@
+"""
+Population counters, full member scans against the maintained snapshot.
+
+    python -m benchmarks.population
+"""
+import copy
+import random
+
+import discord
+
+from benchmarks import synthetic
+from utilities import population
+
+
+def linear_users(bot):
+    # The lists the users command used to build.
+    users = [x for x in bot.get_all_members() if not x.bot]
+    users_online = [x for x in users if x.status != discord.Status.offline]
+    unique_users = set([x.id for x in users])
+    bots = [x for x in bot.get_all_members() if x.bot]
+    bots_online = [x for x in bots if x.status != discord.Status.offline]
+    unique_bots = set([x.id for x in bots])
+    return {
+        "humans": len(users),
+        "humans_online": len(users_online),
+        "unique_humans": len(unique_users),
+        "bots": len(bots),
+        "bots_online": len(bots_online),
+        "unique_bots": len(unique_bots),
+    }
+
+
+def linear_guild_online(guild):
+    # The loop the guild command used to run.
+    online_members = 0
+    bot_member = 0
+    bot_online = 0
+    for member in guild.members:
+        if member.bot:
+            bot_member += 1
+            if not member.status == discord.Status.offline:
+                bot_online += 1
+            continue
+        if not member.status == discord.Status.offline:
+            online_members += 1
+    return online_members, bot_member, bot_online
+
+
+def counted_guild_online(stats, guild):
+    statuses = stats.status_counts(guild)
+    online_members = sum(statuses["humans"].values())
+    online_members -= statuses["humans"][discord.Status.offline]
+    bot_member = sum(statuses["bots"].values())
+    bot_online = bot_member - statuses["bots"][discord.Status.offline]
+    return online_members, bot_member, bot_online
+
+
+def main():
+    rng = random.Random(1)
+    print(
+        f"{'members':>9} | {'scan':>10} | {'snapshot':>9} | {'build':>9}"
+        f" | {'event':>8} | {'guild scan':>10} | {'guild count':>11}"
+    )
+    for guilds, pool in ((100, 20_000), (1_000, 50_000), (2_000, 100_000)):
+        sizes = [rng.choice((50, 200, 1_000, 2_000)) for _ in range(guilds)]
+        bot = synthetic.make_bot(sizes, user_pool=pool)
+        stats = population.PopulationStats(bot)
+        build = synthetic.timeit(stats.build, number=1)
+
+        expected = linear_users(bot)
+        snapshot = stats.snapshot()
+        assert {k: snapshot[k] for k in expected} == expected
+
+        scan = synthetic.timeit(lambda: linear_users(bot), number=1)
+        fast = synthetic.timeit(stats.snapshot, number=10_000)
+
+        # Presence churn plus joins and leaves, then check nothing drifted
+        members = rng.sample(list(bot.get_all_members()), 2_000)
+
+        def churn():
+            member = rng.choice(members)
+            before = copy.copy(member)
+            member.status = rng.choice(list(discord.Status)[:4])
+            stats.member_update(before, member)
+
+        event = synthetic.timeit(churn, number=10_000)
+        for member in members[:500]:
+            del member.guild._members[member.id]
+            stats.member_remove(member)
+        for guild in {m.guild for m in members}:
+            assert counted_guild_online(stats, guild) == linear_guild_online(guild)
+        assert stats.verify() == {}
+
+        largest = max(bot.guilds, key=lambda g: g.member_count)
+        guild_scan = synthetic.timeit(lambda: linear_guild_online(largest), number=20)
+        guild_count = synthetic.timeit(
+            lambda: counted_guild_online(stats, largest), number=10_000
+        )
+        print(
+            f"{sum(sizes):>9,} | {scan * 1e3:>8.1f}ms | {fast * 1e6:>7.2f}us"
+            f" | {build * 1e3:>7.0f}ms | {event * 1e6:>6.2f}us"
+            f" | {guild_scan * 1e6:>8.1f}us | {guild_count * 1e6:>9.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
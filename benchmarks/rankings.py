@@ -0,0 +1,82 @@
+"""
+Server list rankings, sort per invocation against the maintained rankings.
+
+    python -m benchmarks.rankings
+"""
+import datetime
+import random
+import types
+
+from benchmarks import synthetic
+from utilities import indexes
+
+
+def field(rank, guild, count):
+    return ("{}. {}".format(rank, guild.name), "{:,} members".format(count))
+
+
+def linear_top(bot, per_page=15):
+    # What topservers used to do before showing the first page.
+    our_list = sorted(
+        ({"name": g.name, "users": len(g.members)} for g in bot.guilds),
+        key=lambda x: x["users"],
+        reverse=True,
+    )
+    entries = [
+        ("{}. {}".format(y + 1, x["name"]), "{:,} members".format(x["users"]))
+        for y, x in enumerate(our_list)
+    ]
+    return entries[:per_page]
+
+
+def main():
+    rng = random.Random(1)
+    epoch = datetime.datetime(2016, 1, 1)
+    print(f"{'guilds':>8} | {'sort':>10} | {'ranking':>10} | {'build':>9} | {'join':>8}")
+    for count in (1_000, 10_000, 50_000):
+        sizes = [rng.randint(1, 60) for _ in range(count)]
+        bot = synthetic.make_bot(sizes, user_pool=200)
+        for guild in bot.guilds:
+            joined = epoch + datetime.timedelta(minutes=rng.randint(0, 10 ** 6))
+            guild.me = types.SimpleNamespace(joined_at=joined)
+
+        rankings = indexes.GuildRankings(bot)
+        build = synthetic.timeit(rankings.build, number=1)
+        assert [e[1] for e in rankings.by_members(field, reverse=True)[:15]] == [
+            e[1] for e in linear_top(bot)
+        ]
+
+        slow = synthetic.timeit(lambda: linear_top(bot), number=3)
+        fast = synthetic.timeit(
+            lambda: rankings.by_members(field, reverse=True)[:15], number=1000
+        )
+
+        guild = rng.choice(bot.guilds)
+        member = synthetic.FakeMember(guild, bot.users[0])
+        join = synthetic.timeit(lambda: rankings.member_join(member), number=1000)
+        assert rankings.member_count(guild) == len(guild.members) + 1000
+        assert rankings.members == sorted(rankings.members)
+
+        # A guild gone from the cache before its remove event is evicted
+        top = rankings.by_members(field, reverse=True)
+        expected = top[1:16]
+        del bot._guilds[rankings.members[-1][1]]
+        assert [e[0].split(". ", 1)[1] for e in top[:15]] == [
+            e[0].split(". ", 1)[1] for e in expected
+        ]
+        assert len(rankings.members) == len(rankings.joined) == count - 1
+
+        # The server list keeps the cache order
+        listed = rankings.in_cache_order(field)
+        assert [e[0] for e in listed[:15]] == [
+            "{}. {}".format(i + 1, g.name) for i, g in enumerate(bot.guilds[:15])
+        ]
+
+        print(
+            f"{count:>8,} | {slow * 1e3:>8.2f}ms | {fast * 1e6:>8.1f}us"
+            f" | {build * 1e3:>7.1f}ms | {join * 1e6:>6.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
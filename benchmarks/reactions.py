@@ -0,0 +1,172 @@
+"""
+Cost of a reaction event with many menus open, each holding the
+wait_for pair ext.menus uses against one router lookup, and how
+soon a picker answers when its reactions are seeded behind it.
+
+    python -m benchmarks.reactions
+"""
+import asyncio
+import random
+import time
+
+import discord
+from discord.ext import commands
+
+from utilities import reactions
+
+EMOJIS = ["\N{BLACK LEFT-POINTING TRIANGLE}\ufe0f", "\N{BLACK RIGHT-POINTING TRIANGLE}\ufe0f"]
+
+
+def payload(message_id, user_id, emoji):
+    data = {"message_id": message_id, "channel_id": 1, "user_id": user_id, "guild_id": 1}
+    return discord.RawReactionActionEvent(data, discord.PartialEmoji(name=emoji), "REACTION_ADD")
+
+
+def menu_check(message_id, author_id):
+    # What Menu.reaction_check does
+    def check(p):
+        return p.message_id == message_id and p.user_id == author_id and str(p.emoji) in EMOJIS
+
+    return check
+
+
+async def with_wait_for(bot, menus, events):
+    waiters = []
+    for message_id, author_id in menus:
+        for event in reactions.EVENTS:
+            check = menu_check(message_id, author_id)
+            waiters.append(asyncio.ensure_future(bot.wait_for(event, check=check)))
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    for p in events:
+        bot.dispatch("raw_reaction_add", p)
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0)
+    matched = sum(w.done() for w in waiters)
+    for w in waiters:
+        w.cancel()
+    return elapsed, matched
+
+
+def with_router(router, menus, events):
+    for message_id, author_id in menus:
+        router.register(message_id, menu_check(message_id, author_id))
+    start = time.perf_counter()
+    matched = sum(router.route("raw_reaction_add", p) for p in events)
+    return time.perf_counter() - start, matched
+
+
+class BucketMessage:
+    """
+    add_reaction paced like one ratelimit bucket, as discord.py's
+    per bucket lock and Discord's quarter second reaction limit do.
+    """
+
+    def __init__(self, interval):
+        self.id = 10 ** 17
+        self.interval = interval
+        self.lock = asyncio.Lock()
+        self.sent = 0
+
+    async def add_reaction(self, emoji):
+        async with self.lock:
+            self.sent += 1
+            await asyncio.sleep(self.interval)
+
+    async def clear_reactions(self):
+        await asyncio.sleep(self.interval)
+
+
+async def pick(message, options, answer_after, *, background):
+    """Seconds until a picker has its answer and reactions sent."""
+    router = reactions.ReactionRouter()
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+    seeding = None
+    if background:
+        route = router.register(message.id)
+        seeding = reactions.seed(message, options)
+    else:
+        for emoji in options:
+            await message.add_reaction(emoji)
+        route = router.register(message.id)
+    # The author picks answer_after seconds after the message is sent
+    delay = max(start + answer_after - loop.time(), 0)
+    loop.call_later(delay, router.route, "raw_reaction_add", payload(message.id, 1, options[0]))
+    await route.wait(10)
+    answered = loop.time() - start
+    if seeding is not None:
+        seeding.cancel()
+    await reactions.clear(message, options, None)
+    return answered, message.sent
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    rng = random.Random(0)
+    bot = commands.Bot(command_prefix="!", loop=loop)
+    menus = [(10 ** 17 + n, 10 ** 16 + n) for n in range(2000)]
+    # One event per menu, most from someone other than the author
+    events = [
+        payload(m, a if rng.random() < 0.2 else a + 1, rng.choice(EMOJIS)) for m, a in menus
+    ]
+
+    print(f"{'open':>6} {'wait_for':>12} {'router':>12}")
+    for count in (10, 100, 500, 2000):
+        subset = menus[:count]
+        sample = [p for p in events if p.message_id < 10 ** 17 + count]
+        want = sum(p.user_id == a for p, (m, a) in zip(sample, subset))
+        waited, matched = loop.run_until_complete(with_wait_for(bot, subset, sample))
+        assert matched == want, (matched, want)
+
+        router = reactions.ReactionRouter(limit=count)
+        routed, matched = with_router(router, subset, sample)
+        assert matched == want
+        print(
+            f"{count:>6} {waited / len(sample) * 1e6:>10.1f}us {routed / len(sample) * 1e6:>10.2f}us"
+        )
+
+    # Ten options at a quarter second each scaled down tenfold
+    options = [f"{n}\ufe0f\u20e3" for n in range(10)]
+    print(f"\n{'picker':<12} {'answered':>9} {'sent':>5}")
+    for background in (False, True):
+        message = BucketMessage(0.025)
+        answered, sent = loop.run_until_complete(pick(message, options, 0.1, background=background))
+        name = "background" if background else "sequential"
+        print(f"{name:<12} {answered * 1e3:>7.0f}ms {sent:>5}")
+        assert answered < 0.2 if background else answered >= 0.25
+        assert sent < len(options) if background else sent == len(options)
+
+    # Capped routes drop the least recently active first, idle ones are swept
+    router = reactions.ReactionRouter(limit=3, idle=60)
+    routes = [router.register(n) for n in range(3)]
+    router.route("raw_reaction_add", payload(0, 1, EMOJIS[0]))
+    router.register(3)
+    assert routes[1].closed and not routes[0].closed and len(router) == 3
+    router.sweep(now=time.monotonic() + 61)
+    assert len(router) == 0 and router.evicted == 4
+    # Payloads routed before eviction are still delivered, then it times out
+    assert loop.run_until_complete(routes[0].wait(1)).message_id == 0
+    try:
+        loop.run_until_complete(routes[0].wait(1))
+    except asyncio.TimeoutError:
+        pass
+    else:
+        raise AssertionError("evicted route should time out")
+
+    # A check that raises drops its route and the waiter gets the error
+    router = reactions.ReactionRouter()
+    route = router.register(5, lambda p: 1 / 0)
+    assert not router.route("raw_reaction_add", payload(5, 1, EMOJIS[0]))
+    assert len(router) == 0 and route.closed
+    try:
+        loop.run_until_complete(route.wait(1))
+    except ZeroDivisionError:
+        pass
+    else:
+        raise AssertionError("the check's error should reach the waiter")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+A chatty command through sh, communicate() and paginating
+everything against the streaming runner's bounded window.
+
+    python -m benchmarks.shell
+"""
+import asyncio
+import subprocess
+import time
+import tracemalloc
+
+from discord.ext.commands import Paginator
+
+from utilities import shell
+
+COMMAND = "seq 1 3000000"
+
+
+async def communicate(command):
+    # What sh used to do
+    process = await asyncio.create_subprocess_shell(
+        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    stdout, stderr = [output.decode() for output in await process.communicate()]
+    pages = Paginator(prefix="```", max_size=1800)  # As TextPageSource
+    for line in stdout.split("\n"):
+        pages.add_line(line)
+    return pages.pages
+
+
+async def streamed(command, **kwargs):
+    process = shell.ShellProcess(command, max_lines=10 ** 8, max_bytes=10 ** 9, **kwargs)
+    first = None
+    runner = asyncio.ensure_future(process.run())
+    while not runner.done():
+        await asyncio.wait([runner], timeout=0.001)
+        if first is None and len(process.output):
+            first = process.elapsed
+    return process, first
+
+
+def measure(coro):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = asyncio.get_event_loop().run_until_complete(coro)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    pages, full, full_peak = measure(communicate(COMMAND))
+    (process, first), stream, stream_peak = measure(streamed(COMMAND))
+
+    # Every line went through, only the window is kept
+    output = process.output
+    assert output.lines == 3000000 and process.returncode == 0
+    assert output[len(output) - 1].split("\n")[-1] == "3000000"
+    assert output.dropped == len(output) - output.pages.maxlen - 1
+
+    # Caps kill the process
+    capped = asyncio.get_event_loop().run_until_complete(
+        asyncio.wait_for(shell.ShellProcess("yes", max_bytes=10 ** 6).run(), 10)
+    )
+    assert capped != 0
+
+    print(f"{COMMAND}: {len(pages):,} pages")
+    print(f"communicate {full * 1e3:.0f}ms, peak {full_peak / 1024 ** 2:.1f} MiB")
+    print(
+        f"streamed {stream * 1e3:.0f}ms, first page after {first * 1e3:.1f}ms, "
+        f"peak {stream_peak / 1024 ** 2:.1f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Per event overhead of the socket listener with and without rate series.
+
+    python -m benchmarks.sockets
+"""
+import collections
+import random
+
+from benchmarks import synthetic
+from utilities import timeseries
+
+EVENTS = ["PRESENCE_UPDATE"] * 60 + ["MESSAGE_CREATE"] * 20 + [
+    "GUILD_MEMBER_UPDATE",
+    "TYPING_START",
+    "MESSAGE_UPDATE",
+    "MESSAGE_REACTION_ADD",
+    "VOICE_STATE_UPDATE",
+]
+
+
+def main():
+    rng = random.Random(1)
+    payloads = [{"t": rng.choice(EVENTS), "op": 0} for _ in range(100_000)]
+
+    counter = collections.Counter()
+    rates = timeseries.SocketRates()
+    total = 0
+
+    def counter_only():
+        nonlocal total
+        for msg in payloads:
+            if event_type := msg.get("t"):
+                total += 1
+                counter[event_type] += 1
+
+    def with_series():
+        nonlocal total
+        for msg in payloads:
+            if event_type := msg.get("t"):
+                total += 1
+                counter[event_type] += 1
+                rates.record(event_type)
+
+    old = synthetic.timeit(counter_only, number=5) / len(payloads)
+    new = synthetic.timeit(with_series, number=5) / len(payloads)
+    query = synthetic.timeit(rates.rates, number=20)
+    export = synthetic.timeit(rates.to_csv, number=3)
+    print(f"listener: counter {old * 1e9:.0f}ns, with series {new * 1e9:.0f}ns per event")
+    print(f"rates() {query * 1e3:.2f}ms, to_csv() {export * 1e3:.1f}ms")
+    print(f"memory: {len(rates.events)} series x {timeseries.SPAN * 8 // 1024}KiB")
+
+    # Bursts show up as the peak and gaps are zeroed
+    series = timeseries.RateSeries(now=0)
+    series.add(10, amount=500)
+    series.add(11)
+    assert series.peak(now=20) == 500
+    assert series.rate(10, now=20) == 50.1
+    assert series.peak(now=12 + timeseries.SPAN) == 0
+    assert series.window(5, now=10 ** 6) == [0] * 5
+
+
+if __name__ == "__main__":
+    main()
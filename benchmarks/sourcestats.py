@@ -0,0 +1,56 @@
+"""
+The lines command, a full read of every file against the cached scan.
+
+    python -m benchmarks.sourcestats
+"""
+import os
+import shutil
+import tempfile
+
+from benchmarks import synthetic
+from utilities import sourcestats
+
+
+def full_scan(root):
+    # What the lines command used to do on every invocation.
+    totals = dict.fromkeys(sourcestats.COUNTERS, 0)
+    for path, subdirs, files in os.walk(root):
+        subdirs[:] = [d for d in subdirs if d not in sourcestats.EXCLUDE]
+        for name in files:
+            if name.endswith(".py"):
+                for key, value in sourcestats.count_file(os.path.join(path, name)).items():
+                    totals[key] += value
+    return totals
+
+
+def main():
+    # Copy the bot's own tree a few times over to get a larger codebase
+    root = tempfile.mkdtemp()
+    try:
+        for copy in range(20):
+            shutil.copytree(
+                ".", os.path.join(root, f"copy{copy}"),
+                ignore=shutil.ignore_patterns(".git", "__pycache__", "data"),
+            )
+        stats = sourcestats.SourceStats(root)
+        cold = synthetic.timeit(stats.scan, number=1)
+        warm = synthetic.timeit(stats.scan, number=5)
+        full = synthetic.timeit(lambda: full_scan(root), number=3)
+
+        totals = stats.scan()
+        assert {k: totals[k] for k in sourcestats.COUNTERS} == full_scan(root)
+
+        # Touch one file and only it is read again
+        target = os.path.join(root, "copy0", "main.py")
+        with open(target, "a") as f:
+            f.write("\n# touched\n")
+        assert stats.scan()["comments"] == totals["comments"] + 1
+
+        print(f"{totals['files']:,} files, {totals['lines']:,} lines")
+        print(f"full read {full * 1e3:.1f}ms, cold scan {cold * 1e3:.1f}ms, cached rescan {warm * 1e3:.1f}ms")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
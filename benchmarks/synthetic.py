@@ -0,0 +1,169 @@
+"""
+Synthetic stand-ins for discord.py models.
+Lets the benchmarks build large guilds without
+a gateway connection or a bot token.
+"""
+import time
+import random
+import string
+
+import discord
+
+
+class FakeUser:
+    __slots__ = ("id", "name", "discriminator", "bot")
+
+    def __init__(self, user_id, name, discriminator, bot=False):
+        self.id = user_id
+        self.name = name
+        self.discriminator = discriminator
+        self.bot = bot
+
+    def __str__(self):
+        return f"{self.name}#{self.discriminator}"
+
+
+class FakeMember(FakeUser):
+    __slots__ = ("guild", "nick", "status")
+
+    def __init__(self, guild, user, nick=None, status=discord.Status.offline):
+        super().__init__(user.id, user.name, user.discriminator, user.bot)
+        self.guild = guild
+        self.nick = nick
+        self.status = status
+
+
+class FakeEmoji:
+    __slots__ = ("id", "name", "animated", "guild_id")
+
+    def __init__(self, emoji_id, name, animated, guild_id):
+        self.id = emoji_id
+        self.name = name
+        self.animated = animated
+        self.guild_id = guild_id
+
+
+class FakeGuild:
+    def __init__(self, guild_id, name):
+        self.id = guild_id
+        self.name = name
+        self.channels = []
+        self.emojis = []
+        self._members = {}
+
+    @property
+    def members(self):
+        return list(self._members.values())
+
+    @property
+    def member_count(self):
+        return len(self._members)
+
+    def get_member(self, member_id):
+        return self._members.get(member_id)
+
+    def add_member(self, member):
+        self._members[member.id] = member
+
+
+class FakeBot:
+    intents = discord.Intents.all()
+
+    def __init__(self):
+        self._guilds = {}
+        self._users = {}
+        self._emojis = {}
+
+    @property
+    def guilds(self):
+        return list(self._guilds.values())
+
+    @property
+    def users(self):
+        return list(self._users.values())
+
+    def get_guild(self, guild_id):
+        return self._guilds.get(guild_id)
+
+    @property
+    def emojis(self):
+        return [e for g in self._guilds.values() for e in g.emojis]
+
+    def get_user(self, user_id):
+        return self._users.get(user_id)
+
+    def get_emoji(self, emoji_id):
+        return self._emojis.get(emoji_id)
+
+    def get_all_members(self):
+        for guild in self._guilds.values():
+            yield from guild._members.values()
+
+
+def random_name(rng, low=3, high=16):
+    return "".join(
+        rng.choice(string.ascii_letters + string.digits + "_")
+        for _ in range(rng.randint(low, high))
+    )
+
+
+def make_users(count, *, seed=0):
+    rng = random.Random(seed)
+    return [
+        FakeUser(
+            10 ** 17 + i,
+            random_name(rng),
+            f"{rng.randint(1, 9999):04d}",
+            bot=rng.random() < 0.02,
+        )
+        for i in range(count)
+    ]
+
+
+def make_bot(guild_sizes, *, user_pool=None, seed=0):
+    """
+    Build a FakeBot with one guild per entry in guild_sizes.
+    Members are drawn from a shared user pool so users
+    overlap across guilds like they do on a real bot.
+    """
+    rng = random.Random(seed)
+    pool = make_users(user_pool or max(guild_sizes), seed=seed)
+    statuses = (
+        discord.Status.online,
+        discord.Status.idle,
+        discord.Status.dnd,
+        discord.Status.offline,
+        discord.Status.offline,
+    )
+
+    bot = FakeBot()
+    for user in pool:
+        bot._users[user.id] = user
+    for index, size in enumerate(guild_sizes):
+        guild = FakeGuild(7 * 10 ** 17 + index, random_name(rng, 4, 24))
+        for user in rng.sample(pool, min(size, len(pool))):
+            nick = random_name(rng) if rng.random() < 0.2 else None
+            guild.add_member(FakeMember(guild, user, nick, rng.choice(statuses)))
+        bot._guilds[guild.id] = guild
+    return bot
+
+
+def add_emojis(bot, per_guild, *, seed=0):
+    """Give every guild in bot per_guild random emojis."""
+    rng = random.Random(seed)
+    emoji_id = 8 * 10 ** 17
+    for guild in bot.guilds:
+        for _ in range(per_guild):
+            emoji_id += 1
+            emoji = FakeEmoji(emoji_id, random_name(rng, 2, 12), rng.random() < 0.3, guild.id)
+            guild.emojis.append(emoji)
+            bot._emojis[emoji.id] = emoji
+    return bot
+
+
+def timeit(func, *, number=1000):
+    """Mean seconds per call of func over number calls."""
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number
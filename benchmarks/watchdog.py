@@ -0,0 +1,47 @@
+"""
+Loop lag watchdog against a loop that blocks on purpose.
+
+    python -m benchmarks.watchdog
+"""
+import asyncio
+import time
+import types
+
+from utilities import latency, watchdog
+
+
+def block(seconds):
+    # Stand-in for a synchronous call on the loop, like a json.dump.
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def run(watch):
+    watch.start()
+    for _ in range(5):
+        await asyncio.sleep(0.2)
+        block(0.3)
+    await asyncio.sleep(0.2)
+    watch.stop()
+
+
+def main():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    bot = types.SimpleNamespace(loop=loop, latencies=latency.LatencyTracker())
+    watch = watchdog.LoopWatchdog(bot, interval=0.05, threshold=0.05)
+    loop.run_until_complete(run(watch))
+
+    stats = bot.latencies.summary("loop", "1m")
+    print(f"lag p50 {stats['p50']:.1f}ms, p99 {stats['p99']:.1f}ms, max {stats['max']:.0f}ms")
+    print(f"stalls: {watch.stalls}")
+    for location, samples in watch.blocked.most_common(3):
+        print(f"{location}: {samples} samples, ~{watch.blocked_seconds(location):.2f}s")
+    assert watch.stalls == 5
+    (filename, lineno, name), _ = watch.blocked.most_common(1)[0]
+    assert name == "block", name
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 import io
 import os
-import dis
 import math
 import yarl
 import typing
@@ -239,6 +238,31 @@ class Botadmin(commands.Cog):
             return await ctx.send_or_reply(e)
         await ctx.send_or_reply(inv)
 
+    # Formatters for the lazy guild rankings used by the server lists
+    def _plural_members(self, count):
+        return "{:,} member{}".format(count, "" if count == 1 else "s")
+
+    def _listed_field(self, rank, guild, count):
+        return (
+            "{}. {}".format(rank, guild.name),
+            "{}\nID: `{}`".format(self._plural_members(count), guild.id),
+        )
+
+    def _population_field(self, rank, guild, count):
+        return ("{}. {}".format(rank, guild.name), self._plural_members(count))
+
+    def _joined_field(self, rank, guild, joined):
+        count = self.bot.guild_rankings.member_count(guild)
+        joined_at = guild.me.joined_at if guild.me else None
+        return (
+            "{}. {} ({})".format(rank, guild.name, self._plural_members(count)),
+            "{} UTC".format(
+                joined_at.strftime("%Y-%m-%d %I:%M %p")
+                if joined_at is not None
+                else "Unknown"
+            ),
+        )
+
     @decorators.command(
         brief="Lists the servers I'm connected to.", aliases=["servers", "serverlist"]
     )
@@ -248,25 +272,9 @@ class Botadmin(commands.Cog):
         Alias: -servers, -serverlist
         Output: Lists the servers I'm connected to.
         """
-        our_list = []
-        for guild in self.bot.guilds:
-            our_list.append(
-                {
-                    "name": guild.name,
-                    "value": "{:,} member{}\nID: `{}`".format(
-                        len(guild.members),
-                        "" if len(guild.members) == 1 else "s",
-                        guild.id,
-                    ),
-                    "users": len(guild.members),
-                }
-            )
         p = pagination.MainMenu(
             pagination.FieldPageSource(
-                entries=[
-                    ("{}. {}".format(y + 1, x["name"]), x["value"])
-                    for y, x in enumerate(our_list)
-                ],
+                entries=self.bot.guild_rankings.in_cache_order(self._listed_field),
                 title="Server's I'm Connected To ({:,} total)".format(
                     len(self.bot.guilds)
                 ),
@@ -285,24 +293,11 @@ class Botadmin(commands.Cog):
         Usage: -topservers
         Output: The servers with the most memebers
         """
-        our_list = []
-        for guild in self.bot.guilds:
-            our_list.append(
-                {
-                    "name": guild.name,
-                    "value": "{:,} member{}".format(
-                        len(guild.members), "" if len(guild.members) == 1 else "s"
-                    ),
-                    "users": len(guild.members),
-                }
-            )
-        our_list = sorted(our_list, key=lambda x: x["users"], reverse=True)
         p = pagination.MainMenu(
             pagination.FieldPageSource(
-                entries=[
-                    ("{}. {}".format(y + 1, x["name"]), x["value"])
-                    for y, x in enumerate(our_list)
-                ],
+                entries=self.bot.guild_rankings.by_members(
+                    self._population_field, reverse=True
+                ),
                 title="Top Servers By Population ({} total)".format(
                     len(self.bot.guilds)
                 ),
@@ -321,24 +316,9 @@ class Botadmin(commands.Cog):
         Usage: -bottomservers
         Output: The servers with the least memebers
         """
-        our_list = []
-        for guild in self.bot.guilds:
-            our_list.append(
-                {
-                    "name": guild.name,
-                    "value": "{:,} member{}".format(
-                        len(guild.members), "" if len(guild.members) == 1 else "s"
-                    ),
-                    "users": len(guild.members),
-                }
-            )
-        our_list = sorted(our_list, key=lambda x: x["users"])
         p = pagination.MainMenu(
             pagination.FieldPageSource(
-                entries=[
-                    ("{}. {}".format(y + 1, x["name"]), x["value"])
-                    for y, x in enumerate(our_list)
-                ],
+                entries=self.bot.guild_rankings.by_members(self._population_field),
                 title="Bottom Servers By Population ({:,} total)".format(
                     len(self.bot.guilds)
                 ),
@@ -357,34 +337,9 @@ class Botadmin(commands.Cog):
         Usage: -firstservers
         Output: Lists the first servers I joined
         """
-        our_list = []
-        for guild in self.bot.guilds:
-            bot = guild.me
-            our_list.append(
-                {
-                    "name": "{} ({:,} member{})".format(
-                        guild.name,
-                        len(guild.members),
-                        "" if len(guild.members) == 1 else "s",
-                    ),
-                    "value": "{} UTC".format(
-                        bot.joined_at.strftime("%Y-%m-%d %I:%M %p")
-                        if bot.joined_at is not None
-                        else "Unknown"
-                    ),
-                    "date": bot.joined_at,
-                }
-            )
-        our_list = sorted(
-            our_list,
-            key=lambda x: x["date"].timestamp() if x["date"] is not None else -1,
-        )
         p = pagination.MainMenu(
             pagination.FieldPageSource(
-                entries=[
-                    ("{}. {}".format(y + 1, x["name"]), x["value"])
-                    for y, x in enumerate(our_list)
-                ],
+                entries=self.bot.guild_rankings.by_joined(self._joined_field),
                 title="First Servers I Joined ({:,} total)".format(
                     len(self.bot.guilds)
                 ),
@@ -404,35 +359,11 @@ class Botadmin(commands.Cog):
         Alias: {0}lastservers
         Output: Lists the most recent servers joined
         """
-        our_list = []
-        for guild in self.bot.guilds:
-            bot = guild.me
-            our_list.append(
-                {
-                    "name": "{} ({} member{})".format(
-                        guild.name,
-                        len(guild.members),
-                        "" if len(guild.members) == 1 else "s",
-                    ),
-                    "value": "{} UTC".format(
-                        bot.joined_at.strftime("%Y-%m-%d %I:%M %p")
-                        if bot.joined_at is not None
-                        else "Unknown"
-                    ),
-                    "date": bot.joined_at,
-                }
-            )
-        our_list = sorted(
-            our_list,
-            key=lambda x: x["date"].timestamp() if x["date"] is not None else -1,
-            reverse=True,
-        )
         p = pagination.MainMenu(
             pagination.FieldPageSource(
-                entries=[
-                    ("{}. {}".format(y + 1, x["name"]), x["value"])
-                    for y, x in enumerate(our_list)
-                ],
+                entries=self.bot.guild_rankings.by_joined(
+                    self._joined_field, reverse=True
+                ),
                 title="Most Recent Servers I Joined ({:,} total)".format(
                     len(self.bot.guilds)
                 ),
@@ -516,31 +447,13 @@ class Botadmin(commands.Cog):
                 )
 
     def _get_imports(self, file_name):
-        if not os.path.exists("cogs/" + file_name):
-            return []
-        file_string = open("cogs/" + file_name, "rb").read().decode("utf-8")
-        instructions = dis.get_instructions(file_string)
-        imports = [__ for __ in instructions if "IMPORT" in __.opname]
-        i = []
-        for instr in imports:
-            if not instr.opname == "IMPORT_FROM":
-                continue
-            i.append(instr.argval)
-        cog_imports = []
-        for f in i:
-            if os.path.exists("cogs/" + f + ".py"):
-                cog_imports.append(f)
-        return cog_imports
+        # Cogs imported by a cog, from the cached import graph
+        imports = self.bot.modules.imports.get("cogs." + file_name[:-3], ())
+        return sorted(m[5:] for m in imports if m.startswith("cogs."))
 
     def _get_imported_by(self, file_name):
-        ext_list = []
-        for ext in os.listdir("cogs"):
-            # Avoid reloading Settings and Mute
-            if not ext.lower().endswith(".py") or ext == file_name:
-                continue
-            if file_name[:-3] in self._get_imports(ext):
-                ext_list.append(ext)
-        return ext_list
+        dependents = self.bot.modules.dependents().get("cogs." + file_name[:-3], ())
+        return sorted(m[5:] + ".py" for m in dependents if m.startswith("cogs."))
 
     async def _send_embed(self, ctx, embed, pm=False):
         # Helper method to send embeds to their proper location
@@ -716,12 +629,9 @@ class Botadmin(commands.Cog):
         """
         large_msg = False
         msg = ""
-        totalecount = 0
+        totalecount = sum(self.bot.emoji_index.total())
         for g in self.bot.guilds:
-            ecount = 0
-            for e in g.emojis:
-                ecount = ecount + 1
-                totalecount = totalecount + 1
+            ecount = sum(self.bot.emoji_index.count(g))
             msg = msg + (g.name + ": " + str(ecount)) + "\n"
         if len(msg) > 1900:
             msg = await self.create_gist(
@@ -812,11 +722,12 @@ class Botadmin(commands.Cog):
         if user is None:
             user = ctx.author
 
-        shared = []
-        for guild in self.bot.guilds:
-            for member in guild.members:
-                if member.id == user.id:
-                    shared.append((guild.id, guild.name))
+        guilds = sorted(
+            self.bot.mutual_index.guilds(user.id), key=lambda g: (g.name.casefold(), g.id)
+        )
+        shared = [(g.id, g.name) for g in guilds]
+        if not shared:
+            return await ctx.fail(f"I share no servers with `{user}`")
 
         width = max([len(str(x[0])) for x in shared])
         formatted = "\n".join([f"{str(x[0]).ljust(width)} : {x[1]}" for x in shared])
@@ -848,11 +759,10 @@ class Botadmin(commands.Cog):
         if not argument:
             guild = ctx.guild
         options = await converters.BotServer().convert(ctx, argument)
-        option_dict = dict()
         if isinstance(options, list):
-            for x in options:
-                option_dict[x.name] = x
-            guild, message = await helpers.choose(ctx, argument, option_dict)
+            guild, message = await helpers.choose(
+                ctx, argument, self.bot.guild_index, options
+            )
             if not guild:
                 return
         else:
@@ -867,17 +777,11 @@ class Botadmin(commands.Cog):
         time_str = "{}".format(local_time)
 
         server_embed.description = "Created at {}".format(time_str)
-        online_members = 0
-        bot_member = 0
-        bot_online = 0
-        for member in guild.members:
-            if member.bot:
-                bot_member += 1
-                if not member.status == discord.Status.offline:
-                    bot_online += 1
-                continue
-            if not member.status == discord.Status.offline:
-                online_members += 1
+        statuses = self.bot.population.status_counts(guild)
+        online_members = sum(statuses["humans"].values())
+        online_members -= statuses["humans"][discord.Status.offline]
+        bot_member = sum(statuses["bots"].values())
+        bot_online = bot_member - statuses["bots"][discord.Status.offline]
         # bot_percent = "{:,g}%".format((bot_member/len(guild.members))*100)
         try:
             rounded = round(
@@ -1034,11 +938,10 @@ class Botadmin(commands.Cog):
         if not argument:
             guild = ctx.guild
         options = await converters.BotServer().convert(ctx, argument)
-        option_dict = dict()
         if isinstance(options, list):
-            for x in options:
-                option_dict[x.name] = x
-            guild, message = await helpers.choose(ctx, argument, option_dict)
+            guild, message = await helpers.choose(
+                ctx, argument, self.bot.guild_index, options
+            )
             if not guild:
                 return
         else:
@@ -2,27 +2,29 @@ import io
 import os
 import sys
 import time
-import codecs
 import psutil
 import struct
 import asyncio
 import discord
 import inspect
-import pathlib
+import logging
 import datetime
 import platform
-import statistics
 import subprocess
-import collections
 
 from discord import __version__ as dv
-from discord.ext import commands, menus
+from discord.ext import commands, menus, tasks
 
 from utilities import utils
 from utilities import checks
+from utilities import latency
 from utilities import decorators
+from utilities import hostmetrics
+from utilities import pgstats
 from utilities import pagination
 
+traceback_logger = logging.getLogger("TRACEBACK_LOGGER")
+
 
 def setup(bot):
     bot.add_cog(Info(bot))
@@ -38,13 +40,29 @@ class Info(commands.Cog):
         self.socket_event_total = 0
         self.process = psutil.Process(os.getpid())
         self.socket_since = datetime.datetime.utcnow()
-        self.message_latencies = collections.deque(maxlen=500)
+        self.database_probe.start()
+
+    def cog_unload(self):
+        self.database_probe.cancel()
+
+    @tasks.loop(seconds=30.0)
+    async def database_probe(self):
+        start = time.perf_counter()
+        try:
+            await self.bot.cxn.fetchval("SELECT 1;")
+        except pgstats.CONNECTION_ERRORS:  # Keep probing through database outages
+            return
+        except Exception:
+            traceback_logger.exception("Database probe failed")
+            return
+        self.bot.latencies.record("database", time.perf_counter() - start)
 
     @commands.Cog.listener()
     @decorators.wait_until_ready()
     async def on_message(self, message):
-        now = datetime.datetime.utcnow()
-        self.message_latencies.append((now, now - message.created_at))
+        # Snowflake timestamp, avoids building a datetime per message
+        created = ((message.id >> 22) + discord.utils.DISCORD_EPOCH) / 1000
+        self.bot.latencies.record("message", time.time() - created)
 
     @commands.Cog.listener()  # Update our socket counters
     async def on_socket_response(self, msg: dict):
@@ -52,6 +70,9 @@ class Info(commands.Cog):
         if event_type := msg.get("t"):
             self.socket_event_total += 1
             self.bot.socket_events[event_type] += 1
+            self.bot.socket_rates.record(event_type)
+        elif msg.get("op") == 11:  # Heartbeat ACK
+            self.bot.latencies.record("gateway", self.bot.latency)
 
     async def total_global_commands(self):
         query = """SELECT COUNT(*) FROM commands"""
@@ -89,21 +110,12 @@ class Info(commands.Cog):
                         WHERE client_id = $1;
                         """
         bot_version = await self.bot.cxn.fetchval(version_query, self.bot.user.id)
-        total_members = sum(1 for x in self.bot.get_all_members())
-        voice_channels = []
-        text_channels = []
-        for guild in self.bot.guilds:
-            voice_channels.extend(guild.voice_channels)
-            text_channels.extend(guild.text_channels)
-
-        text = len(text_channels)
-        voice = len(voice_channels)
-
-        ram_usage = self.process.memory_full_info().rss / 1024 ** 2
-        proc = psutil.Process()
-        with proc.oneshot():
-            mem_total = psutil.virtual_memory().total / (1024 ** 2)
-            mem_of_total = proc.memory_percent()
+        population = self.bot.population.snapshot()
+        total_members = population["members"]
+        text = population["text_channels"]
+        voice = population["voice_channels"]
+
+        ram_usage = self.bot.host_metrics.latest().rss / 1024 ** 2
 
         embed = discord.Embed(colour=self.bot.constants.embed)
         embed.set_thumbnail(url=self.bot.user.avatar_url)
@@ -181,10 +193,11 @@ class Info(commands.Cog):
         per_s = self.socket_event_total / running_s
 
         width = len(max(self.bot.socket_events, key=lambda x: len(str(x))))
+        rates = self.bot.socket_rates.rates()
 
         line = "\n".join(
-            "{0:<{1}} : {2:>{3}}".format(
-                str(event_type), width, count, len(max(str(count)))
+            "{0:<{1}} : {2:>9,} | {3:>7.2f}/s now | {4:>5,}/s peak".format(
+                str(event_type), width, count, *rates.get(event_type, (0, 0))
             )
             for event_type, count in self.bot.socket_events.most_common()
         )
@@ -194,6 +207,12 @@ class Info(commands.Cog):
                 per_s, self.socket_event_total
             )
         )
+        header += (
+            "**Last 10 seconds: {0:0.2f}/s** | "
+            "**Peak in the last hour: {1:,}/s**\n".format(
+                self.bot.socket_rates.total_rate(), self.bot.socket_rates.total_peak()
+            )
+        )
 
         m = pagination.MainMenu(
             pagination.TextPageSource(line, prefix="```yaml", max_size=500)
@@ -205,6 +224,24 @@ class Info(commands.Cog):
         except menus.MenuError as e:
             await ctx.send_or_reply(e)
 
+    @decorators.command(
+        aliases=["socketexport"],
+        brief="Export per second socket event counts.",
+        botperms=["attach_files"],
+    )
+    @checks.bot_has_perms(attach_files=True)
+    async def socketseries(self, ctx):
+        """
+        Usage: {0}socketseries
+        Alias: {0}socketexport
+        Output:
+            A csv file with the number of
+            socket events received per second
+            over the past hour by event type.
+        """
+        data = io.BytesIO(self.bot.socket_rates.to_csv().encode("utf-8"))
+        await ctx.send_or_reply(file=discord.File(data, filename="socket_events.csv"))
+
     @decorators.command(
         aliases=["averageping", "averagelatency", "averagelat"],
         brief="View the average message latency.",
@@ -219,17 +256,19 @@ class Info(commands.Cog):
             {0}avglat
             {0}avglatency
         Output:
-            Shows the average message latency
-            over the past 500 messages send.
-        """
-        await ctx.send(
-            "{:.2f}ms".format(
-                1000
-                * statistics.mean(
-                    lat.total_seconds() for ts, lat in self.message_latencies
-                )
+            Shows the median and tail
+            message latency over the past
+            minute, five minutes and hour.
+        """
+        msg = "```yaml\n"
+        msg += "Window:     p50      p95      p99   (messages)\n"
+        for window in latency.WINDOWS:
+            stats = self.bot.latencies.summary("message", window)
+            msg += "{:<6}: {:>6.0f}ms {:>6.0f}ms {:>6.0f}ms   ({:,})\n".format(
+                window, stats["p50"], stats["p95"], stats["p99"], stats["count"]
             )
-        )
+        msg += "```"
+        await ctx.send_or_reply(msg)
 
     @decorators.command(
         brief="Show reply latencies.",
@@ -391,15 +430,16 @@ class Info(commands.Cog):
             to run an internet speedtest. May fail.
         """
         async with ctx.channel.typing():
-            start = time.time()
+            start = time.perf_counter()
             message = await ctx.send_or_reply(
                 content=f'{self.bot.emote_dict["loading"]} **Calculating Latency...**',
             )
-            end = time.time()
+            end = time.perf_counter()
 
-            db_start = time.time()
+            db_start = time.perf_counter()
             await self.bot.cxn.fetch("SELECT 1;")
-            elapsed = time.time() - db_start
+            elapsed = time.perf_counter() - db_start
+            self.bot.latencies.record("database", elapsed)
 
             p = str(round((end - start) * 1000, 2))
             q = str(round(self.bot.latency * 1000, 2))
@@ -418,6 +458,14 @@ class Info(commands.Cog):
             msg += "Response: {} ms\n".format(p.ljust(width, " "))
             msg += "Database: {} ms\n".format(v.ljust(width, " "))
             msg += "```"
+            msg += "**Past 5 minutes (p50/p95/p99):**\n"
+            msg += "```yaml\n"
+            for name in ("gateway", "rest", "database"):
+                stats = self.bot.latencies.summary(name, "5m")
+                msg += "{:<8}: {:.0f}/{:.0f}/{:.0f} ms\n".format(
+                    name.capitalize(), stats["p50"], stats["p95"], stats["p99"]
+                )
+            msg += "```"
         await message.edit(content=msg)
 
     @decorators.command(brief="Show the bot's host environment.")
@@ -430,22 +478,20 @@ class Info(commands.Cog):
             f'{self.bot.emote_dict["loading"]} **Collecting Information...**'
         )
 
-        with self.process.oneshot():
-            process = self.process.name
-        swap = psutil.swap_memory()
+        host = self.bot.host_metrics
+        sample = host.latest()
 
         processName = self.process.name()
         pid = self.process.ppid()
-        swapUsage = "{0:.1f}".format(((swap[1] / 1024) / 1024) / 1024)
-        swapTotal = "{0:.1f}".format(((swap[0] / 1024) / 1024) / 1024)
-        swapPerc = swap[3]
-        cpuCores = psutil.cpu_count(logical=False)
-        cpuThread = psutil.cpu_count()
-        cpuUsage = psutil.cpu_percent(interval=1)
-        memStats = psutil.virtual_memory()
-        memPerc = memStats.percent
-        memUsed = memStats.used
-        memTotal = memStats.total
+        swapUsage = "{0:.1f}".format(((sample.swap_used / 1024) / 1024) / 1024)
+        swapTotal = "{0:.1f}".format(((sample.swap_total / 1024) / 1024) / 1024)
+        swapPerc = sample.swap_percent
+        cpuCores = host.cpu_cores
+        cpuThread = host.cpu_count
+        cpuUsage = sample.cpu
+        memPerc = sample.host_memory_percent
+        memUsed = sample.host_memory_used
+        memTotal = sample.host_memory_total
         memUsedGB = "{0:.1f}".format(((memUsed / 1024) / 1024) / 1024)
         memTotalGB = "{0:.1f}".format(((memTotal / 1024) / 1024) / 1024)
         currentOS = platform.platform()
@@ -508,7 +554,11 @@ class Info(commands.Cog):
             )
             + "\n"
         )
-        msg += utils.makeBar(int(round(swapPerc))) + "\n"
+        msg += utils.makeBar(int(round(swapPerc))) + "\n\n"
+        msg += "CPU (1h) : {}\n".format(hostmetrics.sparkline(host.trend("cpu")))
+        msg += "RAM (1h) : {}\n".format(
+            hostmetrics.sparkline(host.trend("host_memory_percent"))
+        )
         # msg += 'Processor Version: {}\n\n'.format(version)
         msg += "```"
 
@@ -654,44 +704,47 @@ class Info(commands.Cog):
             msg = await ctx.send_or_reply(
                 content=f"{self.bot.emote_dict['loading']} **Collecting User Stats...**",
             )
-            users = [x for x in self.bot.get_all_members() if not x.bot]
-            users_online = [x for x in users if x.status != discord.Status.offline]
-            unique_users = set([x.id for x in users])
-            bots = [x for x in self.bot.get_all_members() if x.bot]
-            bots_online = [x for x in bots if x.status != discord.Status.offline]
-            unique_bots = set([x.id for x in bots])
+            population = self.bot.population.snapshot()
+            statuses = self.bot.population.status_counts()
+            offline = discord.Status.offline
+            users = population["humans"]
+            users_online = users - statuses["humans"][offline]
+            unique_users = population["unique_humans"]
+            bots = population["bots"]
+            bots_online = bots - statuses["bots"][offline]
+            unique_bots = population["unique_bots"]
             e = discord.Embed(title="User Stats", color=self.bot.constants.embed)
             e.add_field(
                 name="Humans",
                 value="{:,}/{:,} online ({:,g}%) - {:,} unique ({:,g}%)".format(
-                    len(users_online),
-                    len(users),
-                    round((len(users_online) / len(users)) * 100, 2),
-                    len(unique_users),
-                    round((len(unique_users) / len(users)) * 100, 2),
+                    users_online,
+                    users,
+                    round((users_online / users) * 100, 2),
+                    unique_users,
+                    round((unique_users / users) * 100, 2),
                 ),
                 inline=False,
             )
             e.add_field(
                 name="Bots",
                 value="{:,}/{:,} online ({:,g}%) - {:,} unique ({:,g}%)".format(
-                    len(bots_online),
-                    len(bots),
-                    round((len(bots_online) / len(bots)) * 100, 2),
-                    len(unique_bots),
-                    round(len(unique_bots) / len(bots) * 100, 2),
+                    bots_online,
+                    bots,
+                    round((bots_online / bots) * 100, 2),
+                    unique_bots,
+                    round(unique_bots / bots * 100, 2),
                 ),
                 inline=False,
             )
             e.add_field(
                 name="Total",
                 value="{:,}/{:,} online ({:,g}%)".format(
-                    len(users_online) + len(bots_online),
-                    len(users) + len(bots),
+                    users_online + bots_online,
+                    users + bots,
                     round(
                         (
-                            (len(users_online) + len(bots_online))
-                            / (len(users) + len(bots))
+                            (users_online + bots_online)
+                            / (users + bots)
                         )
                         * 100,
                         2,
@@ -699,6 +752,22 @@ class Info(commands.Cog):
                 ),
                 inline=False,
             )
+            e.add_field(
+                name="Statuses",
+                value="\n".join(
+                    "{}: {:,}".format(
+                        str(status).capitalize(),
+                        statuses["humans"][status] + statuses["bots"][status],
+                    )
+                    for status in (
+                        discord.Status.online,
+                        discord.Status.idle,
+                        discord.Status.dnd,
+                        offline,
+                    )
+                ),
+                inline=False,
+            )
             await msg.edit(content=None, embed=e)
 
     @decorators.command(
@@ -719,40 +788,14 @@ class Info(commands.Cog):
         """
         async with ctx.channel.typing():
             msg = "```fix\n"
-            lines = 0
-            file_amount = 0
-            comments = 0
-            funcs = 0
-            classes = 0
-            chars = 0
-            imports = 0
-            exclude = set([".testervenv", ".git", "__pycache__", ".vscode"])
-            for path, subdirs, files in os.walk("."):
-                [subdirs.remove(d) for d in list(subdirs) if d in exclude]
-                for name in files:
-                    if name.endswith(".py"):
-                        file_amount += 1
-                        with codecs.open(
-                            "./" + str(pathlib.PurePath(path, name)), "r", "utf-8"
-                        ) as f:
-                            for l in f:
-                                chars += len(l.strip())
-                                if l.strip().startswith("#"):
-                                    comments += 1
-                                elif len(l.strip()) == 0:
-                                    pass
-                                else:
-                                    lines += 1
-                                    if l.strip().startswith(
-                                        "def"
-                                    ) or l.strip().startswith("async"):
-                                        funcs += 1
-                                    elif l.strip().startswith("class"):
-                                        classes += 1
-                                    elif l.strip().startswith(
-                                        "import"
-                                    ) or l.strip().startswith("from"):
-                                        imports += 1
+            totals = await self.bot.source_stats.collect(self.bot.loop)
+            lines = totals["lines"]
+            file_amount = totals["files"]
+            comments = totals["comments"]
+            funcs = totals["funcs"]
+            classes = totals["classes"]
+            chars = totals["chars"]
+            imports = totals["imports"]
             width = max(
                 len(f"{lines:,}"),
                 len(f"{file_amount:,}"),
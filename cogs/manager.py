@@ -1,8 +1,12 @@
 import io
 import os
+import re
 import sys
 import copy
+import random
 import time
+import shlex
+import datetime
 import psutil
 import typing
 import discord
@@ -22,7 +26,13 @@ from utilities import checks
 from utilities import converters
 from utilities import decorators
 from utilities import formatting
+from utilities import hostmetrics
+from utilities import loadgen
+from utilities import logview
 from utilities import pagination
+from utilities import pgstats
+from utilities import shell
+from utilities import sqlview
 
 
 def setup(bot):
@@ -55,22 +65,17 @@ class Manager(commands.Cog):
         """
         Usage: {0}refresh [db|-db|--db=False]
         Output:
-            Runs all reloading commands.
+            Reloads the botvars and every
+            module edited since it was loaded.
         Notes:
             Pass the --db flag to
             restart the database.
         """
         await ctx.trigger_typing()
-        core = importlib.import_module("core", package=".")
-        importlib.reload(core)
-        starter = importlib.import_module("starter", package=".")
-        importlib.reload(starter)
         if db in ["db", "-db", "--db"]:
             await ctx.invoke(self.update)
         await ctx.invoke(self.botvars)
-        await ctx.invoke(self.rau)
-        await ctx.invoke(self.ras)
-        await ctx.invoke(self.reloadall)
+        await ctx.invoke(self.reloadchanged)
         await ctx.success("**Completed**")
 
     @decorators.command(
@@ -204,6 +209,62 @@ class Manager(commands.Cog):
                 return await ctx.send_or_reply(str(e).replace("'", "**"))
         await ctx.success(f"Reloaded extension **{file}.py**")
 
+    async def reload_modules(self, ctx, prefix=None):
+        """
+        Reloads every module under prefix, or with no prefix the
+        modules edited since they were loaded, along with all the
+        modules importing them, in import order.
+        """
+        graph = self.bot.modules
+        await self.bot.loop.run_in_executor(None, graph.scan)
+        if prefix is None:
+            plan = graph.plan()
+        else:
+            plan = graph.plan([m for m in graph.paths if m.startswith(prefix)])
+        results = graph.reload(self.bot, plan)
+
+        errors = [r for r in results if r.error]
+        if errors:
+            output = "\n".join(
+                [f"**{r.module}** ```diff\n- {r.error}```" for r in errors]
+            )
+            return await ctx.fail(
+                f"**Failed to reload following modules.**\n\n{output}"
+            )
+        if not results:
+            return await ctx.success("**No modules needed reloading.**")
+
+        total = sum(r.seconds for r in results)
+        width = max(len(r.module) for r in results)
+        report = "\n".join(
+            f"{r.module:<{width}} {r.seconds * 1000:>7.1f}ms {r.reason}"
+            for r in results
+        )
+        await ctx.success(
+            f"**Reloaded {len(results)} modules in {total * 1000:.1f}ms**"
+            f"```prolog\n{report}```"
+        )
+
+    @decorators.command(
+        aliases=["rc", "reloadstale"],
+        brief="Reload edited modules.",
+        examples="""
+                {0}rc
+                {0}reloadchanged
+                """,
+    )
+    async def reloadchanged(self, ctx):
+        """
+        Usage: {0}reloadchanged
+        Aliases: {0}rc, {0}reloadstale
+        Output:
+            Reloads every cog, utility and
+            setting edited since it was loaded
+            and every module that imports one,
+            with the time each reload took.
+        """
+        await self.reload_modules(ctx)
+
     @decorators.command(
         aliases=["ra"],
         brief="Reload all extensions.",
@@ -222,26 +283,7 @@ class Manager(commands.Cog):
             Reloads all extensions
             in the ./cogs directory.
         """
-        error_collection = []
-        for fname in os.listdir("cogs"):
-            if fname.endswith(".py"):
-                name = fname[:-3]
-                try:
-                    self.bot.reload_extension(f"cogs.{name}")
-                except Exception as e:
-                    error_collection.append(
-                        [fname, utils.traceback_maker(e, advance=False)]
-                    )
-
-        if error_collection:
-            output = "\n".join(
-                [f"**{g[0]}** ```diff\n- {g[1]}```" for g in error_collection]
-            )
-            return await ctx.fail(
-                f"**Failed to reload following extensions.**\n\n{output}"
-            )
-
-        await ctx.success("**Successfully reloaded all extensions.**")
+        await self.reload_modules(ctx, "cogs.")
 
     @decorators.command(
         brief="Reload a utilities module.",
@@ -329,30 +371,10 @@ class Manager(commands.Cog):
             {0}rau
         Output:
             Reloads all extensions in
-            the ./utilties directory.
+            the ./utilties directory
+            and the modules importing them.
         """
-        error_collection = []
-        utilities = [
-            x[:-3] for x in sorted(os.listdir("utilities")) if x.endswith(".py")
-        ]
-        for module in utilities:
-            try:
-                module_name = importlib.import_module(f"utilities.{module}")
-                importlib.reload(module_name)
-            except Exception as e:
-                error_collection.append(
-                    [module, utils.traceback_maker(e, advance=False)]
-                )
-
-        if error_collection:
-            output = "\n".join(
-                [f"**{g[0]}** ```diff\n- {g[1]}```" for g in error_collection]
-            )
-            return await ctx.fail(
-                f"**Failed to reload following utilities.**\n\n{output}"
-            )
-
-        await ctx.success("**Successfully reloaded all utilities.**")
+        await self.reload_modules(ctx, "utilities.")
 
     @decorators.command(
         aliases=["reloadallsettings"],
@@ -371,34 +393,11 @@ class Manager(commands.Cog):
             {0}reloadallsettings
         Output:
             Reloads all extensions in
-            the ./settings directory.
+            the ./settings directory
+            and the modules importing them.
             Excludes database.py.
         """
-        error_collection = []
-        utilities = [
-            x[:-3]
-            for x in sorted(os.listdir("settings"))
-            if x.endswith(".py") and x != "database.py"
-        ]
-        for module in utilities:
-            try:
-                module_name = importlib.import_module(f"settings.{module}")
-                importlib.reload(module_name)
-            except Exception as e:
-                error_collection.append(
-                    [module, utils.traceback_maker(e, advance=False)]
-                )
-
-        if error_collection:
-            output = "\n".join(
-                [f"**{g[0]}** ```diff\n- {g[1]}```" for g in error_collection]
-            )
-            return await ctx.send_or_reply(
-                content=f"Attempted to reload all settings, was able to reload, "
-                f"however the following failed...\n\n{output}",
-            )
-
-        await ctx.success("**Successfully reloaded all settings.**")
+        await self.reload_modules(ctx, "settings.")
 
     @decorators.command(
         aliases=["restart"],
@@ -447,6 +446,37 @@ class Manager(commands.Cog):
     ## Shell Commands ##
     ####################
 
+    async def show_log(self, ctx, path, prefix, options=None):
+        """
+        Pages a log file and its backups newest first,
+        optionally filtered by --grep, --since and --until.
+        """
+        parser = converters.Arguments(add_help=False, allow_abbrev=False)
+        parser.add_argument("--grep", "-g")
+        parser.add_argument("--since", "-s")
+        parser.add_argument("--until", "-u")
+        try:
+            args = parser.parse_args(shlex.split(options or ""))
+            pattern = re.compile(args.grep, re.IGNORECASE) if args.grep else None
+            since = logview.parse_time(args.since) if args.since else None
+            until = logview.parse_time(args.until) if args.until else None
+        except (RuntimeError, ValueError, re.error, commands.BadArgument) as e:
+            return await ctx.fail(str(e))
+
+        log = logview.LogFile(path)
+        if not log.size:
+            return await ctx.fail(f"`{path}` is empty or does not exist.")
+
+        pages = logview.LogPages(log, pattern=pattern, since=since, until=until)
+        source = pagination.LogPageSource(pages, prefix="```" + prefix)
+        p = pagination.MainMenu(source)
+        try:
+            await p.start(ctx, wait=True)
+        except menus.MenuError as e:
+            await ctx.send_or_reply(str(e))
+        finally:
+            await source.close()
+
     @decorators.group(
         aliases=["l"],
         case_insensitive=True,
@@ -467,6 +497,14 @@ class Manager(commands.Cog):
             information|info|i
             tracebacks|traceback|trace|tb|t
             clear|clr|cl
+        Flags:
+            --grep <regex>  Only lines matching the regex
+            --since <time>  Records from this time on
+            --until <time>  Records before this time
+        Notes:
+            Pages start at the newest lines.
+            Times are "YYYY-MM-DD HH:MM:SS"
+            or a duration ago like 2h or 1d12h.
         """
         if not ctx.invoked_subcommand:
             return await ctx.usage("<option>")
@@ -474,25 +512,24 @@ class Manager(commands.Cog):
     @logger.command(
         name="commands", aliases=["cmds"], brief="Show the commands.log file."
     )
-    async def _get_cmds(self, ctx):
+    async def _get_cmds(self, ctx, *, options=None):
         """
-        Usage: {0}logger commands
+        Usage: {0}logger commands [flags]
         Aliases: {0}logger cmds
         Output:
             Starts a pagination session
             showing the commands.log file
         """
-        sh = self.bot.get_command("sh")
-        await ctx.invoke(sh, prefix="prolog", command="cat ./data/logs/commands.log")
+        await self.show_log(ctx, "./data/logs/commands.log", "prolog", options)
 
     @logger.command(
         name="traceback",
         aliases=["tracebacks", "trace", "t", "tb"],
         brief="Show the traceback.log file",
     )
-    async def _traceback(self, ctx):
+    async def _traceback(self, ctx, *, options=None):
         """
-        Usage: {0}logger traceback
+        Usage: {0}logger traceback [flags]
         Aliases:
             {0}logger t
             {0}logger tb
@@ -502,17 +539,16 @@ class Manager(commands.Cog):
             Starts a pagination session
             showing the traceback.log file
         """
-        sh = self.bot.get_command("sh")
-        await ctx.invoke(sh, prefix="prolog", command="cat ./data/logs/traceback.log")
+        await self.show_log(ctx, "./data/logs/traceback.log", "prolog", options)
 
     @logger.command(
         name="info",
         aliases=["i", "information"],
         brief="Show the info.log file.",
     )
-    async def _info(self, ctx):
+    async def _info(self, ctx, *, options=None):
         """
-        Usage: {0}logger info
+        Usage: {0}logger info [flags]
         Aliases:
             {0}logger i
             {0}logger information
@@ -520,17 +556,16 @@ class Manager(commands.Cog):
             Starts a pagination session
             showing the info.log file
         """
-        sh = self.bot.get_command("sh")
-        await ctx.invoke(sh, prefix="prolog", command="cat ./data/logs/info.log")
+        await self.show_log(ctx, "./data/logs/info.log", "prolog", options)
 
     @logger.command(
         name="errors",
         aliases=["err", "error", "stderr", "e"],
         brief="Show the errors.log file.",
     )
-    async def _errors(self, ctx):
+    async def _errors(self, ctx, *, options=None):
         """
-        Usage: {0}logger errors
+        Usage: {0}logger errors [flags]
         Aliases:
             {0}logger e
             {0}logger err
@@ -540,8 +575,7 @@ class Manager(commands.Cog):
             Starts a pagination session
             showing the errors.log file
         """
-        sh = self.bot.get_command("sh")
-        await ctx.invoke(sh, prefix="prolog", command="cat ./data/logs/errors.log")
+        await self.show_log(ctx, "./data/logs/errors.log", "prolog", options)
 
     @logger.command(
         name="clear",
@@ -596,14 +630,17 @@ class Manager(commands.Cog):
             stderr|err|error|errors
             pid|process|processid
             clear|clr|cl
+        Notes:
+            stdout and stderr take the same
+            flags as {0}logger.
         """
         if ctx.invoked_subcommand is None:
             return await ctx.usage("<option>")
 
     @pm2.command(aliases=["out", "output"], brief="View the pm2 stdout file.")
-    async def stdout(self, ctx):
+    async def stdout(self, ctx, *, options=None):
         """
-        Usage: {0}pm2 stdout
+        Usage: {0}pm2 stdout [flags]
         Aliases:
             {0}pm2 out
             {0}pm2 output
@@ -611,11 +648,10 @@ class Manager(commands.Cog):
             Starts a pagination session
             showing the pm2 stdout file.
         """
-        sh = self.bot.get_command("sh")
         pm2dir = os.listdir("./data/pm2/")
         for filename in pm2dir:
             if filename.startswith("out"):
-                await ctx.invoke(sh, prefix="yml", command=f"cat ./data/pm2/{filename}")
+                await self.show_log(ctx, f"./data/pm2/{filename}", "yml", options)
                 return
         else:
             raise commands.BadArgument(f"No stdout file currently exists.")
@@ -624,9 +660,9 @@ class Manager(commands.Cog):
         aliases=["err", "error", "errors"],
         brief="View the pm2 stderr file",
     )
-    async def stderr(self, ctx):
+    async def stderr(self, ctx, *, options=None):
         """
-        Usage: {0}pm2 stderr
+        Usage: {0}pm2 stderr [flags]
         Aliases:
             {0}pm2 err
             {0}pm2 error
@@ -635,11 +671,10 @@ class Manager(commands.Cog):
             Starts a pagination session
             showing the pm2 stderr file.
         """
-        sh = self.bot.get_command("sh")
         pm2dir = os.listdir("./data/pm2/")
         for filename in pm2dir:
             if filename.startswith("err"):
-                await ctx.invoke(sh, prefix="yml", command=f"cat ./data/pm2/{filename}")
+                await self.show_log(ctx, f"./data/pm2/{filename}", "yml", options)
                 return
         else:
             raise commands.BadArgument(f"No stderr file currently exists.")
@@ -789,29 +824,66 @@ class Manager(commands.Cog):
     )
     async def sql(self, ctx, *, query: str):
         """
-        Usage: {0}sql <query>
+        Usage: {0}sql [flags] <query>
         Output:
             Shows results in rst format.
             Sends traceback if query failed.
-        """
+        Flags:
+            --explain, -e     Show the EXPLAIN ANALYZE plan tree
+            --timing, -t [n]  Run n times (default 5) and show timings
+            --limit, -l <n>   Fetch at most n rows
+            --cursor, -c      Page rows from a server side cursor
+        Notes:
+            Flags go before the query. --explain and
+            --timing roll back anything the query did.
+            --cursor reads in a read only transaction
+            and only fetches rows as pages are shown.
+            --limit needs a single statement.
+        """
+        parser = converters.Arguments(add_help=False, allow_abbrev=False)
+        parser.add_argument("--explain", "-e", action="store_true")
+        parser.add_argument("--timing", "-t", type=int, nargs="?", const=5)
+        parser.add_argument("--limit", "-l", type=int)
+        parser.add_argument("--cursor", "-c", action="store_true")
+        known = ("--explain", "-e", "--timing", "-t", "--limit", "-l", "--cursor", "-c")
+        flags, query = converters.split_flags(query, known)
+        try:
+            args = parser.parse_args(flags)
+        except RuntimeError as e:
+            return await ctx.fail(str(e))
 
-        if query is None:
+        query = utils.cleanup_code(query)
+        if not query:
             return await ctx.send_or_reply(
-                content=f"Usage: `{ctx.prefix}sql <query>`",
+                content=f"Usage: `{ctx.prefix}sql [flags] <query>`",
             )
+        if args.limit is not None and args.limit < 1:
+            return await ctx.fail("The row limit must be positive.")
+        if args.timing is not None and not 1 <= args.timing <= 100:
+            return await ctx.fail("Time between 1 and 100 runs.")
 
-        query = utils.cleanup_code(query)
+        if args.cursor:
+            return await self.sql_cursor(ctx, query, args.limit or sqlview.MAX_ROWS)
+        if args.explain or args.timing:
+            return await self.sql_diagnose(ctx, query, args.explain, args.timing)
 
         is_multistatement = query.count(";") > 1
+        if is_multistatement and args.limit:
+            return await ctx.fail("--limit only applies to a single statement.")
         if is_multistatement:
             # fetch does not support multiple statements
             strategy = self.bot.cxn.execute
         else:
             strategy = self.bot.cxn.fetch
 
+        more = False
         try:
             start = time.perf_counter()
-            results = await strategy(query)
+            if args.limit:
+                async with self.bot.cxn.acquire() as conn:
+                    results, more = await sqlview.fetch_limited(conn, query, args.limit)
+            else:
+                results = await strategy(query)
             dt = (time.perf_counter() - start) * 1000.0
         except Exception:
             return await ctx.send_or_reply(
@@ -822,19 +894,69 @@ class Manager(commands.Cog):
         if is_multistatement or rows == 0:
             return await ctx.send_or_reply(content=f"`{dt:.2f}ms: {results}`")
 
-        headers = list(results[0].keys())
-        table = formatting.TabularData()
-        table.set_columns(headers)
-        table.add_rows(list(r.values()) for r in results)
-        render = table.render()
-
-        fmt = f"```sml\n{render}\n```\n*Returned {formatting.plural(rows):row} in {dt:.2f}ms*"
+        render = sqlview.render_rows(results)
+        fmt = f"```sml\n{render}\n```\n*Returned {formatting.plural(rows):row} in {dt:.2f}ms"
+        if more:
+            fmt += f", stopped at the limit of {args.limit:,}"
+        fmt += "*"
         if len(fmt) > 2000:
             fp = io.BytesIO(fmt.encode("utf-8"))
             await ctx.send_or_reply(file=discord.File(fp, "results.sml"))
         else:
             await ctx.send_or_reply(content=fmt)
 
+    async def sql_diagnose(self, ctx, query, explain, runs):
+        """Plan tree and repeated timings of a query."""
+        lines = []
+        try:
+            async with self.bot.cxn.acquire() as conn:
+                if runs:
+                    timings = await sqlview.time_query(conn, query, runs)
+                if explain:
+                    plan = await sqlview.explain(conn, query)
+        except Exception:
+            return await ctx.send_or_reply(
+                content=f"```py\n{traceback.format_exc()}\n```",
+            )
+
+        if runs:
+            ordered = sorted(timings)
+            lines.append(
+                f"{formatting.plural(runs):run}: first {timings[0]:.2f}ms, "
+                f"min {ordered[0]:.2f}ms, median {ordered[len(ordered) // 2]:.2f}ms, "
+                f"max {ordered[-1]:.2f}ms"
+            )
+        if explain:
+            if lines:
+                lines.append("")
+            lines.extend(sqlview.render_plan(plan))
+
+        p = pagination.MainMenu(
+            pagination.TextPageSource("\n".join(lines), prefix="```prolog")
+        )
+        try:
+            await p.start(ctx)
+        except menus.MenuError as e:
+            await ctx.send_or_reply(str(e))
+
+    async def sql_cursor(self, ctx, query, limit):
+        """Pages a query's rows straight off a server side cursor."""
+        pages = sqlview.CursorPages(self.bot.cxn, query, limit=limit)
+        try:
+            await pages.open()
+        except Exception:
+            return await ctx.send_or_reply(
+                content=f"```py\n{traceback.format_exc()}\n```",
+            )
+
+        p = pagination.MainMenu(pagination.CursorPageSource(pages))
+        try:
+            # Wait so the connection is held only while the menu runs
+            await p.start(ctx, wait=True)
+        except menus.MenuError as e:
+            await ctx.send_or_reply(str(e))
+        finally:
+            await pages.close()
 
     @decorators.command(brief="Show info on a db table.")
     async def table(self, ctx, *, table_name: str = None):
@@ -856,6 +978,50 @@ class Manager(commands.Cog):
         render = table.render()
 
         fmt = f"```\n{render}\n```"
+        summary = await self.table_summary(table_name)
+        if summary:
+            fmt += f"\n*{summary}*"
+        if len(fmt) > 2000:
+            fp = io.BytesIO(fmt.encode("utf-8"))
+            await ctx.send_or_reply(
+                content="Too many results...",
+                file=discord.File(fp, "results.txt"),
+            )
+        else:
+            await ctx.send_or_reply(content=fmt)
+
+    async def table_summary(self, table_name):
+        """One line of size growth, row and scan counts for a table."""
+        async with self.bot.cxn.acquire() as conn:
+            stats = await pgstats.table(conn, table_name)
+            if stats is None:
+                return None
+            growth = [
+                (days, await pgstats.growth(conn, days, relation=table_name))
+                for days in (1, 7, 30)
+            ]
+        changes = ", ".join(
+            f"{pgstats.change(g, table_name)} {days}d" for days, g in growth
+        )
+        summary = (
+            f"{pgstats.pretty_size(stats['total_bytes'])} ({changes}) | "
+            f"{stats['live_rows']:,} rows, {stats['dead_rows']:,} dead | "
+            f"{stats['seq_scan']:,} seq and {stats['idx_scan']:,} index scans"
+        )
+        flags = pgstats.advise(stats)
+        if flags:
+            summary += f" | {self.bot.emote_dict['warn']} {', '.join(flags)}"
+        return summary
+
+    async def send_table(self, ctx, headers, rows, footer=None):
+        table = formatting.TabularData()
+        table.set_columns(headers)
+        table.add_rows(rows)
+        render = table.render()
+
+        fmt = f"```\n{render}\n```"
+        if footer:
+            fmt += f"\n*{footer}*"
         if len(fmt) > 2000:
             fp = io.BytesIO(fmt.encode("utf-8"))
             await ctx.send_or_reply(
@@ -909,6 +1075,11 @@ class Manager(commands.Cog):
             types: Show general info on postgres datatypes
             i|info: Show all data on database tables
             r|relation|relations: Show the database relations
+            q|queries: Show the slowest queries
+        Notes:
+            Sizes and scan counts are snapshotted every
+            30 minutes and kept for 30 days, growth is
+            measured across those snapshots.
         """
         if ctx.invoked_subcommand is None:
             return await ctx.usage(ctx.command.signature)
@@ -927,6 +1098,14 @@ class Manager(commands.Cog):
                 return await ctx.send_or_reply(
                     content=f"{self.bot.emote_dict['failed']} Table `{table_name}` does not exist.",
                 )
+            footer = None
+            growth = [(days, await pgstats.growth(self.bot.cxn, days)) for days in (1, 7, 30)]
+            if growth[-1][1]:
+                # Tables account for the database bar the catalogs
+                footer = "Tables " + ", ".join(
+                    f"{pgstats.pretty_size(sum(a - b for b, a in g.values()), sign=True)} {days}d"
+                    for days, g in growth
+                )
         else:
             query = """SELECT pg_size_pretty( pg_total_relation_size($1));"""
             try:
@@ -935,22 +1114,10 @@ class Manager(commands.Cog):
                 return await ctx.send_or_reply(
                     content=f"{self.bot.emote_dict['failed']} Table `{table_name}` does not exist.",
                 )
+            footer = await self.table_summary(table_name)
 
         headers = list(results[0].keys())
-        table = formatting.TabularData()
-        table.set_columns(headers)
-        table.add_rows(list(r.values()) for r in results)
-        render = table.render()
-
-        fmt = f"```\n{render}\n```"
-        if len(fmt) > 2000:
-            fp = io.BytesIO(fmt.encode("utf-8"))
-            await ctx.send_or_reply(
-                content="Too many results...",
-                file=discord.File(fp, "results.txt"),
-            )
-        else:
-            await ctx.send_or_reply(content=fmt)
+        await self.send_table(ctx, headers, (list(r.values()) for r in results), footer)
 
     @postgres.command(aliases=["largest"], brief="Get the largest tables.")
     async def lb(self, ctx):
@@ -1000,22 +1167,16 @@ class Manager(commands.Cog):
                             WHERE table_schema = 'public'
                             ORDER BY total_bytes DESC;"""
         results = await self.bot.cxn.fetch(query)
-
-        headers = list(results[0].keys())
-        table = formatting.TabularData()
-        table.set_columns(headers)
-        table.add_rows(list(r.values()) for r in results)
-        render = table.render()
-
-        fmt = f"```\n{render}\n```"
-        if len(fmt) > 2000:
-            fp = io.BytesIO(fmt.encode("utf-8"))
-            await ctx.send_or_reply(
-                content="Too many results...",
-                file=discord.File(fp, "results.txt"),
-            )
-        else:
-            await ctx.send_or_reply(content=fmt)
+        day = await pgstats.growth(self.bot.cxn, 1)
+        week = await pgstats.growth(self.bot.cxn, 7)
+
+        headers = list(results[0].keys()) + ["1d", "7d"]
+        rows = (
+            list(r.values())
+            + [pgstats.change(day, r["table_name"]), pgstats.change(week, r["table_name"])]
+            for r in results
+        )
+        await self.send_table(ctx, headers, rows)
 
     @postgres.command(aliases=["t"], brief="Show some info on postgres datatypes.")
     async def types(self, ctx):
@@ -1042,74 +1203,110 @@ class Manager(commands.Cog):
 
     @postgres.command(aliases=["info"], brief="Show some info on postgres table sizes.")
     async def i(self, ctx):
-        """Runs a query describing the table schema."""
-        query = """ 
-                SELECT *, pg_size_pretty(total_bytes) AS total
-                    , pg_size_pretty(index_bytes) AS index
-                    , pg_size_pretty(toast_bytes) AS toast
-                    , pg_size_pretty(table_bytes) AS table
-                FROM (
-                SELECT *, total_bytes-index_bytes-coalesce(toast_bytes,0) AS table_bytes FROM (
-                    SELECT c.oid,nspname AS table_schema, relname AS table_name
-                            , c.reltuples AS row_estimate
-                            , pg_total_relation_size(c.oid) AS total_bytes
-                            , pg_indexes_size(c.oid) AS index_bytes
-                            , pg_total_relation_size(reltoastrelid) AS toast_bytes
-                        FROM pg_class c
-                        LEFT JOIN pg_namespace n ON n.oid = c.relnamespace
-                        WHERE relkind = 'r'
-                ) a
-                ) a
-                WHERE table_schema = 'public'; 
-                """
-        results = await self.bot.cxn.fetch(query)
-
-        headers = list(results[0].keys())
-        table = formatting.TabularData()
-        table.set_columns(headers)
-        table.add_rows(list(r.values()) for r in results)
-        render = table.render()
-
-        fmt = f"```\n{render}\n```"
-        if len(fmt) > 2000:
-            fp = io.BytesIO(fmt.encode("utf-8"))
-            await ctx.send_or_reply(
-                content="Too many results...",
-                file=discord.File(fp, "results.txt"),
+        """
+        Usage: {0}postgres info
+        Alias: {0}postgres i
+        Output:
+            Size, rows, estimated bloat, scans and
+            7 day growth of every table. Tables read
+            mostly by large sequential scans are
+            flagged for an index and tables with many
+            dead rows for a VACUUM.
+        """
+        async with self.bot.cxn.acquire() as conn:
+            snap = await pgstats.snapshot(conn)
+            week = await pgstats.growth(conn, 7)
+
+        tables = sorted(snap["tables"], key=lambda t: t["total_bytes"], reverse=True)
+        headers = ["table", "total", "rows", "dead", "bloat", "seq", "idx", "7d", "flags"]
+        rows = [
+            (
+                t["relation"],
+                pgstats.pretty_size(t["total_bytes"]),
+                f"{t['live_rows']:,}",
+                f"{t['dead_rows']:,}",
+                pgstats.pretty_size(pgstats.bloat(t)),
+                f"{t['seq_scan']:,}",
+                f"{t['idx_scan']:,}",
+                pgstats.change(week, t["relation"]),
+                ", ".join(pgstats.advise(t)),
             )
-        else:
-            await ctx.send_or_reply(content=fmt)
+            for t in tables
+        ]
+        flagged = sum(bool(row[-1]) for row in rows)
+        footer = f"{formatting.plural(flagged):table} flagged" if flagged else None
+        await self.send_table(ctx, headers, rows, footer)
 
     @postgres.command(
         aliases=["relation", "relations"], brief="Show some info on postgres relations."
     )
     async def r(self, ctx):
         """Runs a query describing the table schema."""
+        # Sized as relation_stats sizes them, so 7d grows from the same measure
         query = """ 
-                SELECT nspname || '.' || relname AS "relation",
-                    pg_size_pretty(pg_relation_size(C.oid)) AS "size"
-                FROM pg_class C
-                LEFT JOIN pg_namespace N ON (N.oid = C.relnamespace)
-                WHERE nspname NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
-                ORDER BY pg_relation_size(C.oid) DESC;
+                SELECT relation, pg_size_pretty(bytes) AS "size"
+                FROM (
+                    SELECT nspname || '.' || relname AS "relation",
+                        CASE WHEN C.relkind = 'i' THEN pg_relation_size(C.oid)
+                        ELSE pg_total_relation_size(C.oid) END AS bytes
+                    FROM pg_class C
+                    LEFT JOIN pg_namespace N ON (N.oid = C.relnamespace)
+                    WHERE nspname NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
+                ) r
+                ORDER BY bytes DESC;
                 """
         results = await self.bot.cxn.fetch(query)
+        week = await pgstats.growth(self.bot.cxn, 7, kind=None)
+        indexes = await self.bot.cxn.fetch(pgstats.INDEXES)
+        unused = {i["relation"] for i in indexes if not i["idx_scan"] and not i["is_unique"]}
 
-        headers = list(results[0].keys())
-        table = formatting.TabularData()
-        table.set_columns(headers)
-        table.add_rows(list(r.values()) for r in results)
-        render = table.render()
+        def row(record):
+            name = record["relation"].split(".", 1)[-1]
+            flag = "unused index" if name in unused else ""
+            return [record["relation"], record["size"], pgstats.change(week, name), flag]
 
-        fmt = f"```\n{render}\n```"
-        if len(fmt) > 2000:
-            fp = io.BytesIO(fmt.encode("utf-8"))
-            await ctx.send_or_reply(
-                content="Too many results...",
-                file=discord.File(fp, "results.txt"),
+        await self.send_table(
+            ctx, ["relation", "size", "7d", "flags"], (row(r) for r in results)
+        )
+
+    @postgres.command(aliases=["q"], brief="Show the slowest queries.")
+    async def queries(self, ctx):
+        """
+        Usage: {0}postgres queries
+        Alias: {0}postgres q
+        Output:
+            The queries with the most total execution
+            time and how many more calls they took
+            over the last day.
+        Notes:
+            Needs the pg_stat_statements extension.
+        """
+        async with self.bot.cxn.acquire() as conn:
+            results = await pgstats.statements(conn, limit=10)
+            if results is None:
+                return await ctx.fail("The `pg_stat_statements` extension is not available.")
+            query = """
+                    SELECT DISTINCT ON (queryid) queryid, calls
+                    FROM query_stats
+                    WHERE taken_at >= (NOW() AT TIME ZONE 'utc') - INTERVAL '1 day'
+                    ORDER BY queryid, taken_at;
+                    """
+            earlier = {r["queryid"]: r["calls"] for r in await conn.fetch(query)}
+
+        rows = []
+        for r in results:
+            text = " ".join(r["query"].split())
+            calls = earlier.get(r["queryid"])
+            rows.append(
+                (
+                    text if len(text) <= 50 else text[:49] + "…",
+                    f"{r['calls']:,}",
+                    "n/a" if calls is None else f"+{r['calls'] - calls:,}",
+                    f"{r['total_ms']:,.0f}ms",
+                    f"{r['total_ms'] / max(r['calls'], 1):,.2f}ms",
+                )
             )
-        else:
-            await ctx.send_or_reply(content=fmt)
+        await self.send_table(ctx, ["query", "calls", "1d", "total", "mean"], rows)
 
     async def run_process(self, command):
         try:
@@ -1134,22 +1331,36 @@ class Manager(commands.Cog):
     )
     async def sh(self, ctx, prefix=None, *, command):
         """Runs a shell command."""
+        process = shell.ShellProcess(command)
+        runner = self.bot.loop.create_task(process.run())
 
+        # Quick commands finish before the first page is sent
         async with ctx.typing():
-            stdout, stderr = await self.run_process(command)
-
-        if stderr:
-            text = f"stdout:\n{stdout}\nstderr:\n{stderr}"
-        else:
-            text = stdout
+            await asyncio.wait([runner], timeout=2.0)
+        if runner.done() and runner.exception():
+            return await ctx.fail(str(runner.exception()))
 
         pages = pagination.MainMenu(
-            pagination.TextPageSource(text, prefix="```" + prefix)
+            pagination.StreamPageSource(process, prefix="```" + prefix)
         )
         try:
             await pages.start(ctx)
         except menus.MenuError as e:
-            await ctx.send_or_reply(str(e))
+            process.kill()
+            return await ctx.send_or_reply(str(e))
+
+        # Refresh the page as output arrives, edits are throttled
+        # to the interval to stay clear of the rate limit.
+        shown = (len(process.output), process.output.lines, process.done)
+        while not runner.done():
+            await asyncio.wait([runner], timeout=2.5)
+            if not pages.is_running():  # Menu was closed or timed out
+                process.kill()
+                break
+            state = (len(process.output), process.output.lines, process.done)
+            if state != shown:
+                shown = state
+                await pages.refresh()
 
     @decorators.command(
         brief="Repeat a command.",
@@ -1160,6 +1371,9 @@ class Manager(commands.Cog):
         Usage: {0}do <times> <command>
         Output:
             Repeats a command a specified number of times.
+        Notes:
+            Runs are sequential, use {0}loadtest
+            for concurrent load.
         """
         msg = copy.copy(ctx.message)
         msg.content = ctx.prefix + command
@@ -1173,6 +1387,84 @@ class Manager(commands.Cog):
             except ValueError:
                 return await ctx.send_or_reply(content=f"Invalid Context")
 
+    @decorators.command(
+        aliases=["loadgen", "stress"],
+        brief="Load test a command.",
+    )
+    async def loadtest(self, ctx, *, options):
+        """
+        Usage: {0}loadtest [flags] <command>
+        Aliases: {0}loadgen, {0}stress
+        Output:
+            Sends copies of a command through
+            process_commands at a fixed rate and
+            reports throughput, latency percentiles,
+            pool waits and event loop lag.
+        Flags:
+            --rate <n>         Messages per second (default 5)
+            --concurrency <n>  Most in flight at once (default 5)
+            --duration <secs>  How long to send for (default 10)
+            --mock             Suppress HTTP and DB like elapse
+        Notes:
+            Messages come from you unless --mock
+            is passed, then from random members of
+            the current server, so owner only
+            commands fail their checks.
+            Without --mock every reply is really
+            sent, keep the rate low on live channels.
+            benchmarks/load.py runs the same load
+            offline across many guilds.
+        """
+        parser = converters.Arguments(add_help=False, allow_abbrev=False)
+        parser.add_argument("--rate", type=float, default=5.0)
+        parser.add_argument("--concurrency", type=int, default=5)
+        parser.add_argument("--duration", type=float, default=10.0)
+        parser.add_argument("--mock", action="store_true")
+        known = ("--rate", "--concurrency", "--duration", "--mock")
+        # The command is passed on raw so its own quoting survives
+        flags, command = converters.split_flags(options, known)
+        try:
+            args = parser.parse_args(flags)
+        except RuntimeError as e:
+            return await ctx.fail(str(e))
+        if not command:
+            return await ctx.usage("[flags] <command>")
+        if args.rate <= 0 or args.concurrency < 1 or args.rate * args.duration > 10000:
+            return await ctx.fail("Keep the rate positive and under 10,000 messages in total.")
+
+        content = ctx.prefix + command
+        authors = [ctx.author]
+        if args.mock and ctx.guild:
+            # Live runs never act as other people, mocked ones spread
+            # across members like benchmarks/load.py
+            authors = [m for m in ctx.guild.members if not m.bot] or authors
+
+        def make_message():
+            msg = copy.copy(ctx.message)
+            msg.author = random.choice(authors)
+            msg.content = content
+            return msg
+
+        handler = None
+        if args.mock:
+
+            async def handler(msg):
+                new_ctx = mock_context(await self.bot.get_context(msg, cls=type(ctx)))
+                await self.bot.invoke(new_ctx)
+
+        generator = loadgen.LoadGenerator(
+            self.bot,
+            make_message,
+            rate=args.rate,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            handler=handler,
+        )
+        async with ctx.typing():
+            report = await generator.run()
+        lines = "\n".join(loadgen.format_report(report))
+        await ctx.send_or_reply(f"```prolog\n{lines}```")
+
     @decorators.command(brief="Show bot threadinfo.")
     async def threadinfo(self, ctx):
         """
@@ -1194,6 +1486,104 @@ class Manager(commands.Cog):
         except menus.MenuError as e:
             await ctx.send(e)
 
+    @decorators.command(
+        aliases=["loopwatch", "blocking"],
+        brief="Show event loop lag and blocking code.",
+    )
+    async def looplag(self, ctx, option=None):
+        """
+        Usage: {0}looplag [reset]
+        Aliases: {0}loopwatch, {0}blocking
+        Output:
+            Event loop scheduling lag percentiles
+            and the code locations that blocked
+            the loop the longest.
+        Notes:
+            Pass reset to clear the
+            blocking samples collected so far.
+        """
+        watch = self.bot.loop_watchdog
+        if option == "reset":
+            watch.reset()
+            return await ctx.success("Cleared loop blocking samples.")
+
+        msg = "```yaml\n"
+        msg += "Window:     p50      p95      p99      max\n"
+        for window in ("1m", "5m", "1h"):
+            stats = self.bot.latencies.summary("loop", window)
+            msg += "{:<6}: {:>6.1f}ms {:>6.1f}ms {:>6.1f}ms {:>6.0f}ms\n".format(
+                window, stats["p50"], stats["p95"], stats["p99"], stats["max"]
+            )
+        msg += "```"
+        msg += f"**Stalls over {watch.threshold * 1000:.0f}ms: {watch.stalls:,}**\n"
+
+        if not watch.blocked:
+            return await ctx.send_or_reply(msg)
+
+        entries = []
+        for location, samples in watch.blocked.most_common():
+            filename, lineno, name = location
+            entries.append(
+                f"{filename}:{lineno} in {name}\n"
+                f"~{watch.blocked_seconds(location):.2f}s blocked ({samples} samples)\n"
+                f"{watch.stacks[location]}"
+            )
+        await ctx.send_or_reply(msg)
+        p = pagination.MainMenu(
+            pagination.TextPageSource("\n".join(entries), prefix="```prolog")
+        )
+        try:
+            await p.start(ctx)
+        except menus.MenuError as e:
+            await ctx.send_or_reply(e)
+
+    @decorators.command(
+        aliases=["dispatchprofile", "eventprof"],
+        brief="Profile gateway event handlers.",
+    )
+    async def eventprofile(self, ctx, option=None):
+        """
+        Usage: {0}eventprofile [on|off|reset|calls|errors|max]
+        Aliases: {0}dispatchprofile, {0}eventprof
+        Output:
+            Call counts, errors and timings for
+            every event handler while profiling is on.
+        Notes:
+            Profiling is off by default.
+            Results are sorted by total time
+            unless calls, errors or max is passed.
+        """
+        profile = self.bot.dispatch_profiler
+        if option == "on":
+            profile.enable()
+            return await ctx.success("Event handler profiling enabled.")
+        if option == "off":
+            profile.disable()
+            return await ctx.success("Event handler profiling disabled.")
+        if option == "reset":
+            profile.reset()
+            return await ctx.success("Cleared event handler profiles.")
+
+        sort = option if option in ("calls", "errors", "max") else "total"
+        rows = profile.report(sort)
+        if not rows:
+            state = "on" if profile.enabled else "off"
+            return await ctx.fail(f"No handler profiles yet. Profiling is {state}.")
+
+        output = "\n".join(
+            "{event} -> {handler}\n"
+            "  calls {calls:,} errors {errors:,} total {total:,.1f}ms\n"
+            "  p50 {p50:.2f}ms p95 {p95:.2f}ms p99 {p99:.2f}ms max {max:.2f}ms".format(
+                **row
+            )
+            for row in rows
+        )
+        p = pagination.MainMenu(pagination.TextPageSource(output, prefix="```prolog"))
+        try:
+            await p.start(ctx)
+        except menus.MenuError as e:
+            await ctx.send_or_reply(e)
+
     @decorators.command(brief="Show bot health.")
     async def bothealth(self, ctx):
         """
@@ -1212,15 +1602,20 @@ class Manager(commands.Cog):
 
         embed = discord.Embed(title="Bot Health Report", colour=HEALTHY)
 
+        monitor = self.bot.health
+        sample = monitor.latest()
+
+        def trend(signal):
+            return f"`{hostmetrics.sparkline(monitor.trend(signal))}`"
+
         # Check the connection pool health.
         pool = self.bot.cxn
-        total_waiting = len(pool._queue._getters)
         current_generation = pool._generation
 
         description = [
-            f"Total `Pool.acquire` Waiters: {total_waiting}",
+            f"Total `Pool.acquire` Waiters: {sample['pool_waiters']} {trend('pool_waiters')}",
             f"Current Pool Generation: {current_generation}",
-            f"Connections In Use: {len(pool._holders) - pool._queue.qsize()}",
+            f"Connections In Use: {sample['pool_in_use']} {trend('pool_in_use')}",
         ]
 
         questionable_connections = 0
@@ -1258,29 +1653,60 @@ class Manager(commands.Cog):
             if cogs_directory in repr(t) or tasks_directory in repr(t)
         ]
 
-        bad_inner_tasks = ", ".join(
-            hex(id(t)) for t in inner_tasks if t.done() and t._exception is not None
-        )
+        # all_tasks only lists pending tasks, the monitor counts failures as they end
+        bad_inner_tasks = monitor.failures
         total_warnings += bool(bad_inner_tasks)
         embed.add_field(
             name="Inner Tasks",
-            value=f'Total: {len(inner_tasks)}\nFailed: {bad_inner_tasks or "None"}',
+            value=f"Total: {len(inner_tasks)}\nFailed: {bad_inner_tasks or 'None'}",
         )
         embed.add_field(
-            name="Events Waiting", value=f"Total: {len(event_tasks)}", inline=False
+            name="Events Waiting",
+            value=f"Total: {len(event_tasks)} {trend('event_tasks')}",
+            inline=False,
         )
 
-        memory_usage = self.process.memory_full_info().uss / 1024 ** 2
-        cpu_usage = self.process.cpu_percent() / psutil.cpu_count()
+        host = self.bot.host_metrics
+        sample = host.latest()
+        memory_usage = sample.uss / 1024 ** 2
+        cpu_usage = sample.process_cpu
+        memory_trend = hostmetrics.sparkline(host.trend("uss"))
+        cpu_trend = hostmetrics.sparkline(host.trend("process_cpu"))
         embed.add_field(
             name="Process",
-            value=f"{memory_usage:.2f} MiB\n{cpu_usage:.2f}% CPU",
+            value=f"{memory_usage:.2f} MiB `{memory_trend}`\n{cpu_usage:.2f}% CPU `{cpu_trend}`",
             inline=False,
         )
 
+        # The maintained counts, popdrift rebuilds them to check for drift
+        population = self.bot.population.snapshot()
+        description.append(
+            f"Population: {population['members']:,} members "
+            f"({population['humans']:,} humans, {population['bots']:,} bots) "
+            f"in {population['guilds']:,} servers"
+        )
+
+        mutual_usage = self.bot.mutual_index.memory_usage()
+        description.append(
+            f"Mutual Guild Index: {mutual_usage['users']:,} users, "
+            f"{mutual_usage['bytes'] / 1024 ** 2:.2f} MiB"
+        )
+
         global_rate_limit = not self.bot.http._global_over.is_set()
         description.append(f"Global Rate Limit: {global_rate_limit}")
 
+        alerts = [
+            "{} (started {})".format(
+                monitor.describe(name),
+                utils.timeago(datetime.timedelta(seconds=time.time() - started)),
+            )
+            for name, started in monitor.alerts.items()
+        ]
+        total_warnings += len(alerts)
+        embed.add_field(
+            name="Alerts", value="\n".join(alerts) or "None", inline=False
+        )
+
         if global_rate_limit or total_warnings >= 9:
             embed.colour = UNHEALTHY
 
@@ -1288,6 +1714,24 @@ class Manager(commands.Cog):
         embed.description = "\n".join(description)
         await ctx.send_or_reply(embed=embed)
 
+    @decorators.command(brief="Check population counts for drift.")
+    async def popdrift(self, ctx):
+        """
+        Usage: {0}popdrift
+        Output:
+            Rebuilds the population counters from
+            the member cache and shows any that
+            had drifted from the maintained ones.
+        Notes:
+            Walks every cached member on the event
+            loop and replaces the maintained counts.
+        """
+        drift = self.bot.population.verify()
+        if not drift:
+            return await ctx.success("No population counters had drifted.")
+        lines = "\n".join(f"{k:<15} {a:,} -> {b:,}" for k, (a, b) in drift.items())
+        await ctx.send_or_reply(f"```prolog\n{lines}```")
+
     @decorators.command(aliases=["perf", "elapsed"], brief="Time a command response.")
     async def elapse(self, ctx, *, command):
         """Checks the timing of a command, attempting to suppress HTTP and DB calls."""
@@ -1295,12 +1739,7 @@ class Manager(commands.Cog):
         msg = copy.copy(ctx.message)
         msg.content = ctx.prefix + command
 
-        new_ctx = await self.bot.get_context(msg, cls=type(ctx))
-        new_ctx._db = PerformanceMocker()
-
-        # Intercepts the Messageable interface a bit
-        new_ctx._state = PerformanceMocker()
-        new_ctx.channel = PerformanceMocker()
+        new_ctx = mock_context(await self.bot.get_context(msg, cls=type(ctx)))
 
         if new_ctx.command is None:
             return await ctx.send_or_reply(content="No command found")
@@ -1527,6 +1966,19 @@ class Manager(commands.Cog):
                     await ctx.send(e)
 
 
+def mock_context(ctx):
+    """
+    Suppresses a context's HTTP and DB calls for timing.
+    Shared by elapse and the offline benchmarks.
+    """
+    ctx._db = PerformanceMocker()
+
+    # Intercepts the Messageable interface a bit
+    ctx._state = PerformanceMocker()
+    ctx.channel = PerformanceMocker()
+    return ctx
+
+
 class PerformanceMocker:
     """A mock object that can also be used in await expressions."""
 
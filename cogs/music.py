@@ -13,6 +13,7 @@ from settings import constants
 from utilities import utils
 from utilities import decorators
 from utilities import exceptions
+from utilities import reactions
 
 URL_REGEX = r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*(),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+"
 OPTIONS = {
@@ -151,12 +152,8 @@ class Player(wavelink.Player):
             await self.start_playback()
 
     async def choose_track(self, ctx, tracks):
-        def _check(r, u):
-            return (
-                r.emoji in OPTIONS.keys()
-                and u == ctx.author
-                and r.message.id == msg.id
-            )
+        def _check(payload):
+            return str(payload.emoji) in OPTIONS.keys() and payload.user_id == ctx.author.id
 
         embed = discord.Embed(
             title="Choose a song",
@@ -173,17 +170,20 @@ class Player(wavelink.Player):
         embed.set_footer(text=f"Invoked by {ctx.author.display_name}", icon_url=ctx.author.avatar_url)
 
         msg = await ctx.send(embed=embed)
-        for emoji in list(OPTIONS.keys())[:min(len(tracks), len(OPTIONS))]:
-            await msg.add_reaction(emoji)
+        route = self.bot.reaction_router.register(msg.id, _check, events=("raw_reaction_add",))
+        seeding = reactions.seed(msg, list(OPTIONS.keys())[:min(len(tracks), len(OPTIONS))])
 
         try:
-            reaction, _ = await self.bot.wait_for("reaction_add", timeout=60.0, check=_check)
+            payload = await route.wait(60.0)
         except asyncio.TimeoutError:
             await msg.delete()
             await ctx.message.delete()
         else:
             await msg.delete()
-            return tracks[OPTIONS[reaction.emoji]]
+            return tracks[OPTIONS[str(payload.emoji)]]
+        finally:
+            self.bot.reaction_router.unregister(route)
+            seeding.cancel()
 
     async def start_playback(self):
         await self.play(self.queue.current_track)
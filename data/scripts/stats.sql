@@ -17,4 +17,34 @@ CREATE TABLE IF NOT EXISTS botstats (
     dnd REAL DEFAULT 0 NOT NULL,
     offline REAL DEFAULT 0 NOT NULL,
     startdate timestamp without time zone default (now() at time zone 'utc')
-);
\ No newline at end of file
+);
+
+CREATE TABLE IF NOT EXISTS relation_stats (
+    taken_at TIMESTAMP,
+    relation TEXT,
+    parent TEXT,
+    kind TEXT,
+    total_bytes BIGINT,
+    index_bytes BIGINT,
+    toast_bytes BIGINT,
+    live_rows BIGINT,
+    dead_rows BIGINT,
+    bloat_bytes BIGINT,
+    seq_scan BIGINT,
+    seq_tup_read BIGINT,
+    idx_scan BIGINT,
+    last_vacuum TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS relation_stats_idx ON relation_stats(relation, taken_at);
+
+CREATE TABLE IF NOT EXISTS query_stats (
+    taken_at TIMESTAMP,
+    queryid BIGINT,
+    query TEXT,
+    calls BIGINT,
+    total_ms DOUBLE PRECISION,
+    rows BIGINT
+);
+
+CREATE INDEX IF NOT EXISTS query_stats_idx ON query_stats(taken_at);
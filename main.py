@@ -15,7 +15,7 @@ from discord.ext import commands, tasks
 from logging.handlers import RotatingFileHandler
 
 from settings import database, constants
-from utilities import utils, override
+from utilities import utils, override, health, indexes, hostmetrics, latency, modgraph, pgstats, population, profiler, reactions, sourcestats, timeseries, watchdog
 
 MAX_LOGGING_BYTES = 32 * 1024 * 1024  # 32 MiB
 COGS = [x[:-3] for x in sorted(os.listdir("././cogs")) if x.endswith(".py")]
@@ -119,6 +119,8 @@ class Candybot(commands.AutoShardedBot):
         allowed_mentions = discord.AllowedMentions(
             roles=False, everyone=False, users=True, replied_user=True
         )
+        # Set first, commands.Bot.__init__ adds the help command
+        self.command_index = indexes.CommandIndex(self)
         super().__init__(
             allowed_mentions=allowed_mentions,
             command_prefix=get_prefixes,
@@ -131,15 +133,32 @@ class Candybot(commands.AutoShardedBot):
         self.command_stats = collections.Counter()
         self.constants = constants
         self.cxn = cxn
+        self.dispatch_profiler = profiler.DispatchProfiler(self)
         self.dregex = re.compile(
             r"(?:https?://)?discord(?:app)?\.(?:com/invite|gg)/[a-zA-Z0-9]+/?"
         )  # discord invite regex
+        self.emoji_index = indexes.EmojiIndex(self)
         self.emote_dict = constants.emotes
+        self.guild_index = indexes.GuildIndex(self)
+        self.guild_rankings = indexes.GuildRankings(self)
+        self.health = health.HealthMonitor(self, constants.health)
+        self.host_metrics = hostmetrics.HostSampler()
+        self.latencies = latency.LatencyTracker()
+        self.latencies.install(self.http)
+        self.loop_watchdog = watchdog.LoopWatchdog(self)
+        self.member_index = indexes.MemberIndex(self)
+        self.modules = modgraph.ModuleGraph()
+        self.mutual_index = indexes.MutualGuildIndex(self)
+        self.pg_stats = pgstats.StatsCollector(self)
+        self.population = population.PopulationStats(self)
         self.prefixes = database.prefixes
+        self.reaction_router = reactions.ReactionRouter()
         self.ready = False
         self.rolechanges = int()
         self.session = aiohttp.ClientSession(loop=self.loop)
         self.socket_events = collections.Counter()
+        self.socket_rates = timeseries.SocketRates()
+        self.source_stats = sourcestats.SourceStats()
 
     def run(self, token):  # Everything starts from here
         self.setup()  # load the cogs
@@ -148,6 +167,10 @@ class Candybot(commands.AutoShardedBot):
         finally:  # Write up our json files with the stats from the session.
             try:
                 self.status_loop.stop()  # Stop the loop
+                self.health.stop()
+                self.loop_watchdog.stop()
+                self.host_metrics.stop()
+                self.pg_stats.stop()
 
                 print("\nKilled")
 
@@ -155,6 +178,7 @@ class Candybot(commands.AutoShardedBot):
                     json.dump(
                         self.blacklist, fp, indent=2
                     )  # New blacklisted users from the session
+                population = self.population.snapshot()
                 with open("./data/json/stats.json", "w", encoding="utf-8") as fp:
                     stats = {
                         "client name": self.user.name,
@@ -167,8 +191,8 @@ class Candybot(commands.AutoShardedBot):
                         "commands run": len(self.command_stats),
                         "messages seen": self.messages,
                         "server count": len(self.guilds),
-                        "channel count": len([x for x in self.get_all_channels()]),
-                        "member count": len([x for x in self.get_all_members()]),
+                        "channel count": population["channels"],
+                        "member count": population["members"],
                         "batch inserts": self.batch_inserts,
                         "username changes": self.namechanges,
                         "nickname changes": self.nickchanges,
@@ -181,6 +205,7 @@ class Candybot(commands.AutoShardedBot):
     def setup(self):
         # Start the task loop
         self.status_loop.start()
+        self.host_metrics.start()  # Sample host metrics off the event loop
 
         # load all blacklisted discord objects
         if not os.path.exists("./data/json/blacklist.json"):
@@ -420,6 +445,9 @@ class Candybot(commands.AutoShardedBot):
             print(utils.traceback_maker(e))
 
         self.ready = True
+        self.health.start()
+        self.loop_watchdog.start()
+        self.pg_stats.start()
 
         print(f"{self.user} ({self.user.id})")
 
@@ -562,7 +590,30 @@ class Candybot(commands.AutoShardedBot):
             traceback_logger.warning(str(err) + "\n")
 
 
+    def add_command(self, command):
+        super().add_command(command)
+        self.command_index.add(command)
+
+    def remove_command(self, name):
+        command = super().remove_command(name)
+        if command is not None:
+            self.command_index.remove(command, name)
+        return command
+
+    def dispatch(self, event_name, *args, **kwargs):
+        # Menus get their reactions by message id, not a wait_for each.
+        # route catches failing checks, this runs in the gateway parser.
+        if event_name in reactions.EVENTS:
+            self.reaction_router.route(event_name, args[0])
+        super().dispatch(event_name, *args, **kwargs)
+
     async def on_guild_join(self, guild):
+        self.emoji_index.guild_join(guild)
+        self.guild_index.add(guild)
+        self.member_index.guild_join(guild)
+        self.mutual_index.guild_join(guild)
+        self.guild_rankings.guild_join(guild)
+        self.population.guild_join(guild)
         if self.ready is False:
             return
 
@@ -570,9 +621,53 @@ class Candybot(commands.AutoShardedBot):
         # await database.fix_server(guild.id)
 
     async def on_guild_remove(self, guild):
+        self.emoji_index.guild_remove(guild)
+        self.guild_index.remove(guild)
+        self.member_index.guild_remove(guild)
+        self.mutual_index.guild_remove(guild)
+        self.guild_rankings.guild_remove(guild)
+        self.population.guild_remove(guild)
         if self.ready is False:
             return
 
+    async def on_guild_available(self, guild):
+        self.emoji_index.guild_join(guild)
+        self.guild_index.add(guild)
+        self.member_index.guild_remove(guild)
+        self.mutual_index.guild_join(guild)
+        self.guild_rankings.guild_join(guild)
+        self.population.guild_available(guild)
+
+    async def on_guild_update(self, before, after):
+        self.guild_index.add(after)
+
+    async def on_guild_emojis_update(self, guild, before, after):
+        self.emoji_index.emojis_update(guild, after)
+
+    async def on_guild_channel_create(self, channel):
+        self.population.channel_create(channel)
+
+    async def on_guild_channel_delete(self, channel):
+        self.population.channel_delete(channel)
+
+    async def on_member_join(self, member):
+        self.member_index.member_join(member)
+        self.mutual_index.member_join(member)
+        self.guild_rankings.member_join(member)
+        self.population.member_join(member)
+
+    async def on_member_remove(self, member):
+        self.member_index.member_remove(member)
+        self.mutual_index.member_remove(member)
+        self.guild_rankings.member_remove(member)
+        self.population.member_remove(member)
+
+    async def on_member_update(self, before, after):
+        self.member_index.member_update(after)
+        self.population.member_update(before, after)
+
+    async def on_user_update(self, before, after):
+        self.member_index.user_update(before, after)
 
     async def on_ready(self):
         pass
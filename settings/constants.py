@@ -20,6 +20,7 @@ except KeyError as e:
           Add this key or the bot might not function properly.
           """
     )
+health = config.get("health", {})  # Optional health alert threshold overrides
 emotes = {
     "loading": "<a:loading:819280509007560756>",
     "success": "<:checkmark:816534984676081705>",
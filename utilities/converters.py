@@ -15,35 +15,38 @@ lax_id_regex = re.compile(r"([0-9]{15,21})$")
 mention_regex = re.compile(r"<@!?([0-9]+)>$")
 ROLE_MENTION_REGEX = re.compile(r"<@&([0-9]+)>$")
 
+CLOSE_ENOUGH = 0.6  # Fuzzy ratio a suggestion needs
+
+# A leading -flag or --flag, or a number given as a flag's value
+FLAG_REGEX = re.compile(r"\s*(--?[a-zA-Z][\w-]*|\d+(?:\.\d+)?)(?=\s|$)")
+
 
 async def prettify(ctx, arg):
     pretty_arg = await commands.clean_content().convert(ctx, str(arg))
     return pretty_arg
 
 
+def suggest(matches, ratio=CLOSE_ENOUGH):
+    """ Did you mean line for the closest matches of a kept index """
+    names = [f"`{m['result'].name}`" for m in matches if m["ratio"] >= ratio]
+    if not names:
+        return ""
+    return f" Did you mean {', '.join(names)}?"
+
+
 class SearchEmojiConverter(commands.Converter):
     """Search for matching emoji."""
 
     async def get_by_id(self, ctx, emoji_id):
         """Exact emoji_id lookup."""
-        if ctx.guild:
-            result = discord.utils.get(ctx.guild.emojis, id=emoji_id)
-        if not result:
-            result = discord.utils.get(ctx.bot.emojis, id=emoji_id)
-        return result
+        return ctx.bot.get_emoji(emoji_id)
 
     async def get_by_name(self, ctx, emoji_name):
         """Lookup by name.
         Returns list of possible matches.
         Does a bot-wide case-insensitive match.
         """
-
-        emoji_name = emoji_name.lower()
-
-        def pred(emoji):
-            return emoji.name.lower() == emoji_name
-
-        return [e for e in ctx.bot.emojis if pred(e)]
+        return ctx.bot.emoji_index.find(emoji_name)
 
     async def find_match(self, ctx, argument):
         """Get a match...
@@ -84,7 +87,8 @@ class SearchEmojiConverter(commands.Converter):
             )
 
         raise commands.BadArgument(
-            'Emoji "{}" not found'.format(await prettify(ctx, argument))
+            'Emoji "{}" not found.'.format(await prettify(ctx, argument))
+            + suggest(ctx.bot.emoji_index.closest(argument))
         )
 
 
@@ -98,6 +102,7 @@ class DiscordCommand(commands.Converter):
         if not command:
             raise commands.BadArgument(
                 f"Command `{await prettify(ctx, argument)}` not found."
+                + suggest(ctx.bot.command_index.closest(argument))
             )
         return command
 
@@ -135,37 +140,17 @@ class DiscordBot(commands.Converter):
         tag_match = tag_regex.match(bot_name)
 
         if tag_match:
-
-            def pred(member):
-                return member.name == tag_match.group(
-                    1
-                ) and member.discriminator == tag_match.group(2)
-
+            name, discriminator = tag_match.groups()
             result = None
             if ctx.guild:
-                result = discord.utils.get(
-                    ctx.guild.members,
-                    name=tag_match.group(1),
-                    discriminator=tag_match.group(2),
-                )
+                result = ctx.bot.member_index.find_tag(ctx.guild, name, discriminator)
             if not result:
-                result = discord.utils.get(
-                    ctx.bot.users,
-                    name=tag_match.group(1),
-                    discriminator=tag_match.group(2),
-                )
+                result = ctx.bot.member_index.find_user(name, discriminator)
             if result:
                 return [result]
 
         if ctx.guild:
-            user_name = bot_name.lower()
-
-            def pred(member):
-                return (
-                    member.nick and member.nick.lower() == user_name
-                ) or member.name.lower() == user_name
-
-            return [m for m in ctx.guild.members if pred(m)]
+            return ctx.bot.member_index.find(ctx.guild, bot_name)
         return []
 
     async def find_match(self, ctx, argument):
@@ -231,37 +216,17 @@ class DiscordUser(commands.Converter):
         tag_match = tag_regex.match(user_name)
 
         if tag_match:
-
-            def pred(member):
-                return member.name == tag_match.group(
-                    1
-                ) and member.discriminator == tag_match.group(2)
-
+            name, discriminator = tag_match.groups()
             result = None
             if ctx.guild:
-                result = discord.utils.get(
-                    ctx.guild.members,
-                    name=tag_match.group(1),
-                    discriminator=tag_match.group(2),
-                )
+                result = ctx.bot.member_index.find_tag(ctx.guild, name, discriminator)
             if not result:
-                result = discord.utils.get(
-                    ctx.bot.users,
-                    name=tag_match.group(1),
-                    discriminator=tag_match.group(2),
-                )
+                result = ctx.bot.member_index.find_user(name, discriminator)
             if result:
                 return [result]
 
         if ctx.guild:
-            user_name = user_name.lower()
-
-            def pred(member):
-                return (
-                    member.nick and member.nick.lower() == user_name
-                ) or member.name.lower() == user_name
-
-            return [m for m in ctx.guild.members if pred(m)]
+            return ctx.bot.member_index.find(ctx.guild, user_name)
         return []
 
     async def find_match(self, ctx, argument):
@@ -321,7 +286,14 @@ class BotServer(commands.Converter):
                 )
             except Exception as e:
                 await ctx.send_or_reply(e)
-        options = [s for s in ctx.bot.guilds if argument.lower() in s.name.lower()]
+        options = ctx.bot.guild_index.search(argument)
+        if options == []:
+            # Misspelt names have no substring match, offer the closest
+            options = [
+                m["result"]
+                for m in ctx.bot.guild_index.closest(argument, 5)
+                if m["ratio"] >= CLOSE_ENOUGH
+            ]
         if options == []:
             raise commands.BadArgument(
                 f"Server `{await prettify(ctx, argument)}` not found."
@@ -360,22 +332,15 @@ class DiscordGuild(commands.Converter):
         Fall back to inexact match.
         Will only return matches if ctx.author is in the guild.
         """
-        if checks.is_admin(ctx):
-            result = discord.utils.find(lambda g: g.name == guild_name, ctx.bot.guilds)
-            if result:
-                return [result]
-
-            guild_name = guild_name.lower()
-
-            return [g for g in ctx.bot.guilds if g.name.lower() == guild_name]
-        else:
-            result = discord.utils.find(lambda g: g.name == guild_name and g.get_member(ctx.author.id), ctx.bot.guilds)
-            if result:
-                return [result]
+        results = ctx.bot.guild_index.find(guild_name)
+        if not checks.is_admin(ctx):
+            results = [g for g in results if g.get_member(ctx.author.id)]
 
-            guild_name = guild_name.lower()
+        result = discord.utils.find(lambda g: g.name == guild_name, results)
+        if result:
+            return [result]
 
-            return [g for g in ctx.bot.guilds if g.name.lower() == guild_name and g.get_member(ctx.author.id)]
+        return results
 
     async def find_match(self, ctx, argument):
         """Get a match...
@@ -491,6 +456,28 @@ class Arguments(argparse.ArgumentParser):
         raise RuntimeError(message)
 
 
+def split_flags(text, known):
+    """
+    Leading flags of an argument and the raw text after them.
+    Stops at the first token that is not in known or a number
+    following a flag, so the rest keeps its quoting untouched.
+    """
+    flags = []
+    position = 0
+    while True:
+        match = FLAG_REGEX.match(text, position)
+        if match is None:
+            break
+        token = match.group(1)
+        if token[0] == "-" and token not in known:
+            break
+        if token[0] != "-" and (not flags or flags[-1][0] != "-"):
+            break
+        flags.append(token)
+        position = match.end()
+    return flags, text[position:].strip()
+
+
 class Prefix(commands.Converter):
     async def convert(self, ctx, argument):
         user_id = ctx.bot.user.id
@@ -531,19 +518,10 @@ class DiscordMember(commands.Converter):
         tag_match = tag_regex.match(user_name)
 
         if tag_match:
-
-            def pred(member):
-                return member.name == tag_match.group(
-                    1
-                ) and member.discriminator == tag_match.group(2)
-
+            name, discriminator = tag_match.groups()
             result = None
             if ctx.guild:
-                result = discord.utils.get(
-                    ctx.guild.members,
-                    name=tag_match.group(1),
-                    discriminator=tag_match.group(2),
-                )
+                result = ctx.bot.member_index.find_tag(ctx.guild, name, discriminator)
             if not result:
                 raise commands.BadArgument(
                     f"User `{await prettify(ctx, user_name)}` not found."
@@ -552,14 +530,7 @@ class DiscordMember(commands.Converter):
                 return [result]
 
         if ctx.guild:
-            user_name = user_name.lower()
-
-            def pred(member):
-                return (
-                    member.nick and member.nick.lower() == user_name
-                ) or member.name.lower() == user_name
-
-            return [m for m in ctx.guild.members if pred(m)]
+            return ctx.bot.member_index.find(ctx.guild, user_name)
         return []
 
     async def find_match(self, ctx, argument):
@@ -0,0 +1,133 @@
+"""
+Trigram backed fuzzy name search.
+Candidates sharing the most trigrams with the search term are
+shortlisted, then ranked with difflib's ratio on just that shortlist.
+Exact and prefix matches therefore order the same way that
+a full difflib pass over every name would order them.
+"""
+import difflib
+import heapq
+
+
+def trigrams(text):
+    """Padded trigrams so one and two character terms still match."""
+    text = f"  {text} "
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class FuzzyIndex:
+    """
+    Incremental trigram index over (ident, name) pairs.
+    The ident is whatever uniquely identifies the entry in
+    its namespace, a guild id, role id, emoji id or command name.
+    """
+
+    __slots__ = ("_entries", "_grams", "_counter")
+
+    def __init__(self, entries=()):
+        self._entries = {}  # ident -> (casefolded name, item, trigram count, order)
+        self._grams = {}  # trigram -> {ident}
+        self._counter = 0
+        for ident, name, item in entries:
+            self.add(ident, name, item)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, ident):
+        return ident in self._entries
+
+    def add(self, ident, name, item=None):
+        """Index an entry, replacing any previous entry with this ident."""
+        if ident in self._entries:
+            self.remove(ident)
+        folded = name.casefold()
+        grams = trigrams(folded)
+        self._counter += 1
+        self._entries[ident] = (
+            folded,
+            name if item is None else item,
+            len(grams),
+            self._counter,
+        )
+        for gram in grams:
+            self._grams.setdefault(gram, set()).add(ident)
+
+    def remove(self, ident):
+        entry = self._entries.pop(ident, None)
+        if entry is None:
+            return
+        for gram in trigrams(entry[0]):
+            idents = self._grams.get(gram)
+            if idents is not None:
+                idents.discard(ident)
+                if not idents:
+                    del self._grams[gram]
+
+    def clear(self):
+        self._entries.clear()
+        self._grams.clear()
+
+    def contains(self, term):
+        """Items whose name contains term, casefolded, in insertion order."""
+        folded = term.casefold()
+        entries = self._entries
+        if len(folded) < 3:
+            idents = entries
+        else:
+            # Every trigram of a substring is a trigram of the name
+            grams = [folded[i : i + 3] for i in range(len(folded) - 2)]
+            postings = sorted((self._grams.get(g, ()) for g in grams), key=len)
+            idents = set(postings[0]).intersection(*postings[1:])
+        matches = [entries[i] for i in idents if folded in entries[i][0]]
+        matches.sort(key=lambda entry: entry[3])
+        return [entry[1] for entry in matches]
+
+    def search(self, term, limit=3, *, shortlist=None, within=None):
+        """
+        Returns up to limit dicts of {"result": item, "ratio": float}
+        sorted by ratio, ties keeping insertion order.
+        within, a set of idents, limits the search to those entries.
+        """
+        if not self._entries or limit < 1:
+            return []
+        if within is not None:
+            within = {i for i in within if i in self._entries}
+        folded = term.casefold()
+        grams = trigrams(folded)
+        shortlist = shortlist or max(limit * 10, 50)
+
+        shared = {}
+        for gram in grams:
+            for ident in self._grams.get(gram, ()):
+                shared[ident] = shared.get(ident, 0) + 1
+        if within is not None:
+            shared = {i: n for i, n in shared.items() if i in within}
+
+        entries = self._entries
+        term_grams = len(grams)
+
+        def overlap(ident):
+            name, _, name_grams, order = entries[ident]
+            # Dice coefficient, prefix matches are shortlisted first.
+            dice = 2 * shared[ident] / (term_grams + name_grams)
+            return (name.startswith(folded), dice, -order)
+
+        candidates = heapq.nlargest(shortlist, shared, key=overlap)
+        if len(candidates) < limit:
+            # Nothing in common with most names, top up the
+            # shortlist so we still return limit results.
+            seen = set(candidates)
+            pool = entries if within is None else sorted(within, key=lambda i: entries[i][3])
+            candidates += [i for i in pool if i not in seen][: limit - len(candidates)]
+
+        scored = []
+        for ident in candidates:
+            name, item, _, order = entries[ident]
+            ratio = difflib.SequenceMatcher(None, folded, name).ratio()
+            scored.append((ratio, -order, item))
+
+        return [
+            {"result": item, "ratio": ratio}
+            for ratio, _, item in heapq.nlargest(limit, scored, key=lambda s: s[:2])
+        ]
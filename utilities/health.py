@@ -0,0 +1,203 @@
+"""
+Periodic bot health sampling with threshold alerts.
+Signals are read from asyncpg, asyncio and discord.py internals
+because none of them expose public counters for these.
+"""
+import asyncio
+import collections
+import logging
+import os
+import time
+import weakref
+
+from discord.ext import tasks
+
+Threshold = collections.namedtuple("Threshold", ["signal", "kind", "limit", "duration"])
+
+# name -> Threshold. "above" fires when every sample over the
+# duration exceeds limit, "growth" when the signal rose by more
+# than limit over the duration. Override per name with the
+# optional "health" key in config.json. failed_tasks counts
+# failures since the previous sample.
+THRESHOLDS = {
+    "pool_waiters": Threshold("pool_waiters", "above", 5, 30),
+    "pool_saturated": Threshold("pool_free", "below", 1, 60),
+    "event_backlog": Threshold("event_tasks", "growth", 50, 60),
+    "failed_tasks": Threshold("failed_tasks", "above", 0, 0),
+    "ratelimited": Threshold("ratelimited", "above", 0, 10),
+    "memory": Threshold("memory", "above", 2048, 300),
+}
+SIGNALS = (
+    "pool_waiters",
+    "pool_in_use",
+    "pool_free",
+    "event_tasks",
+    "failed_tasks",
+    "memory",
+    "ratelimited",
+)
+KINDS = ("above", "below", "growth")
+
+error_logger = logging.getLogger("ERROR_LOGGER")
+traceback_logger = logging.getLogger("TRACEBACK_LOGGER")
+
+
+def make_threshold(name, override):
+    """
+    Threshold for a config override, None when it is invalid.
+    Unknown names need a signal, known ones default to theirs.
+    """
+    if not isinstance(override, dict):
+        return None
+    if set(override) - set(Threshold._fields):
+        return None
+    base = THRESHOLDS.get(name, Threshold(name, "above", 0, 0))
+    threshold = base._replace(**override)
+    if threshold.signal not in SIGNALS or threshold.kind not in KINDS:
+        return None
+    if not all(isinstance(v, (int, float)) for v in (threshold.limit, threshold.duration)):
+        return None
+    return threshold
+
+
+class HealthMonitor:
+    """
+    Samples health signals every interval seconds into a bounded
+    history and posts alert state transitions to bot.bot_channel.
+    """
+
+    def __init__(self, bot, thresholds=None, interval=5.0, history=720):
+        self.bot = bot
+        self.samples = collections.deque(maxlen=history)
+        self.thresholds = dict(THRESHOLDS)
+        for name, override in (thresholds or {}).items():
+            threshold = make_threshold(name, override)
+            if threshold is None:
+                error_logger.warning(f"Ignoring invalid health threshold {name}: {override}")
+                continue
+            self.thresholds[name] = threshold
+        self.alerts = {}  # name -> timestamp the alert started
+        self.failures = 0  # Watched tasks that ended with an exception
+        self.reported = 0  # failures at the previous sample
+        self.watched = weakref.WeakSet()
+        self.sampler.change_interval(seconds=interval)
+
+    def start(self):
+        if not self.sampler.is_running():
+            self.sampler.start()
+
+    def stop(self):
+        self.sampler.cancel()
+
+    def watch(self, task):
+        """Counts task in failed_tasks if it ends with an exception."""
+        if task not in self.watched:
+            self.watched.add(task)
+            task.add_done_callback(self._task_done)
+
+    def _task_done(self, task):
+        if task.cancelled() or task.exception() is None:
+            return
+        self.failures += 1
+        # Retrieving the exception silences asyncio's own report
+        traceback_logger.error(f"Task {task!r} failed", exc_info=task.exception())
+
+    def sample(self):
+        pool = self.bot.cxn
+        # Only pending tasks are listed, so cog and tasks.Loop
+        # tasks are watched here and failures counted when they end
+        all_tasks = asyncio.all_tasks(loop=self.bot.loop)
+        cogs_directory = os.path.join(os.getcwd(), "cogs")
+        tasks_directory = os.path.join("discord", "ext", "tasks", "__init__.py")
+        event_tasks = 0
+        for task in all_tasks:
+            text = repr(task)
+            if "Client._run_event" in text:
+                event_tasks += 1
+            elif cogs_directory in text or tasks_directory in text:
+                self.watch(task)
+        failed_tasks = self.failures - self.reported
+        self.reported = self.failures
+
+        in_use = len(pool._holders) - pool._queue.qsize()
+        return {
+            "timestamp": time.time(),
+            "pool_waiters": len(pool._queue._getters),
+            "pool_in_use": in_use,
+            "pool_free": len(pool._holders) - in_use,
+            "event_tasks": event_tasks,
+            "failed_tasks": failed_tasks,
+            "memory": self.bot.host_metrics.latest().uss / 1024 ** 2,
+            "ratelimited": int(not self.bot.http._global_over.is_set()),
+        }
+
+    def latest(self):
+        return self.samples[-1] if self.samples else self.sample()
+
+    def trend(self, signal, seconds=3600, points=30):
+        """Up to points values of a signal, averaged per bucket."""
+        cutoff = time.time() - seconds
+        values = [s[signal] for s in self.samples if s["timestamp"] >= cutoff]
+        if len(values) <= points:
+            return values
+        size = len(values) / points
+        buckets = [values[int(i * size) : int((i + 1) * size)] for i in range(points)]
+        return [sum(b) / len(b) for b in buckets if b]
+
+    def breached(self, threshold, now):
+        window = [s for s in self.samples if s["timestamp"] >= now - threshold.duration]
+        if not window:
+            return False
+        # Only judge once the history covers the whole duration
+        if self.samples[0]["timestamp"] > now - threshold.duration:
+            return False
+        values = [s[threshold.signal] for s in window]
+        if threshold.kind == "above":
+            return all(v > threshold.limit for v in values)
+        if threshold.kind == "below":
+            return all(v < threshold.limit for v in values)
+        if threshold.kind == "growth":
+            return values[-1] - values[0] > threshold.limit
+        return False
+
+    def evaluate(self):
+        """Returns [(name, started)] for alerts that changed state."""
+        now = self.samples[-1]["timestamp"]
+        changes = []
+        for name, threshold in self.thresholds.items():
+            firing = self.breached(threshold, now)
+            if firing and name not in self.alerts:
+                self.alerts[name] = now
+                changes.append((name, True))
+            elif not firing and name in self.alerts:
+                del self.alerts[name]
+                changes.append((name, False))
+        return changes
+
+    def describe(self, name):
+        threshold = self.thresholds[name]
+        value = self.samples[-1][threshold.signal]
+        if threshold.kind == "growth":
+            rule = f"grew by more than {threshold.limit}"
+        else:
+            rule = f"{threshold.kind} {threshold.limit}"
+        if threshold.duration:
+            rule += f" for {threshold.duration}s"
+        return f"`{name}`: {threshold.signal} {rule} (now {value:,.0f})"
+
+    @tasks.loop(seconds=5.0)
+    async def sampler(self):
+        self.samples.append(self.sample())
+        changes = self.evaluate()
+        channel = self.bot.bot_channel
+        if not changes or channel is None:
+            return
+        lines = []
+        for name, firing in changes:
+            emote = self.bot.emote_dict["warn" if firing else "success"]
+            state = "Health alert" if firing else "Recovered"
+            lines.append(f"{emote} **{state}** {self.describe(name)}")
+        try:
+            await channel.send("\n".join(lines))
+        except Exception:  # Never let a failed post stop the sampler
+            pass
@@ -2,7 +2,7 @@ import discord
 import asyncio
 from discord import user
 from discord.ext import menus
-from utilities import pagination, utils
+from utilities import pagination
 
 
 async def error_info(ctx, failed):
@@ -15,16 +15,17 @@ async def error_info(ctx, failed):
         return
 
     def rxn_check(r):
-        if (
-            r.message_id == mess.id
-            and r.user_id == ctx.author.id
-            and str(r.emoji) == ctx.bot.emote_dict["error"]
-        ):
+        if r.user_id == ctx.author.id and str(r.emoji) == ctx.bot.emote_dict["error"]:
             return True
         return False
 
+    router = ctx.bot.reaction_router
+    route = router.register(mess.id, rxn_check, events=("raw_reaction_add",))
     try:
-        await ctx.bot.wait_for("raw_reaction_add", timeout=30.0, check=rxn_check)
+        try:
+            await route.wait(30.0)
+        finally:
+            router.unregister(route)
         await mess.delete()
         await ctx.send_or_reply(
             f"{ctx.bot.emote_dict['announce']} **Failure explanation:**"
@@ -54,30 +55,30 @@ async def userperms(ctx):
     return userperms
 
 
-async def choose(ctx, search, option_dict):
-    options = [x for x in option_dict]
-    option_list = utils.disambiguate(search, options, None, 5)
-    if len(option_list) != 1:
-        if not option_list[0]["ratio"] == 1:
-            option_list = [x["result"] for x in option_list]
-            index, message = await pagination.Picker(
-                embed_title="Select one of the closest matches.",
-                list=option_list,
-                ctx=ctx,
-            ).pick(embed=True, syntax="prolog")
+async def choose(ctx, search, index, options=None):
+    """
+    Closest match to search in one of the bot's kept indexes,
+    only among options if provided. The author picks one when
+    nothing matches exactly. Returns (match, picker message).
+    """
+    matches = index.closest(search, 5, within=options)
+    if not matches:
+        return (None, None)
+    if len(matches) == 1 or matches[0]["ratio"] == 1:
+        return (matches[0]["result"], None)
+
+    option_list = [x["result"].name for x in matches]
+    picked, message = await pagination.Picker(
+        embed_title="Select one of the closest matches.",
+        list=option_list,
+        ctx=ctx,
+    ).pick(embed=True, syntax="prolog")
 
-            if index < 0:
-                await message.edit(
-                    content=f"{ctx.bot.emote_dict['info']} Selection cancelled.",
-                    embed=None,
-                )
-                return (None, None)
+    if picked < 0:
+        await message.edit(
+            content=f"{ctx.bot.emote_dict['info']} Selection cancelled.",
+            embed=None,
+        )
+        return (None, None)
 
-            selection = option_list[index]
-            return (option_dict[selection], message)
-        else:
-            selection = option_list[0]["result"]
-            return (option_dict[selection], None)
-    else:
-        selection = option_list[0]["result"]
-    return (option_dict[selection], None)
+    return (matches[picked]["result"], message)
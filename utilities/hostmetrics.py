@@ -0,0 +1,122 @@
+"""
+Background sampler for process and host metrics.
+psutil calls like memory_full_info() read /proc and can take tens
+of milliseconds, so they run on a thread and commands read the
+latest sample instead of blocking the event loop.
+"""
+import collections
+import logging
+import os
+import threading
+import time
+
+import psutil
+
+Sample = collections.namedtuple(
+    "Sample",
+    [
+        "timestamp",
+        "cpu",  # Host cpu percent since the previous sample
+        "process_cpu",  # Process cpu percent of the whole host
+        "rss",
+        "uss",
+        "memory_percent",  # Process share of host memory
+        "host_memory_used",
+        "host_memory_total",
+        "host_memory_percent",
+        "swap_used",
+        "swap_total",
+        "swap_percent",
+        "threads",
+    ],
+)
+
+SPARKS = "▁▂▃▄▅▆▇█"
+
+traceback_logger = logging.getLogger("TRACEBACK_LOGGER")
+
+
+def sparkline(values):
+    """Unicode bar per value, scaled between the min and max."""
+    values = list(values)
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    spread = (high - low) or 1
+    return "".join(SPARKS[int((v - low) / spread * (len(SPARKS) - 1))] for v in values)
+
+
+class HostSampler(threading.Thread):
+    """
+    Daemon thread that samples every interval seconds into a
+    ring buffer holding the last hour of samples by default.
+    """
+
+    def __init__(self, interval=5.0, history=720):
+        super().__init__(name="host-metrics", daemon=True)
+        self.interval = interval
+        self.samples = collections.deque(maxlen=history)
+        self.process = psutil.Process(os.getpid())
+        self.cpu_count = psutil.cpu_count() or 1
+        self.cpu_cores = psutil.cpu_count(logical=False)
+        self._stopped = threading.Event()
+
+        # Prime the cpu counters, the first percent is always 0.0
+        psutil.cpu_percent(interval=None)
+        self.process.cpu_percent(interval=None)
+        self.samples.append(self.sample())
+
+    def sample(self):
+        with self.process.oneshot():
+            memory = self.process.memory_full_info()
+            process_cpu = self.process.cpu_percent(interval=None) / self.cpu_count
+            memory_percent = self.process.memory_percent()
+            threads = self.process.num_threads()
+        host = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        return Sample(
+            timestamp=time.time(),
+            cpu=psutil.cpu_percent(interval=None),
+            process_cpu=process_cpu,
+            rss=memory.rss,
+            uss=memory.uss,
+            memory_percent=memory_percent,
+            host_memory_used=host.used,
+            host_memory_total=host.total,
+            host_memory_percent=host.percent,
+            swap_used=swap.used,
+            swap_total=swap.total,
+            swap_percent=swap.percent,
+            threads=threads,
+        )
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.samples.append(self.sample())
+            except psutil.Error:
+                continue
+            except Exception:  # A dead thread would leave latest() stale
+                traceback_logger.exception("Host metrics sample failed")
+
+    def stop(self):
+        self._stopped.set()
+
+    def latest(self):
+        return self.samples[-1]
+
+    def trend(self, field, seconds=3600, points=30):
+        """
+        Up to points values of a Sample field over the last
+        seconds, each the mean of the samples in its bucket.
+        """
+        cutoff = time.time() - seconds
+        samples = list(self.samples)  # The thread appends while we read
+        values = [getattr(s, field) for s in samples if s.timestamp >= cutoff]
+        if len(values) <= points:
+            return values
+        size = len(values) / points
+        buckets = [
+            values[int(i * size) : int((i + 1) * size)] for i in range(points)
+        ]
+        return [sum(b) / len(b) for b in buckets if b]
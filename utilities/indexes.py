@@ -0,0 +1,696 @@
+"""
+In-memory lookup indexes kept up to date from gateway events.
+Each index only stores ids. Objects are resolved through the
+discord.py cache on lookup so the index never holds stale models.
+"""
+import bisect
+import sys
+
+from collections.abc import Sequence
+
+from utilities import fuzzy, utils
+
+
+def _resolve_matches(matches, get):
+    # Swaps the ids disambiguate returns for cached objects
+    results = []
+    for match in matches:
+        item = get(match["result"])
+        if item is not None:
+            results.append({"result": item, "ratio": match["ratio"]})
+    return results
+
+
+class GuildMemberIndex:
+    """
+    Casefolded name, nickname and name#discriminator
+    lookups for the members of a single guild.
+    """
+
+    __slots__ = ("guild_id", "names", "tags", "keys")
+
+    def __init__(self, guild):
+        self.guild_id = guild.id
+        self.names = {}  # casefolded name or nick -> {member_id: None}
+        self.tags = {}  # name#discriminator -> member_id
+        self.keys = {}  # member_id -> (name, nick, tag)
+        for member in guild.members:
+            self.add(member)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, member):
+        """Index a member, re-keying it if its names changed."""
+        name = member.name.casefold()
+        nick = member.nick.casefold() if member.nick else None
+        tag = f"{member.name}#{member.discriminator}"
+        keys = (name, nick, tag)
+        if self.keys.get(member.id) == keys:
+            return
+
+        self.remove(member.id)
+        self.keys[member.id] = keys
+        self.names.setdefault(name, {})[member.id] = None
+        if nick is not None:
+            self.names.setdefault(nick, {})[member.id] = None
+        self.tags[tag] = member.id
+
+    def remove(self, member_id):
+        keys = self.keys.pop(member_id, None)
+        if keys is None:
+            return
+
+        name, nick, tag = keys
+        for key in (name, nick):
+            if key is None:
+                continue
+            ids = self.names.get(key)
+            if ids is not None:
+                ids.pop(member_id, None)
+                if not ids:
+                    del self.names[key]
+        if self.tags.get(tag) == member_id:
+            del self.tags[tag]
+
+    def find(self, guild, name):
+        """Members whose name or nickname matches, casefolded."""
+        ids = self.names.get(name.casefold(), ())
+        return [m for m in map(guild.get_member, ids) if m is not None]
+
+    def find_tag(self, guild, name, discriminator):
+        """Exact name#discriminator match."""
+        member_id = self.tags.get(f"{name}#{discriminator}")
+        if member_id is None:
+            return None
+        return guild.get_member(member_id)
+
+
+class MemberIndex:
+    """
+    Lazily built per-guild member indexes plus a bot-wide
+    name#discriminator index over the cached users.
+
+    Guild indexes are built the first time a guild is
+    searched and are maintained from member events after that.
+    The user index is never pruned on member removal because
+    the user may still share another guild with the bot.
+    Stale entries are verified and dropped on lookup instead.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.guilds = {}  # guild_id -> GuildMemberIndex
+        self.users = None  # name#discriminator -> user_id
+
+    def get(self, guild):
+        index = self.guilds.get(guild.id)
+        if index is None:
+            index = self.guilds[guild.id] = GuildMemberIndex(guild)
+        return index
+
+    def find(self, guild, name):
+        return self.get(guild).find(guild, name)
+
+    def find_tag(self, guild, name, discriminator):
+        return self.get(guild).find_tag(guild, name, discriminator)
+
+    def find_user(self, name, discriminator):
+        if self.users is None:
+            self.users = {str(u): u.id for u in self.bot.users}
+
+        tag = f"{name}#{discriminator}"
+        user_id = self.users.get(tag)
+        if user_id is None:
+            return None
+        user = self.bot.get_user(user_id)
+        if user is None or str(user) != tag:
+            del self.users[tag]
+            return None
+        return user
+
+    ####################
+    ## Event Handlers ##
+    ####################
+
+    def _add_user(self, user):
+        if self.users is not None:
+            self.users[str(user)] = user.id
+
+    def member_join(self, member):
+        index = self.guilds.get(member.guild.id)
+        if index is not None:
+            index.add(member)
+        self._add_user(member)
+
+    def member_remove(self, member):
+        index = self.guilds.get(member.guild.id)
+        if index is not None:
+            index.remove(member.id)
+
+    def member_update(self, member):
+        index = self.guilds.get(member.guild.id)
+        if index is not None:
+            index.add(member)
+
+    def user_update(self, before, after):
+        # Username and discriminator live on the shared
+        # user object so every guild index holding it is re-keyed.
+        for guild_id, index in self.guilds.items():
+            if after.id not in index.keys:
+                continue
+            guild = self.bot.get_guild(guild_id)
+            member = guild.get_member(after.id) if guild else None
+            if member is not None:
+                index.add(member)
+
+        if self.users is not None:
+            tag = str(before)
+            if self.users.get(tag) == before.id:
+                del self.users[tag]
+            self._add_user(after)
+
+    def guild_join(self, guild):
+        if self.users is not None:
+            for member in guild.members:
+                self._add_user(member)
+
+    def guild_remove(self, guild):
+        # Also used when a guild becomes available again,
+        # the index is rebuilt lazily on the next lookup.
+        self.guilds.pop(guild.id, None)
+
+
+class GuildIndex:
+    """
+    Directory of the bot's guilds by casefolded name.
+    Supports exact, substring and fuzzy lookups.
+    Guilds by id are already a dict lookup through bot.get_guild.
+
+    Built the first time it is searched and
+    maintained from guild events after that.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.names = None  # casefolded name -> {guild_id: None}
+        self.keys = None  # guild_id -> casefolded name
+        self.fuzzy = None  # FuzzyIndex of guild_id -> name
+
+    def build(self):
+        if self.keys is None:
+            self.names = {}
+            self.keys = {}
+            self.fuzzy = fuzzy.FuzzyIndex()
+            for guild in self.bot.guilds:
+                self._add(guild)
+        return self.keys
+
+    def _resolve(self, ids):
+        return [g for g in map(self.bot.get_guild, ids) if g is not None]
+
+    def _add(self, guild):
+        name = guild.name.casefold()
+        self.keys[guild.id] = name
+        self.names.setdefault(name, {})[guild.id] = None
+        self.fuzzy.add(guild.id, guild.name, guild.id)
+        return name
+
+    def find(self, name):
+        """Guilds whose name matches, casefolded."""
+        self.build()
+        return self._resolve(self.names.get(name.casefold(), ()))
+
+    def search(self, term):
+        """Guilds whose name contains term, casefolded."""
+        self.build()
+        return self._resolve(self.fuzzy.contains(term))
+
+    def closest(self, term, limit=3, within=None):
+        """
+        Closest guild names as {"result": guild, "ratio": float}
+        dicts, only among the guilds in within if provided.
+        """
+        self.build()
+        if within is not None:
+            within = {guild.id for guild in within}
+        matches = utils.disambiguate(term, self.fuzzy, limit, within) or []
+        return _resolve_matches(matches, self.bot.get_guild)
+
+    ####################
+    ## Event Handlers ##
+    ####################
+
+    def add(self, guild):
+        if self.keys is None:
+            return
+        name = self.keys.get(guild.id)
+        if name == guild.name.casefold():
+            return
+        if name is not None:
+            self.remove(guild)
+        self._add(guild)
+
+    def remove(self, guild):
+        if self.keys is None:
+            return
+        name = self.keys.pop(guild.id, None)
+        if name is None:
+            return
+        ids = self.names[name]
+        ids.pop(guild.id, None)
+        if not ids:
+            del self.names[name]
+        self.fuzzy.remove(guild.id)
+
+
+class EmojiIndex:
+    """
+    Custom emojis by casefolded name and by guild,
+    with static and animated counts kept per guild.
+    Emojis by id are already a dict lookup through bot.get_emoji.
+
+    Built the first time it is used and
+    maintained from guild and emoji events after that.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.names = None  # casefolded name -> {emoji_id: None}
+        self.guilds = None  # guild_id -> {emoji_id: casefolded name}
+        self.counts = None  # guild_id -> [static, animated]
+        self.totals = None  # [static, animated]
+        self.fuzzy = None  # FuzzyIndex of emoji_id -> name
+
+    def build(self):
+        if self.guilds is None:
+            self.names = {}
+            self.guilds = {}
+            self.counts = {}
+            self.totals = [0, 0]
+            self.fuzzy = fuzzy.FuzzyIndex()
+            for guild in self.bot.guilds:
+                self._add_guild(guild, guild.emojis)
+        return self.guilds
+
+    def _add_guild(self, guild, emojis):
+        entries = self.guilds[guild.id] = {}
+        counts = self.counts[guild.id] = [0, 0]
+        for emoji in emojis:
+            name = emoji.name.casefold()
+            entries[emoji.id] = name
+            self.names.setdefault(name, {})[emoji.id] = None
+            self.fuzzy.add(emoji.id, emoji.name, emoji.id)
+            counts[emoji.animated] += 1
+        self.totals[0] += counts[0]
+        self.totals[1] += counts[1]
+
+    def _remove_guild(self, guild_id):
+        entries = self.guilds.pop(guild_id, None)
+        if entries is None:
+            return
+        for emoji_id, name in entries.items():
+            self.fuzzy.remove(emoji_id)
+            ids = self.names.get(name)
+            if ids is not None:
+                ids.pop(emoji_id, None)
+                if not ids:
+                    del self.names[name]
+        static, animated = self.counts.pop(guild_id)
+        self.totals[0] -= static
+        self.totals[1] -= animated
+
+    def find(self, name):
+        """Emojis whose name matches, casefolded, across every guild."""
+        self.build()
+        ids = self.names.get(name.casefold(), ())
+        return [e for e in map(self.bot.get_emoji, ids) if e is not None]
+
+    def closest(self, term, limit=3, within=None):
+        """
+        Closest emoji names as {"result": emoji, "ratio": float}
+        dicts, only among the emojis in within if provided.
+        """
+        self.build()
+        if within is not None:
+            within = {emoji.id for emoji in within}
+        matches = utils.disambiguate(term, self.fuzzy, limit, within) or []
+        return _resolve_matches(matches, self.bot.get_emoji)
+
+    def count(self, guild):
+        """(static, animated) emoji count for a guild."""
+        self.build()
+        return tuple(self.counts.get(guild.id, (0, 0)))
+
+    def total(self):
+        """(static, animated) emoji count across every guild."""
+        self.build()
+        return tuple(self.totals)
+
+    ####################
+    ## Event Handlers ##
+    ####################
+
+    def emojis_update(self, guild, emojis):
+        if self.guilds is None:
+            return
+        self._remove_guild(guild.id)
+        self._add_guild(guild, emojis)
+
+    def guild_join(self, guild):
+        self.emojis_update(guild, guild.emojis)
+
+    def guild_remove(self, guild):
+        if self.guilds is not None:
+            self._remove_guild(guild.id)
+
+
+class CommandIndex:
+    """
+    Top level command names and aliases for fuzzy lookups.
+    Exact lookups are already bot.get_command.
+
+    Built the first time it is searched and maintained
+    from Candybot.add_command and remove_command after that.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.fuzzy = None  # FuzzyIndex of name or alias -> command name
+
+    def build(self):
+        if self.fuzzy is None:
+            self.fuzzy = fuzzy.FuzzyIndex()
+            for command in self.bot.commands:
+                self._add(command)
+        return self.fuzzy
+
+    def _add(self, command):
+        for name in (command.name, *command.aliases):
+            self.fuzzy.add(name, name, command.name)
+
+    def closest(self, term, limit=3, within=None):
+        """
+        Closest command names as {"result": command, "ratio": float}
+        dicts, only among the commands in within if provided.
+        An alias counts for its command, which is listed once.
+        """
+        self.build()
+        if within is not None:
+            within = {n for c in within for n in (c.name, *c.aliases)}
+        # Aliases can crowd out other commands, so look further
+        matches = utils.disambiguate(term, self.fuzzy, limit * 3, within) or []
+        results = []
+        seen = set()
+        for match in _resolve_matches(matches, self.bot.get_command):
+            if match["result"].name not in seen:
+                seen.add(match["result"].name)
+                results.append(match)
+        return results[:limit]
+
+    ####################
+    ## Event Handlers ##
+    ####################
+
+    def add(self, command):
+        if self.fuzzy is not None:
+            self._add(command)
+
+    def remove(self, command, name):
+        if self.fuzzy is None:
+            return
+        if name in command.aliases:
+            # Only the alias was removed, the command stays
+            self.fuzzy.remove(name)
+            return
+        for alias in (command.name, *command.aliases):
+            self.fuzzy.remove(alias)
+
+
+class MutualGuildIndex:
+    """
+    Reverse index of user id to the ids of the guilds
+    the user shares with the bot.
+
+    Built the first time it is used and maintained from
+    member and guild events after that. Guilds that come
+    back from an outage are re-added without pruning,
+    so entries are verified and dropped on lookup.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.users = None  # user_id -> {guild_id}
+
+    def build(self):
+        if self.users is None:
+            self.users = {}
+            for guild in self.bot.guilds:
+                self._add_guild(guild)
+        return self.users
+
+    def _add_guild(self, guild):
+        for member in guild.members:
+            self.users.setdefault(member.id, set()).add(guild.id)
+
+    def guilds(self, user_id):
+        """Guilds shared with a user, in no particular order."""
+        guild_ids = self.build().get(user_id)
+        if not guild_ids:
+            return []
+        guilds = []
+        for guild_id in list(guild_ids):
+            guild = self.bot.get_guild(guild_id)
+            if guild is None or guild.get_member(user_id) is None:
+                guild_ids.discard(guild_id)
+                continue
+            guilds.append(guild)
+        if not guild_ids:
+            del self.users[user_id]
+        return guilds
+
+    def memory_usage(self):
+        """
+        Approximate overhead of the index in bytes.
+        Only the dict and sets are counted, the id ints
+        are the same objects the discord.py cache holds.
+        """
+        if self.users is None:
+            return {"users": 0, "links": 0, "bytes": 0}
+        total = sys.getsizeof(self.users)
+        links = 0
+        for guild_ids in self.users.values():
+            links += len(guild_ids)
+            total += sys.getsizeof(guild_ids)
+        return {"users": len(self.users), "links": links, "bytes": total}
+
+    ####################
+    ## Event Handlers ##
+    ####################
+
+    def member_join(self, member):
+        if self.users is not None:
+            self.users.setdefault(member.id, set()).add(member.guild.id)
+
+    def member_remove(self, member):
+        if self.users is None:
+            return
+        guild_ids = self.users.get(member.id)
+        if guild_ids is not None:
+            guild_ids.discard(member.guild.id)
+            if not guild_ids:
+                del self.users[member.id]
+
+    def guild_join(self, guild):
+        if self.users is not None:
+            self._add_guild(guild)
+
+    def guild_remove(self, guild):
+        if self.users is None:
+            return
+        for member in guild.members:
+            self.member_remove(member)
+
+
+class RankingView(Sequence):
+    """
+    Read only view over a ranking that resolves and formats
+    guilds only for the positions that are actually sliced,
+    so it can be handed straight to a ListPageSource.
+    Guilds no longer in the cache are evicted from the
+    rankings as they are met, the rest move up a place.
+    """
+
+    def __init__(self, rankings, ranking, formatter, *, reverse=False):
+        self.rankings = rankings
+        self.ranking = ranking  # sorted [(key, guild_id)]
+        self.formatter = formatter  # (rank, guild, key) -> entry
+        self.reverse = reverse
+
+    def __len__(self):
+        return len(self.ranking)
+
+    def _entry(self, position):
+        while position < len(self.ranking):
+            index = len(self.ranking) - 1 - position if self.reverse else position
+            key, guild_id = self.ranking[index]
+            guild = self.rankings.bot.get_guild(guild_id)
+            if guild is not None:
+                return self.formatter(position + 1, guild, key)
+            self.rankings.evict(guild_id)
+        raise IndexError("ranking index out of range")
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            entries = []
+            for position in range(*item.indices(len(self))):
+                try:
+                    entries.append(self._entry(position))
+                except IndexError:  # Evictions shortened the ranking
+                    break
+            return entries
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("ranking index out of range")
+        return self._entry(item)
+
+
+class GuildListView(Sequence):
+    """
+    Read only view over a snapshot of the guilds in cache order
+    that formats only the positions that are actually sliced.
+    The key passed to the formatter is the member count.
+    """
+
+    def __init__(self, rankings, formatter):
+        self.rankings = rankings
+        self.guilds = rankings.bot.guilds  # Already a fresh list
+        self.formatter = formatter  # (rank, guild, count) -> entry
+
+    def __len__(self):
+        return len(self.guilds)
+
+    def _entry(self, position):
+        guild = self.guilds[position]
+        return self.formatter(position + 1, guild, self.rankings.member_count(guild))
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._entry(p) for p in range(*item.indices(len(self)))]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("guild index out of range")
+        return self._entry(item)
+
+
+class GuildRankings:
+    """
+    The bot's guilds sorted by cached member count and by join date.
+    Each ranking is a sorted list of (key, guild_id) tuples that is
+    updated in place with bisect, so slicing the top or bottom
+    k guilds never sorts or walks the rest of them.
+
+    Built the first time it is used and
+    maintained from member and guild events after that.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.counts = None  # guild_id -> cached member count
+        self.joins = None  # guild_id -> join timestamp
+        self.members = None  # sorted [(member count, guild_id)]
+        self.joined = None  # sorted [(join timestamp, guild_id)]
+
+    def build(self):
+        if self.counts is None:
+            self.counts = {}
+            self.joins = {}
+            for guild in self.bot.guilds:
+                self.counts[guild.id] = len(guild.members)
+                self.joins[guild.id] = self._joined_at(guild)
+            self.members = sorted((c, g) for g, c in self.counts.items())
+            self.joined = sorted((j, g) for g, j in self.joins.items())
+        return self
+
+    @staticmethod
+    def _joined_at(guild):
+        me = guild.me
+        if me is None or me.joined_at is None:
+            return -1
+        return me.joined_at.timestamp()
+
+    @staticmethod
+    def _discard(ranking, entry):
+        position = bisect.bisect_left(ranking, entry)
+        if position < len(ranking) and ranking[position] == entry:
+            del ranking[position]
+
+    def in_cache_order(self, formatter):
+        """Guilds in the order the cache holds them, unsorted."""
+        self.build()
+        return GuildListView(self, formatter)
+
+    def by_members(self, formatter, *, reverse=False):
+        """Guilds by member count, smallest first unless reversed."""
+        self.build()
+        return RankingView(self, self.members, formatter, reverse=reverse)
+
+    def by_joined(self, formatter, *, reverse=False):
+        """Guilds by join date, oldest first unless reversed."""
+        self.build()
+        return RankingView(self, self.joined, formatter, reverse=reverse)
+
+    def member_count(self, guild):
+        return self.build().counts.get(guild.id, 0)
+
+    ####################
+    ## Event Handlers ##
+    ####################
+
+    def _set_count(self, guild_id, count):
+        old = self.counts.get(guild_id)
+        if old == count:
+            return
+        if old is not None:
+            self._discard(self.members, (old, guild_id))
+        self.counts[guild_id] = count
+        bisect.insort(self.members, (count, guild_id))
+
+    def member_join(self, member):
+        if self.counts is not None:
+            guild_id = member.guild.id
+            self._set_count(guild_id, self.counts.get(guild_id, 0) + 1)
+
+    def member_remove(self, member):
+        if self.counts is not None:
+            guild_id = member.guild.id
+            self._set_count(guild_id, max(self.counts.get(guild_id, 1) - 1, 0))
+
+    def guild_join(self, guild):
+        # Also used when a guild becomes available again
+        # since members may have come and gone during the outage.
+        if self.counts is None:
+            return
+        self._set_count(guild.id, len(guild.members))
+        joined = self._joined_at(guild)
+        old = self.joins.get(guild.id)
+        if old != joined:
+            if old is not None:
+                self._discard(self.joined, (old, guild.id))
+            self.joins[guild.id] = joined
+            bisect.insort(self.joined, (joined, guild.id))
+
+    def guild_remove(self, guild):
+        self.evict(guild.id)
+
+    def evict(self, guild_id):
+        if self.counts is None:
+            return
+        count = self.counts.pop(guild_id, None)
+        if count is not None:
+            self._discard(self.members, (count, guild_id))
+        joined = self.joins.pop(guild_id, None)
+        if joined is not None:
+            self._discard(self.joined, (joined, guild_id))
@@ -0,0 +1,156 @@
+"""
+Streaming latency histograms.
+Samples are folded into log scaled buckets as they arrive, so
+percentiles over rolling windows cost a merge of a few sparse
+dicts instead of keeping and sorting every sample.
+"""
+import math
+import time
+
+from collections import Counter
+
+MINIMUM = 0.01  # Smallest distinguishable latency in ms
+PRECISION = 0.02  # Buckets are 2% wide, so values are within 1%
+LOG_BASE = math.log1p(PRECISION)
+
+WINDOWS = {"1m": 60, "5m": 300, "1h": 3600}
+
+
+def bucket(ms):
+    if ms <= MINIMUM:
+        return 0
+    return int(math.log(ms / MINIMUM) / LOG_BASE) + 1
+
+
+def bucket_value(index):
+    """Midpoint of a bucket in ms."""
+    if index == 0:
+        return MINIMUM
+    return MINIMUM * (1 + PRECISION) ** (index - 0.5)
+
+
+class Histogram:
+    """
+    Sparse log bucketed histogram with a running count, sum and max.
+    Histograms merge by adding their buckets.
+    """
+
+    __slots__ = ("buckets", "count", "total", "maximum")
+
+    def __init__(self):
+        self.buckets = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def record(self, ms):
+        self.buckets[bucket(ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.maximum:
+            self.maximum = ms
+
+    def merge(self, other):
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentiles(self, *quantiles):
+        """Approximate values in ms for each quantile between 0 and 1."""
+        if not self.count:
+            return [0.0 for q in quantiles]
+        targets = sorted((q * self.count, i) for i, q in enumerate(quantiles))
+        results = [0.0] * len(quantiles)
+        seen = 0
+        pending = iter(targets)
+        target, position = next(pending)
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            while seen >= target:
+                results[position] = min(bucket_value(index), self.maximum)
+                try:
+                    target, position = next(pending)
+                except StopIteration:
+                    return results
+        return results
+
+
+class RollingHistogram:
+    """
+    Ring of per-slot histograms covering the last hour.
+    Slots are reused as time moves on, memory stays fixed
+    at one sparse histogram per slot.
+    """
+
+    def __init__(self, slot=10, span=3600):
+        self.slot = slot
+        self.slots = [None] * (span // slot)
+        self.stamps = [None] * (span // slot)
+
+    def record(self, ms, now=None):
+        stamp = int((time.monotonic() if now is None else now) // self.slot)
+        position = stamp % len(self.slots)
+        if self.stamps[position] != stamp:
+            self.stamps[position] = stamp
+            self.slots[position] = Histogram()
+        self.slots[position].record(ms)
+
+    def window(self, seconds, now=None):
+        """Merged histogram of the slots within the last seconds."""
+        current = int((time.monotonic() if now is None else now) // self.slot)
+        oldest = current - max(seconds // self.slot, 1) + 1
+        merged = Histogram()
+        for stamp, histogram in zip(self.stamps, self.slots):
+            if stamp is not None and oldest <= stamp <= current:
+                merged.merge(histogram)
+        return merged
+
+
+class LatencyTracker:
+    """
+    Rolling latency histograms by metric name, kept on the bot
+    so they survive cog reloads. The bot records samples for
+    "gateway", "message", "rest" and "database".
+    """
+
+    def __init__(self):
+        self.metrics = {}  # name -> RollingHistogram
+
+    def record(self, name, seconds):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = RollingHistogram()
+        metric.record(seconds * 1000)
+
+    def summary(self, name, window="5m"):
+        """{"count", "mean", "p50", "p95", "p99", "max"} in ms for a window."""
+        metric = self.metrics.get(name)
+        histogram = metric.window(WINDOWS[window]) if metric else Histogram()
+        p50, p95, p99 = histogram.percentiles(0.5, 0.95, 0.99)
+        return {
+            "count": histogram.count,
+            "mean": histogram.mean,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "max": histogram.maximum,
+        }
+
+    def install(self, http):
+        """Time every REST request made through a discord.py HTTPClient."""
+        request = http.request
+
+        async def timed_request(route, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await request(route, **kwargs)
+            finally:
+                self.record("rest", time.perf_counter() - start)
+
+        http.request = timed_request
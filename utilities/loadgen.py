@@ -0,0 +1,162 @@
+"""
+Open loop load generation through the command pipeline.
+Messages start on a fixed schedule at the target rate whether or
+not earlier ones have finished, and latency is measured from the
+scheduled start, so time spent queued behind the concurrency
+limit counts against the bot instead of being hidden.
+"""
+import asyncio
+import time
+
+from utilities import latency
+
+
+class LoadGenerator:
+    """
+    Sends make_message() results to handler, process_commands by
+    default, at rate per second with at most concurrency in flight.
+    Tracks response latency, asyncpg pool waits and loop lag.
+    """
+
+    def __init__(
+        self,
+        bot,
+        make_message,
+        *,
+        rate=10.0,
+        concurrency=10,
+        duration=10.0,
+        handler=None,
+        lag_interval=0.05,
+    ):
+        self.bot = bot
+        self.make_message = make_message
+        self.rate = rate
+        self.concurrency = concurrency
+        self.duration = duration
+        self.handler = handler or bot.process_commands
+        self.lag_interval = lag_interval
+
+        self.latency = latency.Histogram()  # Scheduled start to finish
+        self.pool_wait = latency.Histogram()
+        self.loop_lag = latency.Histogram()
+        self.sent = 0
+        self.completed = 0
+        self.command_errors = 0  # Reported through on_command_error
+        self.failures = 0  # Raised out of the handler
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.elapsed = 0.0
+
+    async def on_command_error(self, ctx, error):
+        self.command_errors += 1
+
+    def _time_pool(self):
+        # Pool._acquire is where callers wait for a free connection
+        pool = self.bot.cxn
+        acquire = pool._acquire
+
+        async def timed_acquire(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await acquire(*args, **kwargs)
+            finally:
+                self.pool_wait.record((time.perf_counter() - start) * 1000)
+
+        pool._acquire = timed_acquire
+        return lambda: delattr(pool, "_acquire")
+
+    async def _probe_lag(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.lag_interval)
+            lag = time.perf_counter() - start - self.lag_interval
+            self.loop_lag.record(max(lag, 0) * 1000)
+
+    async def _send(self, semaphore, due):
+        loop = asyncio.get_event_loop()
+        async with semaphore:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                await self.handler(self.make_message())
+            except Exception:
+                self.failures += 1
+            else:
+                self.completed += 1
+            finally:
+                self.in_flight -= 1
+                self.latency.record((loop.time() - due) * 1000)
+
+    async def run(self):
+        loop = asyncio.get_event_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        self.bot.add_listener(self.on_command_error)
+        restore_pool = self._time_pool() if getattr(self.bot, "cxn", None) else None
+        probe = loop.create_task(self._probe_lag())
+
+        total = max(int(self.duration * self.rate), 1)
+        start = loop.time()
+        tasks = []
+        try:
+            for index in range(total):
+                due = start + index / self.rate
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(loop.create_task(self._send(semaphore, due)))
+                self.sent += 1
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.elapsed = loop.time() - start
+            probe.cancel()
+            if restore_pool is not None:
+                restore_pool()
+            self.bot.remove_listener(self.on_command_error)
+        return self.report()
+
+    def report(self):
+        def summary(histogram):
+            p50, p95, p99 = histogram.percentiles(0.5, 0.95, 0.99)
+            return {
+                "count": histogram.count,
+                "mean": histogram.mean,
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
+                "max": histogram.maximum,
+            }
+
+        return {
+            "sent": self.sent,
+            "completed": self.completed,
+            "command_errors": self.command_errors,
+            "failures": self.failures,
+            "elapsed": self.elapsed,
+            "target_rate": self.rate,
+            "throughput": self.completed / self.elapsed if self.elapsed else 0.0,
+            "peak_in_flight": self.peak_in_flight,
+            "latency": summary(self.latency),
+            "pool_wait": summary(self.pool_wait),
+            "loop_lag": summary(self.loop_lag),
+        }
+
+
+def format_report(report):
+    """Plain text lines for a report."""
+    lines = [
+        f"Sent {report['sent']:,} at {report['target_rate']:g}/s, "
+        f"completed {report['completed']:,} in {report['elapsed']:.1f}s "
+        f"({report['throughput']:.1f}/s)",
+        f"Command errors {report['command_errors']:,}, failures {report['failures']:,}, "
+        f"peak in flight {report['peak_in_flight']}",
+    ]
+    for name in ("latency", "pool_wait", "loop_lag"):
+        s = report[name]
+        lines.append(
+            f"{name:<9} p50 {s['p50']:.2f}ms p95 {s['p95']:.2f}ms "
+            f"p99 {s['p99']:.2f}ms max {s['max']:.2f}ms ({s['count']:,})"
+        )
+    return lines
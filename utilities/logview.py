@@ -0,0 +1,276 @@
+"""
+Seekable reader for the rotating log files.
+The log and its backups are read backwards from the end in
+cached blocks, so showing a page only touches the lines on it.
+Page boundaries are discovered lazily as pages are requested.
+"""
+import bisect
+import collections
+import datetime
+import glob
+import os
+import re
+
+from utilities import humantime
+
+# asctime as written by the formatters in main.py
+TIMESTAMP = re.compile(rb"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+STAMP_SIZE = 19
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_time(argument, now=None):
+    """
+    Local datetime from "YYYY-MM-DD[ HH:MM[:SS]]"
+    or a duration ago like "2h" or "1d12h".
+    """
+    for fmt in (TIME_FORMAT, "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.datetime.strptime(argument, fmt)
+        except ValueError:
+            continue
+    now = now or datetime.datetime.now()  # Log timestamps are local time
+    return humantime.PastShortTime(argument, now=now).dt
+
+
+def rotated(path):
+    """Backups written by RotatingFileHandler, oldest first."""
+    backups = []
+    for backup in glob.glob(glob.escape(path) + ".*"):
+        suffix = backup[len(path) + 1 :]
+        if suffix.isdigit():
+            backups.append((int(suffix), backup))
+    return [backup for _, backup in sorted(backups, reverse=True)]
+
+
+class Segment:
+    """
+    One file read with pread up to the size it had when opened.
+    Reads are never memory mapped: pm2 flush or logger clear can
+    truncate the live log while it is open, and touching a map past
+    the new end raises SIGBUS. Bytes lost to a truncation read as
+    missing instead. Recently read blocks are cached.
+    """
+
+    BLOCK = 64 * 1024
+    CACHED = 16
+
+    def __init__(self, fd, size):
+        self.fd = fd
+        self.size = size
+        self.blocks = collections.OrderedDict()  # block number -> bytes
+
+    def __len__(self):
+        return self.size
+
+    def close(self):
+        os.close(self.fd)
+        self.blocks.clear()
+
+    def block(self, number):
+        data = self.blocks.get(number)
+        if data is None:
+            start = number * self.BLOCK
+            data = os.pread(self.fd, min(self.BLOCK, self.size - start), start)
+            self.blocks[number] = data
+            if len(self.blocks) > self.CACHED:
+                self.blocks.popitem(last=False)
+        else:
+            self.blocks.move_to_end(number)
+        return data
+
+    def read(self, start, end):
+        """Bytes in [start, end), short if the file was truncated."""
+        end = min(end, self.size)
+        chunks = []
+        for number in range(start // self.BLOCK, (end - 1) // self.BLOCK + 1):
+            base = number * self.BLOCK
+            data = self.block(number)
+            chunks.append(data[max(start - base, 0) : end - base])
+            if len(data) < min(self.BLOCK, self.size - base):
+                break  # Truncated, nothing further exists
+        return b"".join(chunks)
+
+    def byte(self, pos):
+        data = self.read(pos, pos + 1)
+        return data[0] if data else None
+
+    def find(self, sub, start):
+        """Like bytes.find for a single byte, -1 if not found."""
+        pos = start
+        while pos < self.size:
+            number = pos // self.BLOCK
+            base = number * self.BLOCK
+            data = self.block(number)
+            index = data.find(sub, pos - base)
+            if index != -1:
+                return base + index
+            if len(data) < min(self.BLOCK, self.size - base):
+                return -1
+            pos = base + self.BLOCK
+        return -1
+
+    def rfind(self, sub, start, end):
+        """Like bytes.rfind for a single byte, -1 if not found."""
+        end = min(end, self.size)
+        while end > start:
+            number = (end - 1) // self.BLOCK
+            base = number * self.BLOCK
+            data = self.block(number)
+            index = data.rfind(sub, max(start - base, 0), end - base)
+            if index != -1:
+                return base + index
+            end = base
+        return -1
+
+
+class LogFile:
+    """
+    A log and its rotated backups read as one stream.
+    Positions are byte offsets into the concatenation, oldest
+    backup first. Sizes are a snapshot taken when opened.
+    Call close when done to release the file descriptors.
+    """
+
+    def __init__(self, path, backups=True):
+        self.path = path
+        self.segments = []
+        self.starts = []  # Stream offset where each segment begins
+        self.size = 0
+        for filename in (rotated(path) if backups else []) + [path]:
+            try:
+                fd = os.open(filename, os.O_RDONLY)
+            except OSError:
+                continue
+            size = os.fstat(fd).st_size
+            if size == 0:
+                os.close(fd)
+                continue
+            self.starts.append(self.size)
+            self.segments.append(Segment(fd, size))
+            self.size += size
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+        self.segments.clear()
+
+    def locate(self, pos):
+        """The segment holding pos and where that segment begins."""
+        index = bisect.bisect_right(self.starts, pos) - 1
+        return self.segments[index], self.starts[index]
+
+    def line_start(self, end):
+        """Start of the line that ends at end."""
+        segment, base = self.locate(end - 1)
+        return base + segment.rfind(b"\n", 0, end - base - 1) + 1
+
+    def line_end(self, pos):
+        """Start of the line after the one holding pos."""
+        segment, base = self.locate(pos)
+        end = segment.find(b"\n", pos - base)
+        return base + (len(segment) if end == -1 else end + 1)
+
+    def line(self, start, end):
+        segment, base = self.locate(start)
+        data = segment.read(start - base, end - base)
+        return data.rstrip(b"\r\n").decode("utf-8", "replace")
+
+    def stamp(self, start, end):
+        """The timestamp a line begins with, as bytes, or None."""
+        segment, base = self.locate(start)
+        data = segment.read(start - base, min(end - base, start - base + STAMP_SIZE))
+        match = TIMESTAMP.match(data)
+        return match.group() if match else None
+
+    def next_stamp(self, pos, limit):
+        """First timestamped line starting in [pos, limit)."""
+        segment, base = self.locate(pos)
+        if pos != base and segment.byte(pos - base - 1) != 10:  # Not at a line start
+            pos = self.line_end(pos)
+        while pos < limit:
+            end = self.line_end(pos)
+            stamp = self.stamp(pos, end)
+            if stamp is not None:
+                return pos, stamp
+            pos = end
+        return limit, None
+
+    def seek(self, when):
+        """
+        Offset of the first line stamped at or after when.
+        Binary search, so records must be in time order.
+        Untimestamped lines belong to the record above them.
+        """
+        target = when.strftime(TIME_FORMAT).encode()
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos, stamp = self.next_stamp(mid, hi)
+            if stamp is None or stamp >= target:
+                hi = mid
+            else:
+                lo = pos + 1
+        return self.next_stamp(lo, self.size)[0] if lo < self.size else self.size
+
+
+class LogPages:
+    """
+    Pages of a LogFile served newest first. Each page holds whole
+    lines up to max_size characters in file order. Only the page
+    boundaries found so far are kept, so memory does not grow
+    with the size of the log.
+    """
+
+    def __init__(self, log, *, pattern=None, since=None, until=None, max_size=1800):
+        self.log = log
+        self.pattern = pattern
+        self.since = since
+        self.until = until
+        self.max_size = max_size
+        self.lower = None
+        self.bounds = None  # bounds[k] is where page k ends, page k + 1 ends where it starts
+        self.complete = False
+
+    def _seek(self):
+        self.lower = self.log.seek(self.since) if self.since else 0
+        self.bounds = [self.log.seek(self.until) if self.until else self.log.size]
+
+    def _lines(self, end):
+        """Lines of the page ending at end, and where that page starts."""
+        lines = []
+        size = 0
+        pos = end
+        while pos > self.lower:
+            start = max(self.log.line_start(pos), self.lower)
+            text = self.log.line(start, pos)
+            if self.pattern is None or self.pattern.search(text):
+                text = text[: self.max_size]
+                if lines and size + len(text) + 1 > self.max_size:
+                    break
+                lines.append(text)
+                size += len(text) + 1
+            pos = start
+        lines.reverse()
+        return lines, pos
+
+    def page(self, number):
+        """Lines of page number, or None past the oldest page. Blocking."""
+        if self.bounds is None:
+            self._seek()
+        while len(self.bounds) <= number + 1 and not self.complete:
+            lines, start = self._lines(self.bounds[-1])
+            if not lines:
+                self.complete = True
+                break
+            self.bounds.append(start)
+            if start <= self.lower:
+                self.complete = True
+        if number + 1 >= len(self.bounds):
+            return None
+        return self._lines(self.bounds[number])[0]
+
+    @property
+    def pages(self):
+        """Total pages once the oldest has been reached, else None."""
+        return len(self.bounds) - 1 if self.complete else None
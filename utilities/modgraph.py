@@ -0,0 +1,178 @@
+"""
+Import graph of the bot's own modules for targeted reloads.
+Files are parsed with ast only when their mtime changes, so
+finding what an edit touched costs one stat per file.
+"""
+import ast
+import collections
+import importlib
+import os
+import sys
+import time
+
+PACKAGES = ("settings", "utilities", "cogs")
+EXCLUDE = {"settings.database"}  # Reloading it would replace the pool
+
+Reload = collections.namedtuple("Reload", ["module", "reason", "seconds", "error"])
+
+
+def parse_imports(path, module):
+    """Every dotted name a file imports, relative imports resolved."""
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                package = module.rsplit(".", node.level)[0]
+                base = f"{package}.{base}" if base else package
+            names.add(base)
+            # from package import module
+            names.update(f"{base}.{alias.name}" for alias in node.names)
+    return names
+
+
+class ModuleGraph:
+    """
+    Modules under the packages and the local modules each imports.
+    Tracks the mtime each module was last loaded at, so edited
+    modules and everything importing them can be reloaded alone.
+    """
+
+    def __init__(self, root=".", packages=PACKAGES, exclude=EXCLUDE):
+        self.root = root
+        self.packages = packages
+        self.exclude = set(exclude)
+        self.paths = {}  # module -> file path
+        self.mtimes = {}  # module -> mtime_ns when parsed
+        self.names = {}  # module -> imported names, local or not
+        self.imports = {}  # module -> local modules it imports
+        self.scan()
+        self.loaded = dict(self.mtimes)  # module -> mtime_ns when last loaded
+
+    def scan(self):
+        """Re-parse modules whose files changed. Blocking."""
+        paths = {}
+        for package in self.packages:
+            directory = os.path.join(self.root, package)
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".py") and name != "__init__.py":
+                    paths[f"{package}.{name[:-3]}"] = os.path.join(directory, name)
+
+        for module in self.paths.keys() - paths.keys():
+            self.mtimes.pop(module, None)
+            self.names.pop(module, None)
+        self.paths = paths
+
+        for module, path in paths.items():
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                if self.mtimes.get(module) != mtime:
+                    self.names[module] = parse_imports(path, module)
+                    self.mtimes[module] = mtime
+            except (OSError, SyntaxError, ValueError):
+                # Reload it anyway so the error is reported
+                self.mtimes[module] = None
+                self.names.setdefault(module, set())
+
+        self.imports = {
+            module: {name for name in names if name in paths and name != module}
+            for module, names in self.names.items()
+        }
+
+    def dependents(self):
+        """module -> local modules that import it"""
+        reverse = collections.defaultdict(set)
+        for module, imports in self.imports.items():
+            for name in imports:
+                reverse[name].add(module)
+        return reverse
+
+    def changed(self):
+        return {
+            module
+            for module, mtime in self.mtimes.items()
+            if mtime is None or mtime != self.loaded.get(module)
+        }
+
+    def closure(self, modules):
+        """The modules and everything that imports them, transitively."""
+        reverse = self.dependents()
+        seen = set(modules)
+        stack = list(modules)
+        while stack:
+            for dependent in reverse.get(stack.pop(), ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+        return seen
+
+    def order(self, modules):
+        """Modules sorted so each comes after the ones it imports."""
+        modules = set(modules)
+        waiting = {m: self.imports.get(m, set()) & modules for m in modules}
+        ordered = []
+        ready = sorted(m for m, deps in waiting.items() if not deps)
+        while ready:
+            module = ready.pop(0)
+            ordered.append(module)
+            del waiting[module]
+            for other, deps in waiting.items():
+                if module in deps:
+                    deps.discard(module)
+                    if not deps:
+                        ready.append(other)
+            ready.sort()
+        # Import cycles have no valid order, reload them by name
+        return ordered + sorted(waiting)
+
+    def plan(self, modules=None):
+        """
+        [(module, reason)] to reload for the given modules, or for
+        the changed ones, followed by everything depending on them.
+        """
+        roots = self.changed() if modules is None else set(modules)
+        reason = "changed" if modules is None else "requested"
+        return [
+            (module, reason if module in roots else "dependent")
+            for module in self.order(self.closure(roots))
+            if module not in self.exclude
+        ]
+
+    def reload(self, bot, plan):
+        """
+        Reloads the planned modules that are currently loaded.
+        Dependents of a module that failed are skipped.
+        """
+        results = []
+        failed = set()
+        for module, reason in plan:
+            loaded = bot.extensions if module.startswith("cogs.") else sys.modules
+            if module not in loaded:
+                # Whatever imports it next gets the file as it is now
+                self.loaded[module] = self.mtimes.get(module)
+                continue
+            broken = self.imports.get(module, set()) & failed
+            if broken:
+                failed.add(module)
+                error = f"Skipped, {', '.join(sorted(broken))} failed to reload"
+                results.append(Reload(module, reason, 0.0, error))
+                continue
+
+            start = time.perf_counter()
+            try:
+                if module.startswith("cogs."):
+                    bot.reload_extension(module)
+                else:
+                    importlib.reload(sys.modules[module])
+            except Exception as e:
+                failed.add(module)
+                error = f"{type(e).__name__}: {e}"
+                results.append(Reload(module, reason, time.perf_counter() - start, error))
+            else:
+                self.loaded[module] = self.mtimes.get(module)
+                results.append(Reload(module, reason, time.perf_counter() - start, None))
+        return results
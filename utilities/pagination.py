@@ -2,14 +2,16 @@ import asyncio
 import math
 import os
 import random
+import sys
 import textwrap
 from collections import namedtuple
 
 import discord
 from discord.ext import menus
-from discord.ext.commands import Paginator as CommandPaginator
 
 from settings import constants
+from utilities import reactions
+from utilities import textpages
 
 # Embed limits
 TITLE_LIMIT = 256
@@ -22,7 +24,56 @@ FIELD_VALUE_LIMIT = 1024
 TOTAL_lIMIT = 6000
 
 
-class MainMenu(menus.MenuPages):
+class RoutedMenu(menus.Menu):
+    """
+    Menu fed by bot.reaction_router in place of the wait_for pair
+    ext.menus holds open per menu. Otherwise runs and cleans up
+    exactly like Menu._internal_loop.
+    """
+
+    def is_running(self):
+        """Whether the menu is still taking reactions."""
+        return not self._event.is_set()
+
+    async def _internal_loop(self):
+        route = self.bot.reaction_router.register(self.message.id, self.reaction_check)
+        timed_out = False
+        try:
+            while self._running:
+                payload = await route.wait(self.timeout)
+                self.bot.loop.create_task(self.update(payload))
+        except asyncio.TimeoutError:
+            timed_out = True
+        finally:
+            self.bot.reaction_router.unregister(route)
+            self._event.set()
+
+            try:
+                await self.finalize(timed_out)
+            except Exception:
+                pass
+
+            if self.bot.is_closed():
+                return
+
+            try:
+                if self.delete_message_after:
+                    return await self.message.delete()
+
+                if self.clear_reactions_after:
+                    if self._can_remove_reactions:
+                        return await self.message.clear_reactions()
+
+                    for button_emoji in self.buttons:
+                        try:
+                            await self.message.remove_reaction(button_emoji, self.bot.user)
+                        except discord.HTTPException:
+                            continue
+            except Exception:
+                pass
+
+
+class MainMenu(RoutedMenu, menus.MenuPages):
     def __init__(self, source):
         super().__init__(source=source, check_embeds=False)
         EmojiB = namedtuple("EmojiB", "emoji position explain")
@@ -56,22 +107,68 @@ class MainMenu(menus.MenuPages):
                 continue
             new_but = self.dict_emoji[emoji.name]
             new_button = menus.Button(
-                new_but.emoji, callback, position=new_but.position
+                new_but.emoji,
+                callback,
+                position=new_but.position,
+                skip_if=self.buttons[emoji].skip_if,
             )
             del self.dict_emoji[emoji.name]
             self.dict_emoji[new_but.emoji] = new_but
             self.add_button(new_button)
             self.remove_button(emoji)
 
+    async def refresh(self):
+        """Shows the current page again, for sources that change."""
+        async with self._lock:
+            try:
+                await self.show_page(self.current_page)
+            except (discord.HTTPException, IndexError):
+                pass
+
     async def finalize(self, timed_out):
         try:
             if timed_out:
-                await self.message.clear_reactions()
+                await reactions.clear(self.message, self.buttons, self.bot.user)
             else:
                 await self.message.delete()
         except discord.HTTPException:
             pass
 
+    def _skip_double_triangle_buttons(self):
+        # Unlike upstream, shown for lazy sources that have no count yet
+        if not self._source.is_paginating():
+            return True
+        max_pages = self._source.get_max_pages()
+        return max_pages is not None and max_pages <= 2
+
+    @menus.button(
+        "\N{BLACK LEFT-POINTING DOUBLE TRIANGLE WITH VERTICAL BAR}\ufe0f",
+        position=menus.First(0),
+        skip_if=_skip_double_triangle_buttons,
+    )
+    async def go_to_first_page(self, payload):
+        """go to the first page"""
+        await self.show_page(0)
+
+    @menus.button(
+        "\N{BLACK RIGHT-POINTING DOUBLE TRIANGLE WITH VERTICAL BAR}\ufe0f",
+        position=menus.Last(1),
+        skip_if=_skip_double_triangle_buttons,
+    )
+    async def go_to_last_page(self, payload):
+        """go to the last page"""
+        max_pages = self._source.get_max_pages()
+        if max_pages is None:
+            # Lazy sources only learn their length by reading to the end
+            try:
+                await self._source.get_page(sys.maxsize)
+            except IndexError:
+                pass
+            max_pages = self._source.get_max_pages()
+        if not max_pages:  # Still unknown, or an empty source
+            return
+        await self.show_page(max_pages - 1)
+
     @menus.button("<:info:827428282001260544>", position=menus.Last(5))
     async def show_help(self, payload):
         """`shows this message`"""
@@ -165,19 +262,177 @@ class FieldPageSource(menus.ListPageSource):
         return self.embed
 
 
-class TextPageSource(menus.ListPageSource):
+class TextPageSource(menus.PageSource):
+    """
+    Code block pages of a string, file or async iterator, see
+    textpages.TextPages. Pages are split as they are shown
+    so a huge text costs no more than the pages viewed.
+    """
+
     def __init__(self, text, *, prefix="```", suffix="```", max_size=2000):
-        pages = CommandPaginator(prefix=prefix, suffix=suffix, max_size=max_size - 200)
-        for line in text.split("\n"):
-            pages.add_line(line)
+        self.pages = textpages.TextPages(
+            text, prefix=prefix, suffix=suffix, max_size=max_size - 200
+        )
+        self.lock = asyncio.Lock()
+
+    async def prepare(self):
+        await self.get_page(0)
 
-        super().__init__(entries=pages.pages, per_page=1)
+    async def close(self):
+        # Waits out a pending read; the caller owns any file passed in
+        async with self.lock:
+            pass
+
+    def is_paginating(self):
+        return self.pages.pages != 1
+
+    def get_max_pages(self):
+        return self.pages.pages
+
+    async def get_page(self, page_number):
+        if page_number < 0:
+            raise IndexError(page_number)
+        async with self.lock:
+            content = await self.pages.page(page_number)
+        if content is None:
+            raise IndexError(page_number)
+        return content
 
     async def format_page(self, menu, content):
+        maximum = self.pages.pages
+        if maximum == 1:
+            return content
+        if maximum is None:
+            estimate = self.pages.estimate
+            maximum = f"~{estimate}" if estimate else "?"
+        return f"{content}\nPage {menu.current_page + 1}/{maximum}"
+
+
+class LogPageSource(menus.PageSource):
+    """
+    Serves logview.LogPages newest first. Pages are read
+    in the executor since a filter may scan far back.
+    """
+
+    def __init__(self, pages, *, prefix="```", suffix="```"):
+        self.pages = pages
+        self.prefix = prefix
+        self.suffix = suffix
+        self.lock = asyncio.Lock()
+
+    async def prepare(self):
+        await self.get_page(0)
+
+    async def close(self):
+        # Waits out a read still running in the executor
+        async with self.lock:
+            self.pages.log.close()
+
+    def is_paginating(self):
+        return self.pages.pages != 1
+
+    def get_max_pages(self):
+        return self.pages.pages
+
+    async def get_page(self, page_number):
+        if page_number < 0:
+            raise IndexError(page_number)
+        loop = asyncio.get_event_loop()
+        async with self.lock:
+            lines = await loop.run_in_executor(None, self.pages.page, page_number)
+        if lines is None:
+            if page_number == 0:
+                return ["No matching lines."]
+            raise IndexError(page_number)
+        return lines
+
+    async def format_page(self, menu, lines):
+        content = self.prefix + "\n" + "\n".join(lines) + "\n" + self.suffix
+        maximum = self.get_max_pages()
+        if maximum == 1:
+            return content
+        total = maximum or "?"
+        return f"{content}\nPage {menu.current_page + 1}/{total} (newest first)"
+
+
+class StreamPageSource(menus.PageSource):
+    """
+    Pages of a running shell.ShellProcess. The page count grows
+    while the process runs, pages that left its window are gone.
+    """
+
+    def __init__(self, process, *, prefix="```", suffix="```"):
+        self.process = process
+        self.prefix = prefix
+        self.suffix = suffix
+
+    def is_paginating(self):
+        # Output may still spill onto more pages
+        return not self.process.done or len(self.process.output) > 1
+
+    def get_max_pages(self):
+        return len(self.process.output) or 1
+
+    async def get_page(self, page_number):
+        output = self.process.output
+        if not len(output) and page_number == 0:
+            return ""
+        return output[page_number]
+
+    async def format_page(self, menu, text):
+        if not text and self.process.done:
+            text = "No output."
+        footer = self.process.status()
         maximum = self.get_max_pages()
         if maximum > 1:
-            return f"{content}\nPage {menu.current_page + 1}/{maximum}"
-        return content
+            footer = f"Page {menu.current_page + 1}/{maximum} | {footer}"
+        dropped = self.process.output.dropped
+        if dropped:
+            footer += f" | Pages 1-{dropped} dropped"
+        return f"{self.prefix}\n{text}\n{self.suffix}\n{footer}"
+
+
+class CursorPageSource(menus.PageSource):
+    """
+    Pages of a sqlview.CursorPages. Rows are only fetched from
+    the server when a page past the ones read so far is shown.
+    """
+
+    def __init__(self, pages, *, prefix="```sml", suffix="```"):
+        self.pages = pages
+        self.prefix = prefix
+        self.suffix = suffix
+        self.lock = asyncio.Lock()  # One query at a time per connection
+
+    async def prepare(self):
+        await self.get_page(0)
+
+    def is_paginating(self):
+        return self.pages.max_pages != 1
+
+    def get_max_pages(self):
+        return self.pages.max_pages
+
+    async def get_page(self, page_number):
+        if page_number < 0:
+            raise IndexError(page_number)
+        async with self.lock:
+            table = await self.pages.page(page_number)
+        if table is None:
+            if page_number == 0:
+                return "No rows."
+            raise IndexError(page_number)
+        return table
+
+    async def format_page(self, menu, table):
+        pages = self.pages
+        footer = f"{pages.rows:,} rows read in {pages.elapsed * 1000:.2f}ms"
+        if pages.limited:
+            footer += f" (limit {pages.limit:,})"
+        maximum = self.get_max_pages()
+        if maximum != 1:
+            footer = f"Page {menu.current_page + 1}/{maximum or '?'} | {footer}"
+        return f"{self.prefix}\n{table}\n{self.suffix}\n*{footer}*"
 
 
 class SimplePageSource(menus.ListPageSource):
@@ -243,7 +498,7 @@ class SimplePages(MainMenu):
         self.embed = discord.Embed(color=kwargs.get("color", constants.embed))
 
 
-class Confirmation(menus.Menu):
+class Confirmation(RoutedMenu):
     def __init__(self, msg):
         super().__init__(timeout=30.0, delete_message_after=True)
         self.msg = msg
@@ -868,21 +1123,17 @@ class Picker:
         self.color = kwargs.get("color", constants.embed)
         self.footer = kwargs.get("footer", discord.Embed.Empty)
         self.embed_title = kwargs.get("embed_title", discord.Embed.Empty)
+        self._seeding = None
 
-    async def _add_reactions(self, message, react_list):
-        for r in react_list:
-            await message.add_reaction(r)
+    def _add_reactions(self, message, react_list):
+        # Seeded in the background, we are already listening
+        self._seeding = reactions.seed(message, react_list)
 
     async def _remove_reactions(self, react_list=[]):
         # Try to remove all reactions - if that fails, iterate and remove our own
-        try:
-            await self.self_message.clear_reactions()
-        except Exception:
-            pass
-            # The following "works", but is super slow - and if we can't clear
-            # all reactions, it's probably just best to leave them there and bail.
-            """for r in react_list:
-                await message.remove_reaction(r,message.author)"""
+        if self._seeding is not None:
+            self._seeding.cancel()
+        await reactions.clear(self.self_message, react_list, self.ctx.me)
 
     async def pick(self, embed=False, syntax=None):
         # This actually brings up the pick list and handles the nonsense
@@ -923,28 +1174,29 @@ class Picker:
                 self.self_message = await self.ctx.send_or_reply(embed=msg)
             else:
                 self.self_message = await self.ctx.send_or_reply(msg)
-        # Add our reactions
-        await self._add_reactions(self.self_message, current_reactions)
         # Now we would wait...
-        def check(reaction, user):
+        def check(payload):
             return (
-                reaction.message.id == self.self_message.id
-                and user == self.ctx.author
-                and str(reaction.emoji) in current_reactions
+                payload.user_id == self.ctx.author.id
+                and str(payload.emoji) in current_reactions
             )
 
+        router = self.ctx.bot.reaction_router
+        route = router.register(self.self_message.id, check, events=("raw_reaction_add",))
+        # Add our reactions
+        self._add_reactions(self.self_message, current_reactions)
         try:
-            reaction, user = await self.ctx.bot.wait_for(
-                "picklist_reaction", timeout=self.timeout, check=check
-            )
+            payload = await route.wait(self.timeout)
         except Exception:
             # Didn't get a reaction
             await self._remove_reactions(current_reactions)
             return (-2, self.self_message)
+        finally:
+            router.unregister(route)
 
         await self._remove_reactions(current_reactions)
         # Get the adjusted index
-        ind = current_reactions.index(str(reaction.emoji))
+        ind = current_reactions.index(str(payload.emoji))
         if ind == len(current_reactions) - 1:
             ind = -1
         return (ind, self.self_message)
@@ -1001,79 +1253,81 @@ class PagePicker(Picker):
         # First verify we have more than one page to display
         if pages <= 1:
             return (0, self.self_message)
-        # Add our reactions
-        await self._add_reactions(self.self_message, self.reactions)
         # Now we would wait...
-        def check(reaction, user):
+        def check(payload):
             return (
-                reaction.message.id == self.self_message.id
-                and user == self.ctx.author
-                and str(reaction.emoji) in self.reactions
+                payload.user_id == self.ctx.author.id
+                and str(payload.emoji) in self.reactions
             )
 
-        while True:
-            try:
-                reaction, user = await self.ctx.bot.wait_for(
-                    "picklist_reaction", timeout=self.timeout, check=check
+        router = self.ctx.bot.reaction_router
+        route = router.register(self.self_message.id, check, events=("raw_reaction_add",))
+        # Add our reactions
+        self._add_reactions(self.self_message, self.reactions)
+        try:
+            while True:
+                try:
+                    payload = await route.wait(self.timeout)
+                except Exception:
+                    # Didn't get a reaction
+                    await self._remove_reactions(self.reactions)
+                    return (page, self.self_message)
+                # Got a reaction - let's process it
+                ind = self.reactions.index(str(payload.emoji))
+                if ind == 5:
+                    # We bailed - let's clear reactions and close it down
+                    await self._remove_reactions(self.reactions)
+                    return (page, self.self_message)
+                page = (
+                    0
+                    if ind == 0
+                    else page - 1
+                    if ind == 1
+                    else page + 1
+                    if ind == 2
+                    else pages
+                    if ind == 3
+                    else page
                 )
-            except Exception:
-                # Didn't get a reaction
-                await self._remove_reactions(self.reactions)
-                return (page, self.self_message)
-            # Got a reaction - let's process it
-            ind = self.reactions.index(str(reaction.emoji))
-            if ind == 5:
-                # We bailed - let's clear reactions and close it down
-                await self._remove_reactions(self.reactions)
-                return (page, self.self_message)
-            page = (
-                0
-                if ind == 0
-                else page - 1
-                if ind == 1
-                else page + 1
-                if ind == 2
-                else pages
-                if ind == 3
-                else page
-            )
-            if ind == 4:
-                # User selects a page
-                page_instruction = await self.ctx.send_or_reply(
-                    "Type the number of that page to go to from {} to {}.".format(
-                        1, pages
+                if ind == 4:
+                    # User selects a page
+                    page_instruction = await self.ctx.send_or_reply(
+                        "Type the number of that page to go to from {} to {}.".format(
+                            1, pages
+                        )
                     )
-                )
 
-                def check_page(message):
+                    def check_page(message):
+                        try:
+                            num = int(message.content)
+                        except Exception:
+                            return False
+                        return (
+                            message.channel == self.self_message.channel
+                            and message.author.id == payload.user_id
+                        )
+
                     try:
-                        num = int(message.content)
+                        page_message = await self.ctx.bot.wait_for(
+                            "message", timeout=self.timeout, check=check_page
+                        )
+                        page = int(page_message.content) - 1
                     except Exception:
-                        return False
-                    return (
-                        message.channel == self.self_message.channel
-                        and user == message.author
-                    )
-
-                try:
-                    page_message = await self.ctx.bot.wait_for(
-                        "message", timeout=self.timeout, check=check_page
-                    )
-                    page = int(page_message.content) - 1
-                except Exception:
-                    # Didn't get a message
-                    pass
-                # Delete the instruction
-                await page_instruction.delete()
-                # Try to delete the user's page message too
-                try:
-                    await page_message.delete()
-                except Exception:
-                    pass
-            page = 0 if page < 0 else pages - 1 if page > pages - 1 else page
-            embed["fields"] = self._get_page_contents(page)
-            embed["footer"] = "Page {} of {}".format(page + 1, pages)
-            await Embed(**embed).edit(self.ctx, self.self_message)
+                        # Didn't get a message
+                        pass
+                    # Delete the instruction
+                    await page_instruction.delete()
+                    # Try to delete the user's page message too
+                    try:
+                        await page_message.delete()
+                    except Exception:
+                        pass
+                page = 0 if page < 0 else pages - 1 if page > pages - 1 else page
+                embed["fields"] = self._get_page_contents(page)
+                embed["footer"] = "Page {} of {}".format(page + 1, pages)
+                await Embed(**embed).edit(self.ctx, self.self_message)
+        finally:
+            router.unregister(route)
         await self._remove_reactions(self.reactions)
         # Get the adjusted index
         return (page, self.self_message)
@@ -0,0 +1,257 @@
+"""
+Periodic snapshots of Postgres table, index and query statistics.
+The catalog only ever shows current values, so the collector keeps
+a history in relation_stats and query_stats (data/scripts/stats.sql)
+that the postgres commands use to show growth and flag tables
+that need an index or a VACUUM.
+"""
+import asyncio
+import datetime
+import logging
+
+import asyncpg
+from discord.ext import tasks
+
+traceback_logger = logging.getLogger("TRACEBACK_LOGGER")
+
+RETENTION = 30  # Days of snapshots kept
+TOP_STATEMENTS = 20  # pg_stat_statements rows kept per snapshot
+
+# A table is flagged for an index when it is mostly sequentially
+# scanned, each scan reads many rows and it is big enough to matter
+SEQ_ROWS_PER_SCAN = 1000
+SEQ_MIN_ROWS = 10000
+# and for VACUUM when dead rows pass this share of the table
+DEAD_RATIO = 0.2
+DEAD_MIN_ROWS = 1000
+
+# Raised while the database is down or restarting, anything else is a bug
+CONNECTION_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.InterfaceError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.CannotConnectNowError,
+)
+
+TABLES = """
+         SELECT s.relname AS relation,
+             pg_total_relation_size(s.relid) AS total_bytes,
+             pg_indexes_size(s.relid) AS index_bytes,
+             COALESCE(pg_total_relation_size(c.reltoastrelid), 0) AS toast_bytes,
+             s.n_live_tup AS live_rows,
+             s.n_dead_tup AS dead_rows,
+             s.seq_scan,
+             s.seq_tup_read,
+             COALESCE(s.idx_scan, 0) AS idx_scan,
+             GREATEST(s.last_vacuum, s.last_autovacuum) AS last_vacuum
+         FROM pg_stat_user_tables s
+         JOIN pg_class c ON c.oid = s.relid
+         WHERE s.schemaname = 'public'
+         AND ($1::TEXT IS NULL OR s.relname = $1);
+         """
+
+INDEXES = """
+          SELECT s.indexrelname AS relation,
+              s.relname AS parent,
+              pg_relation_size(s.indexrelid) AS total_bytes,
+              s.idx_scan,
+              i.indisunique AS is_unique
+          FROM pg_stat_user_indexes s
+          JOIN pg_index i ON i.indexrelid = s.indexrelid
+          WHERE s.schemaname = 'public';
+          """
+
+# total_exec_time replaced total_time in Postgres 13
+STATEMENTS = """
+             SELECT queryid, query, calls, {0} AS total_ms, rows
+             FROM pg_stat_statements
+             WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+             ORDER BY {0} DESC
+             LIMIT $1;
+             """
+
+
+def pretty_size(size, sign=False):
+    """Bytes as pg_size_pretty would show them, signed for growth."""
+    prefix = ("+" if size >= 0 else "-") if sign else ("-" if size < 0 else "")
+    size = abs(size)
+    for unit in ("bytes", "kB", "MB", "GB"):
+        if size < 10240:
+            return f"{prefix}{size:.0f} {unit}"
+        size /= 1024
+    return f"{prefix}{size:.0f} TB"
+
+
+def bloat(table):
+    """
+    Bytes estimated to be held by dead rows. Cruder than
+    pgstattuple but free, it only reads the stats collector.
+    """
+    rows = table["live_rows"] + table["dead_rows"]
+    if not rows:
+        return 0
+    heap = table["total_bytes"] - table["index_bytes"] - table["toast_bytes"]
+    return int(heap * table["dead_rows"] / rows)
+
+
+def advise(table):
+    """Flags for a pg_stat_user_tables row, empty when healthy."""
+    flags = []
+    seq_scan = table["seq_scan"] or 0
+    if (
+        table["live_rows"] >= SEQ_MIN_ROWS
+        and seq_scan > table["idx_scan"]
+        and table["seq_tup_read"] / max(seq_scan, 1) >= SEQ_ROWS_PER_SCAN
+    ):
+        flags.append("needs index")
+    rows = table["live_rows"] + table["dead_rows"]
+    if table["dead_rows"] >= DEAD_MIN_ROWS and table["dead_rows"] / rows >= DEAD_RATIO:
+        flags.append("needs vacuum")
+    return flags
+
+
+def change(growth, relation):
+    """Signed size change of relation in a growth() result."""
+    if relation not in growth:
+        return "n/a"
+    before, after = growth[relation]
+    return pretty_size(after - before, sign=True)
+
+
+async def statements(connection, limit=TOP_STATEMENTS):
+    """Top pg_stat_statements rows by total time, None without the extension."""
+    for column in ("total_exec_time", "total_time"):
+        try:
+            return await connection.fetch(STATEMENTS.format(column), limit)
+        except asyncpg.UndefinedColumnError:
+            continue
+        except (asyncpg.UndefinedTableError, asyncpg.ObjectNotInPrerequisiteStateError):
+            return None  # Not installed or not in shared_preload_libraries
+    return None
+
+
+async def table(connection, name):
+    """Current statistics of one table, None if it does not exist."""
+    return await connection.fetchrow(TABLES, name)
+
+
+async def snapshot(connection):
+    """Current table, index and statement statistics."""
+    return {
+        "tables": await connection.fetch(TABLES, None),
+        "indexes": await connection.fetch(INDEXES),
+        "statements": await statements(connection),
+    }
+
+
+async def growth(connection, days, kind="table", relation=None):
+    """
+    relation -> (bytes then, bytes now) between the first
+    snapshot inside the last days and the latest one.
+    Sizes are pg_total_relation_size for tables and
+    pg_relation_size for indexes.
+    """
+    query = """
+            SELECT DISTINCT ON (relation) relation,
+                FIRST_VALUE(total_bytes) OVER w AS before,
+                LAST_VALUE(total_bytes) OVER w AS after
+            FROM relation_stats
+            WHERE taken_at >= (NOW() AT TIME ZONE 'utc') - $1::INTERVAL
+            AND ($2::TEXT IS NULL OR kind = $2)
+            AND ($3::TEXT IS NULL OR relation = $3)
+            WINDOW w AS (
+                PARTITION BY relation ORDER BY taken_at
+                ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+            );
+            """
+    records = await connection.fetch(query, datetime.timedelta(days=days), kind, relation)
+    return {r["relation"]: (r["before"], r["after"]) for r in records}
+
+
+async def history(connection, relation, days=RETENTION):
+    """Snapshots of one relation over the last days, oldest first."""
+    query = """
+            SELECT * FROM relation_stats
+            WHERE relation = $1
+            AND taken_at >= (NOW() AT TIME ZONE 'utc') - $2::INTERVAL
+            ORDER BY taken_at;
+            """
+    return await connection.fetch(query, relation, datetime.timedelta(days=days))
+
+
+class StatsCollector:
+    """
+    Stores a snapshot every interval minutes and prunes
+    snapshots older than RETENTION days.
+    """
+
+    def __init__(self, bot, interval=30.0):
+        self.bot = bot
+        self.last = None  # Latest snapshot taken
+        self.statements_available = None
+        self.collector.change_interval(minutes=interval)
+
+    def start(self):
+        if not self.collector.is_running():
+            self.collector.start()
+
+    def stop(self):
+        self.collector.cancel()
+
+    async def collect(self):
+        now = datetime.datetime.utcnow()
+        async with self.bot.cxn.acquire() as conn:
+            snap = await snapshot(conn)
+            tables = [
+                (
+                    now,
+                    t["relation"],
+                    None,
+                    "table",
+                    t["total_bytes"],
+                    t["index_bytes"],
+                    t["toast_bytes"],
+                    t["live_rows"],
+                    t["dead_rows"],
+                    bloat(t),
+                    t["seq_scan"],
+                    t["seq_tup_read"],
+                    t["idx_scan"],
+                    t["last_vacuum"],
+                )
+                for t in snap["tables"]
+            ]
+            indexes = [
+                (now, i["relation"], i["parent"], "index", i["total_bytes"])
+                + (None,) * 7
+                + (i["idx_scan"], None)
+                for i in snap["indexes"]
+            ]
+            async with conn.transaction():
+                await conn.copy_records_to_table(
+                    "relation_stats", records=tables + indexes
+                )
+                if snap["statements"]:
+                    await conn.copy_records_to_table(
+                        "query_stats",
+                        records=[
+                            (now, s["queryid"], s["query"], s["calls"], s["total_ms"], s["rows"])
+                            for s in snap["statements"]
+                        ],
+                    )
+                cutoff = now - datetime.timedelta(days=RETENTION)
+                await conn.execute("DELETE FROM relation_stats WHERE taken_at < $1;", cutoff)
+                await conn.execute("DELETE FROM query_stats WHERE taken_at < $1;", cutoff)
+        self.statements_available = snap["statements"] is not None
+        self.last = snap
+        return snap
+
+    @tasks.loop(minutes=30.0)
+    async def collector(self):
+        try:
+            await self.collect()
+        except CONNECTION_ERRORS:  # Keep collecting through database outages
+            pass
+        except Exception:
+            traceback_logger.exception("Postgres stats collection failed")
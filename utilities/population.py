@@ -0,0 +1,205 @@
+"""
+Bot-wide member and channel counters kept current from gateway events.
+Commands read an O(1) snapshot instead of walking every guild.
+"""
+import discord
+
+from collections import Counter
+
+COUNTERS = (
+    "guilds",
+    "members",
+    "humans",
+    "bots",
+    "humans_online",
+    "bots_online",
+    "channels",
+    "text_channels",
+    "voice_channels",
+)
+
+
+class PopulationStats:
+    """
+    Member, unique user, online and channel counts across every guild.
+
+    Built the first time it is read and maintained from member,
+    channel and guild events after that. A guild coming back from an
+    outage invalidates the counts since members may have come and gone
+    without events, they are rebuilt on the next read.
+    verify() re-derives everything from the cache and reports drift.
+
+    Status counters are kept per guild and bot-wide, split into
+    humans and bots. They rely on the members and presences intents.
+    Without them discord.py fills the member cache and changes
+    statuses without dispatching the events the counters follow,
+    so status_counts() scans the cached members instead.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.counts = None  # counter name -> int
+        self.humans = None  # user_id -> number of guilds shared
+        self.bots = None  # user_id -> number of guilds shared
+        self.statuses = None  # "humans"/"bots" -> Counter of discord.Status
+        self.guild_statuses = None  # guild_id -> same as statuses
+
+    @property
+    def presence_aware(self):
+        intents = self.bot.intents
+        return intents.members and intents.presences
+
+    def build(self):
+        if self.counts is None:
+            self.counts = dict.fromkeys(COUNTERS, 0)
+            self.humans = {}
+            self.bots = {}
+            self.statuses = self._new_statuses()
+            self.guild_statuses = {}
+            for guild in self.bot.guilds:
+                self._add_guild(guild, 1)
+        return self.counts
+
+    def snapshot(self):
+        """Current counts as a plain dict."""
+        counts = dict(self.build())
+        counts["unique_humans"] = len(self.humans)
+        counts["unique_bots"] = len(self.bots)
+        return counts
+
+    def status_counts(self, guild=None):
+        """
+        {"humans": Counter, "bots": Counter} of discord.Status
+        for one guild, or for every guild when guild is None.
+        """
+        if not self.presence_aware:
+            members = guild.members if guild else self.bot.get_all_members()
+            statuses = self._new_statuses()
+            for member in members:
+                statuses["bots" if member.bot else "humans"][member.status] += 1
+            return statuses
+
+        self.build()
+        if guild is None:
+            statuses = self.statuses
+        else:
+            statuses = self.guild_statuses.get(guild.id) or self._new_statuses()
+        return {kind: Counter(counter) for kind, counter in statuses.items()}
+
+    def verify(self):
+        """
+        Rebuild from the cache and return the counters that
+        had drifted as {name: (maintained, actual)}.
+        The rebuilt counts replace the maintained ones.
+        """
+        maintained = self.snapshot()
+        maintained_statuses = self.guild_statuses
+        self.counts = None
+        actual = self.snapshot()
+        drift = {
+            name: (maintained[name], actual[name])
+            for name in actual
+            if maintained[name] != actual[name]
+        }
+        stale = sum(
+            1
+            for guild_id, statuses in self.guild_statuses.items()
+            if self._positive(statuses)
+            != self._positive(maintained_statuses.get(guild_id))
+        )
+        if stale:
+            drift["guild_statuses"] = (stale, 0)
+        return drift
+
+    @staticmethod
+    def _positive(statuses):
+        # Counters keep zeroed keys around after decrements
+        if statuses is None:
+            return None
+        return {kind: +counter for kind, counter in statuses.items()}
+
+    @staticmethod
+    def _new_statuses():
+        return {"humans": Counter(), "bots": Counter()}
+
+    def _add_status(self, member, status, sign):
+        kind = "bots" if member.bot else "humans"
+        self.statuses[kind][status] += sign
+        statuses = self.guild_statuses.get(member.guild.id)
+        if statuses is None:
+            statuses = self.guild_statuses[member.guild.id] = self._new_statuses()
+        statuses[kind][status] += sign
+
+    def _add_member(self, member, sign):
+        kind = "bots" if member.bot else "humans"
+        self.counts["members"] += sign
+        self.counts[kind] += sign
+        if member.status is not discord.Status.offline:
+            self.counts[f"{kind}_online"] += sign
+        self._add_status(member, member.status, sign)
+
+        refs = self.bots if member.bot else self.humans
+        shared = refs.get(member.id, 0) + sign
+        if shared > 0:
+            refs[member.id] = shared
+        else:
+            refs.pop(member.id, None)
+
+    def _add_channel(self, channel, sign):
+        self.counts["channels"] += sign
+        if isinstance(channel, discord.TextChannel):
+            self.counts["text_channels"] += sign
+        elif isinstance(channel, discord.VoiceChannel):
+            self.counts["voice_channels"] += sign
+
+    def _add_guild(self, guild, sign):
+        self.counts["guilds"] += sign
+        for member in guild.members:
+            self._add_member(member, sign)
+        for channel in guild.channels:
+            self._add_channel(channel, sign)
+        if sign < 0:
+            self.guild_statuses.pop(guild.id, None)
+
+    ####################
+    ## Event Handlers ##
+    ####################
+
+    def member_join(self, member):
+        if self.counts is not None:
+            self._add_member(member, 1)
+
+    def member_remove(self, member):
+        if self.counts is not None:
+            self._add_member(member, -1)
+
+    def member_update(self, before, after):
+        # Presence updates arrive here in discord.py 1.7
+        if self.counts is None or before.status is after.status:
+            return
+        self._add_status(before, before.status, -1)
+        self._add_status(after, after.status, 1)
+        was_online = before.status is not discord.Status.offline
+        is_online = after.status is not discord.Status.offline
+        if was_online != is_online:
+            kind = "bots" if after.bot else "humans"
+            self.counts[f"{kind}_online"] += 1 if is_online else -1
+
+    def channel_create(self, channel):
+        if self.counts is not None:
+            self._add_channel(channel, 1)
+
+    def channel_delete(self, channel):
+        if self.counts is not None:
+            self._add_channel(channel, -1)
+
+    def guild_join(self, guild):
+        if self.counts is not None:
+            self._add_guild(guild, 1)
+
+    def guild_remove(self, guild):
+        if self.counts is not None:
+            self._add_guild(guild, -1)
+
+    def guild_available(self, guild):
+        self.counts = None
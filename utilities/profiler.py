@@ -0,0 +1,98 @@
+"""
+Opt-in timing for gateway event handlers.
+Every scheduled handler, bot events and cog listeners alike,
+goes through Client._schedule_event. Enabling the profiler
+shadows it on the client with one that wraps each handler and
+disabling removes that again, so a disabled profiler costs nothing.
+"""
+import functools
+import time
+
+from utilities import latency
+
+
+class HandlerStats:
+    __slots__ = ("histogram", "errors")
+
+    def __init__(self):
+        self.histogram = latency.Histogram()
+        self.errors = 0
+
+
+class DispatchProfiler:
+    """
+    Call count, timing percentiles and exceptions per (event, handler).
+    Timings are wall clock from start to finish of the handler, so
+    handlers that await I/O include the time spent waiting on it.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.enabled = False
+        self.since = None
+        self.handlers = {}  # (event, handler qualname) -> HandlerStats
+
+    def enable(self):
+        if not self.enabled:
+            self.enabled = True
+            self.since = time.time()
+            # The instance attribute shadows the class's method
+            self.client._schedule_event = self._schedule_event
+
+    def disable(self):
+        if self.enabled:
+            self.enabled = False
+            del self.client._schedule_event
+
+    def _schedule_event(self, coro, event_name, *args, **kwargs):
+        schedule = type(self.client)._schedule_event
+        return schedule(self.client, self.wrap(coro, event_name), event_name, *args, **kwargs)
+
+    def reset(self):
+        self.handlers.clear()
+        self.since = time.time() if self.enabled else None
+
+    def wrap(self, coro, event_name):
+        key = (event_name, getattr(coro, "__qualname__", repr(coro)))
+        stats = self.handlers.get(key)
+        if stats is None:
+            stats = self.handlers[key] = HandlerStats()
+
+        @functools.wraps(coro)
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await coro(*args, **kwargs)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.histogram.record((time.perf_counter() - start) * 1000)
+
+        return timed
+
+    def report(self, sort="total"):
+        """
+        Rows of {"event", "handler", "calls", "errors", "total", "mean",
+        "p50", "p95", "p99", "max"} with times in ms, sorted descending.
+        """
+        rows = []
+        for (event, handler), stats in self.handlers.items():
+            histogram = stats.histogram
+            p50, p95, p99 = histogram.percentiles(0.5, 0.95, 0.99)
+            rows.append(
+                {
+                    "event": event,
+                    "handler": handler,
+                    "calls": histogram.count,
+                    "errors": stats.errors,
+                    "total": histogram.total,
+                    "mean": histogram.mean,
+                    "p50": p50,
+                    "p95": p95,
+                    "p99": p99,
+                    "max": histogram.maximum,
+                }
+            )
+        rows.sort(key=lambda row: row[sort], reverse=True)
+        return rows
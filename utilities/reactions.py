@@ -0,0 +1,167 @@
+"""
+Routes reaction events to whatever is waiting on the message,
+and seeds and clears the reactions menus are driven by.
+A wait_for check per open menu means discord.py runs every check
+against every reaction event. Menus register their message id here
+instead, so an event costs one dict lookup however many are open.
+Routes are capped and the least recently used go first, and
+routes left idle past IDLE_TIMEOUT are evicted.
+"""
+import asyncio
+import collections
+import logging
+import time
+
+import discord
+
+MAX_ROUTES = 1000
+IDLE_TIMEOUT = 900.0  # Longer than any menu's own timeout
+EVENTS = ("raw_reaction_add", "raw_reaction_remove")
+
+traceback_logger = logging.getLogger("TRACEBACK_LOGGER")
+
+
+class Route:
+    """One registered message, payloads wait in its queue."""
+
+    __slots__ = ("message_id", "check", "events", "queue", "last", "closed")
+
+    def __init__(self, message_id, check, events):
+        self.message_id = message_id
+        self.check = check
+        self.events = events
+        self.queue = asyncio.Queue()
+        self.last = time.monotonic()
+        self.closed = False
+
+    async def wait(self, timeout=None):
+        """
+        Next matching payload. Raises asyncio.TimeoutError
+        on timeout or once the route has been evicted, and
+        what the check raised if it failed, like wait_for.
+        """
+        if self.closed and self.queue.empty():
+            raise asyncio.TimeoutError()
+        payload = await asyncio.wait_for(self.queue.get(), timeout)
+        if payload is None:
+            raise asyncio.TimeoutError()
+        if isinstance(payload, Exception):
+            raise payload
+        return payload
+
+
+class ReactionRouter:
+    """
+    message id -> Route, fed by Candybot.dispatch for the raw
+    reaction events.
+    """
+
+    def __init__(self, limit=MAX_ROUTES, idle=IDLE_TIMEOUT):
+        self.limit = limit
+        self.idle = idle
+        self.routes = collections.OrderedDict()  # Least recently active first
+        self.routed = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self.routes)
+
+    def register(self, message_id, check=None, events=EVENTS):
+        """
+        Route for message_id. check(payload) filters what reaches
+        it, like a wait_for check. A message has one route, a new
+        one replaces the old.
+        """
+        self.sweep()
+        if message_id in self.routes:
+            self._close(self.routes.pop(message_id))
+        while len(self.routes) >= self.limit:
+            self._close(self.routes.popitem(last=False)[1])
+        route = Route(message_id, check, events)
+        self.routes[message_id] = route
+        return route
+
+    def unregister(self, route):
+        if self.routes.get(route.message_id) is route:
+            del self.routes[route.message_id]
+        route.closed = True
+
+    def route(self, event, payload):
+        """
+        Queues payload for its message's route, returns whether it
+        matched. Runs inside the gateway parser, so a check that
+        raises drops its route instead of propagating.
+        """
+        route = self.routes.get(payload.message_id)
+        if route is None or event not in route.events:
+            return False
+        try:
+            if route.check is not None and not route.check(payload):
+                return False
+        except Exception as e:
+            traceback_logger.exception(f"Reaction check for message {route.message_id} failed")
+            self.unregister(route)
+            route.queue.put_nowait(e)  # The waiter raises it
+            return False
+        route.last = time.monotonic()
+        self.routes.move_to_end(route.message_id)
+        route.queue.put_nowait(payload)
+        self.routed += 1
+        return True
+
+    def sweep(self, now=None):
+        """Evicts routes idle for longer than idle seconds."""
+        cutoff = (time.monotonic() if now is None else now) - self.idle
+        while self.routes:
+            route = next(iter(self.routes.values()))
+            if route.last > cutoff:
+                break
+            self._close(self.routes.popitem(last=False)[1])
+
+    def _close(self, route):
+        # Wakes the waiter, which sees a timeout
+        route.closed = True
+        route.queue.put_nowait(None)
+        self.evicted += 1
+
+
+def seed(message, emojis):
+    """
+    Adds emojis to message in order in the background and returns
+    the task, cancel it once an answer is in to skip the rest.
+    discord.py already sends each request as soon as the bucket's
+    ratelimit allows, what waiting on seeding cost was listening.
+    Register a route before seeding so early reactions count.
+    """
+
+    async def add():
+        for emoji in emojis:
+            try:
+                await message.add_reaction(emoji)
+            except discord.NotFound:
+                return  # Message deleted, likely already answered
+            except discord.HTTPException:
+                continue
+
+    return asyncio.get_event_loop().create_task(add())
+
+
+async def clear(message, emojis, me):
+    """
+    Removes the menu's reactions, everyone's in one request when
+    we can manage messages, otherwise only ours.
+    """
+    try:
+        await message.clear_reactions()
+        return
+    except discord.Forbidden:
+        pass
+    except discord.HTTPException:
+        return
+    for emoji in emojis:
+        try:
+            await message.remove_reaction(emoji, me)
+        except discord.NotFound:
+            return
+        except discord.HTTPException:
+            continue
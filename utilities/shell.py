@@ -0,0 +1,201 @@
+"""
+Streaming runner for shell commands.
+Output is read in chunks as the process writes it and packed
+into pages, only the newest window of pages is kept. The
+process is killed once it goes over its byte, line or time cap.
+"""
+import asyncio
+import codecs
+import collections
+import os
+import signal
+import subprocess
+import time
+
+MAX_BYTES = 8 * 1024 ** 2
+MAX_LINES = 100_000
+TIMEOUT = 300.0  # Seconds
+CHUNK = 64 * 1024
+
+
+class OutputPages:
+    """
+    Whole lines packed into pages of up to max_size characters.
+    Only the last window pages are held, older ones are dropped
+    but still counted so page numbers stay stable.
+    """
+
+    def __init__(self, max_size=1800, window=100):
+        self.max_size = max_size
+        self.pages = collections.deque(maxlen=window)
+        self.dropped = 0  # Pages evicted from the front of the window
+        self.current = []  # Lines of the page still filling
+        self.size = 0
+        self.lines = 0
+
+    def add_line(self, line):
+        line = line[: self.max_size]
+        if self.current and self.size + len(line) + 1 > self.max_size:
+            if len(self.pages) == self.pages.maxlen:
+                self.dropped += 1
+            self.pages.append("\n".join(self.current))
+            self.current = []
+            self.size = 0
+        self.current.append(line)
+        self.size += len(line) + 1
+        self.lines += 1
+
+    def __len__(self):
+        return self.dropped + len(self.pages) + bool(self.current)
+
+    def __getitem__(self, number):
+        """Text of page number, raises IndexError if it was dropped."""
+        index = number - self.dropped
+        if index < 0 or number >= len(self):
+            raise IndexError(number)
+        if index == len(self.pages):
+            return "\n".join(self.current)
+        return self.pages[index]
+
+
+class ShellProcess:
+    """
+    A shell command with stdout and stderr interleaved into
+    OutputPages. run() returns once the process has exited,
+    been killed for a cap, or been stopped with kill().
+    """
+
+    def __init__(
+        self,
+        command,
+        *,
+        max_bytes=MAX_BYTES,
+        max_lines=MAX_LINES,
+        timeout=TIMEOUT,
+        max_size=1800,
+        window=100,
+    ):
+        self.command = command
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.timeout = timeout
+        self.output = OutputPages(max_size, window)
+        self.bytes = 0
+        self.returncode = None
+        self.killed = None  # Reason the process was killed
+        self.done = False
+        self.started = None
+        self._process = None
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._partial = ""
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started if self.started else 0.0
+
+    def feed(self, data, final=False):
+        self.bytes += len(data)
+        lines = (self._partial + self._decoder.decode(data, final)).split("\n")
+        self._partial = lines.pop()
+        if final and self._partial:
+            lines.append(self._partial)
+            self._partial = ""
+        for line in lines:
+            self.output.add_line(line)
+
+    def over_cap(self):
+        if self.bytes > self.max_bytes:
+            return f"output over {self.max_bytes:,} bytes"
+        if self.output.lines > self.max_lines:
+            return f"output over {self.max_lines:,} lines"
+        return None
+
+    def kill(self, reason="stopped"):
+        if self.returncode is not None:
+            return
+        if self.killed is None:
+            self.killed = reason
+        if self._process is None or self._process.returncode is not None:
+            # Reaped, its pid and process group may belong to another process
+            return
+        try:
+            # The shell's children share its session, take them down too
+            if hasattr(os, "killpg"):
+                os.killpg(self._process.pid, signal.SIGKILL)
+            else:
+                self._process.kill()
+        except (ProcessLookupError, PermissionError, AttributeError):
+            pass
+
+    async def _start(self, loop):
+        try:
+            process = await asyncio.create_subprocess_shell(
+                self.command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+            return process, process.stdout.read, process.wait
+        except NotImplementedError:
+            process = subprocess.Popen(
+                self.command,
+                shell=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+
+            async def read(size):
+                return await loop.run_in_executor(None, process.stdout.read1, size)
+
+            async def wait():
+                return await loop.run_in_executor(None, process.wait)
+
+            return process, read, wait
+
+    async def _drain(self, read):
+        # The pipe only reports the exit once what is buffered is read
+        try:
+            while await asyncio.wait_for(read(CHUNK), 5.0):
+                pass
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self, loop=None):
+        loop = loop or asyncio.get_event_loop()
+        self.started = time.monotonic()
+        self._process, read, wait = await self._start(loop)
+        try:
+            while True:
+                remaining = self.timeout - self.elapsed
+                if remaining <= 0:
+                    self.kill(f"ran over {self.timeout:g}s")
+                    break
+                try:
+                    data = await asyncio.wait_for(read(CHUNK), remaining)
+                except asyncio.TimeoutError:
+                    continue
+                if not data:
+                    break
+                self.feed(data)
+                reason = self.over_cap()
+                if reason:
+                    self.kill(reason)
+                    break
+            self.feed(b"", final=True)
+            if self.killed:
+                await self._drain(read)
+            self.returncode = await wait()
+        except asyncio.CancelledError:
+            self.kill()
+            raise
+        finally:
+            self.done = True
+        return self.returncode
+
+    def status(self):
+        if not self.done:
+            return f"Running for {self.elapsed:.0f}s"
+        if self.killed:
+            return f"Killed after {self.elapsed:.1f}s, {self.killed}"
+        return f"Exited with code {self.returncode} after {self.elapsed:.1f}s"
@@ -0,0 +1,252 @@
+"""
+Query tools behind the sql command.
+EXPLAIN ANALYZE output is drawn as a plan tree, queries can be
+timed over several runs, and large results are read through a
+server side cursor one page at a time instead of fetched whole.
+"""
+import json
+import time
+
+from utilities import formatting
+
+CELL_WIDTH = 40  # Longest cell shown in a paged table
+PAGE_SIZE = 1900  # Leaves room for the code block and footer
+MAX_ROWS = 10000  # Most rows a cursor reads unless --limit says otherwise
+
+
+def render_plan(explain):
+    """
+    Plan tree lines from EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON).
+    Each node shows actual against estimated rows, loops and
+    the inclusive time per loop, followed by its conditions and
+    buffer usage.
+    """
+    if isinstance(explain, str):
+        explain = json.loads(explain)
+    result = explain[0]
+    lines = []
+
+    def walk(node, depth):
+        indent = "    " * depth
+        label = node["Node Type"]
+        if "Index Name" in node:
+            label += f" using {node['Index Name']}"
+        if "Relation Name" in node:
+            label += f" on {node['Relation Name']}"
+            if node.get("Alias", node["Relation Name"]) != node["Relation Name"]:
+                label += f" {node['Alias']}"
+        if "Actual Rows" in node:
+            label += (
+                f" (rows={node['Actual Rows']} est={node['Plan Rows']} "
+                f"loops={node['Actual Loops']} time={node['Actual Total Time']:.3f}ms)"
+            )
+        else:
+            label += f" (est={node['Plan Rows']} cost={node['Total Cost']:.2f})"
+        lines.append(indent + ("-> " if depth else "") + label)
+
+        detail = indent + ("   " if depth else "") + "  "
+        for key in ("Index Cond", "Recheck Cond", "Hash Cond", "Merge Cond", "Join Filter", "Filter"):
+            if key in node:
+                lines.append(f"{detail}{key}: {node[key]}")
+        for key in ("Sort Key", "Group Key"):
+            if key in node:
+                lines.append(f"{detail}{key}: {', '.join(node[key])}")
+        removed = node.get("Rows Removed by Filter")
+        if removed:
+            lines.append(f"{detail}Rows Removed by Filter: {removed}")
+        if "Sort Method" in node:
+            lines.append(
+                f"{detail}Sort Method: {node['Sort Method']} "
+                f"{node.get('Sort Space Used', 0)}kB {node.get('Sort Space Type', '')}".rstrip()
+            )
+
+        buffers = []
+        for kind in ("Shared", "Local", "Temp"):
+            counts = [
+                f"{stat.lower()}={node[f'{kind} {stat} Blocks']}"
+                for stat in ("Hit", "Read", "Dirtied", "Written")
+                if node.get(f"{kind} {stat} Blocks")
+            ]
+            if counts:
+                buffers.append(f"{kind.lower()} {' '.join(counts)}")
+        if buffers:
+            lines.append(f"{detail}Buffers: {', '.join(buffers)}")
+
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(result["Plan"], 0)
+    lines.append("")
+    if "Planning Time" in result:
+        lines.append(f"Planning time: {result['Planning Time']:.3f}ms")
+    if "Execution Time" in result:
+        lines.append(f"Execution time: {result['Execution Time']:.3f}ms")
+    return lines
+
+
+async def explain(connection, query):
+    """
+    EXPLAIN ANALYZE output for query. ANALYZE really runs
+    the statement so it is always rolled back afterwards.
+    """
+    transaction = connection.transaction()
+    await transaction.start()
+    try:
+        return await connection.fetchval(
+            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"
+        )
+    finally:
+        await transaction.rollback()
+
+
+async def time_query(connection, query, runs):
+    """
+    Round trip milliseconds of each of runs executions, in
+    one transaction that is rolled back like explain's.
+    """
+    timings = []
+    transaction = connection.transaction()
+    await transaction.start()
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            await connection.fetch(query)
+            timings.append((time.perf_counter() - start) * 1000.0)
+    finally:
+        await transaction.rollback()
+    return timings
+
+
+async def fetch_limited(connection, query, limit):
+    """
+    At most limit rows of query and whether there were more.
+    Reading through a cursor means the rest are never sent.
+    """
+    async with connection.transaction():
+        cursor = await connection.cursor(query)
+        rows = await cursor.fetch(limit + 1)
+    return rows[:limit], len(rows) > limit
+
+
+def render_rows(records, *, width=None):
+    """An rST table of records, cells cut to width if given."""
+
+    def cell(value):
+        value = str(value)
+        if width and len(value) > width:
+            return value[: width - 1] + "…"
+        return value
+
+    table = formatting.TabularData()
+    table.set_columns(list(records[0].keys()))
+    table.add_rows([cell(v) for v in r.values()] for r in records)
+    return table.render()
+
+
+class CursorPages:
+    """
+    Rows of a query read through a server side cursor only as
+    pages are asked for. Holds a pool connection and an open
+    read only transaction until closed, so always close it.
+    """
+
+    def __init__(self, pool, query, *, per_page=15, limit=MAX_ROWS):
+        self.pool = pool
+        self.query = query
+        self.per_page = per_page
+        self.limit = limit
+        self.connection = None
+        self.transaction = None
+        self.cursor = None
+        self.pages = []  # Rendered tables, one per page
+        self.pending = []  # Rows fetched that did not fit their page
+        self.rows = 0
+        self.fetched = 0
+        self.exhausted = False
+        self.error = None
+        self.elapsed = 0.0  # Seconds spent waiting on the server
+
+    async def open(self):
+        self.connection = await self.pool.acquire()
+        try:
+            self.transaction = self.connection.transaction(readonly=True)
+            await self.transaction.start()
+            start = time.perf_counter()
+            self.cursor = await self.connection.cursor(self.query)
+            self.elapsed += time.perf_counter() - start
+        except Exception:
+            await self.close()
+            raise
+
+    async def close(self):
+        if self.connection is None:
+            return
+        try:
+            if self.transaction is not None:
+                await self.transaction.rollback()
+        except Exception:
+            pass  # Broken connections are reset on release anyway
+        finally:
+            await self.pool.release(self.connection)
+            self.connection = self.transaction = self.cursor = None
+
+    @property
+    def limited(self):
+        """Whether the limit stopped reading before the last row."""
+        return self.fetched >= self.limit and not self.exhausted
+
+    @property
+    def done(self):
+        return not self.pending and (self.exhausted or self.fetched >= self.limit)
+
+    @property
+    def max_pages(self):
+        """Page count once every row is read, None before."""
+        if not self.done:
+            return None
+        return len(self.pages) or 1
+
+    async def _fetch(self, count):
+        start = time.perf_counter()
+        try:
+            records = await self.cursor.fetch(count)
+        except Exception as e:
+            # Errors can surface partway through the rows, show them last
+            self.error = f"{type(e).__name__}: {e}"
+            records = []
+        self.elapsed += time.perf_counter() - start
+        self.fetched += len(records)
+        self.exhausted = len(records) < count
+        return records
+
+    async def _read_page(self):
+        records, self.pending = self.pending, []
+        room = self.limit - self.fetched
+        if len(records) < self.per_page and not self.exhausted and room > 0:
+            want = min(self.per_page - len(records), room)
+            # Reaching the limit, one extra row tells whether any were cut
+            extra = want == room
+            fetched = await self._fetch(want + extra)
+            if len(fetched) > want:
+                fetched.pop()
+                self.fetched -= 1
+            records += fetched
+
+        if records:
+            # Push rows onto the next page until this one fits a message
+            render = render_rows(records, width=CELL_WIDTH)
+            while len(render) > PAGE_SIZE and len(records) > 1:
+                self.pending.insert(0, records.pop())
+                render = render_rows(records, width=CELL_WIDTH)
+            self.rows += len(records)
+            self.pages.append(render[:PAGE_SIZE])
+        if self.error and self.done:
+            self.pages.append(self.error)
+
+    async def page(self, number):
+        """Rendered page number, or None past the last row."""
+        while len(self.pages) <= number and not self.done:
+            await self._read_page()
+        if number < len(self.pages):
+            return self.pages[number]
+        return None
@@ -0,0 +1,164 @@
+"""
+Lazy code block pages of a string, file or async iterator.
+Pages are split with the same rules as commands.Paginator but
+only as far as the furthest page asked for. Only the offset each
+page starts at is remembered, a page is rebuilt from its offset
+when shown, and files and iterators are read in chunks just far
+enough ahead to fill it.
+"""
+import asyncio
+import codecs
+import math
+
+CHUNK_SIZE = 64 * 1024
+
+
+class TextPages:
+    """
+    Pages of source, where source is a str, a file object opened
+    in text or binary mode, or an async iterator of str or bytes.
+    Lines too long for a page are wrapped instead of raising
+    like commands.Paginator does.
+    """
+
+    def __init__(self, source, *, prefix="```", suffix="```", max_size=1800):
+        self.prefix = prefix
+        self.suffix = suffix
+        self.max_size = max_size
+        self.width = max_size - len(prefix or "") - len(suffix or "") - 2  # Longest line
+        self.starts = [0]  # Offset into the text each known page starts at
+        self.done = False  # Whether the last page has been found
+        self.size = None  # Total characters, when known up front
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        if isinstance(source, str):
+            self.text = source
+            self.size = len(source)
+            self._read = None
+        else:
+            self.text = ""
+            if hasattr(source, "__aiter__"):
+                self._read = self._iterator_reader(source.__aiter__())
+            else:
+                self._read = self._file_reader(source)
+                self.size = self._file_size(source)
+
+    @staticmethod
+    def _file_size(fp):
+        try:
+            position = fp.tell()
+            end = fp.seek(0, 2)
+            fp.seek(position)
+        except (OSError, ValueError, AttributeError):
+            return None
+        return end - position  # Bytes, close enough for an estimate
+
+    def _decode(self, chunk):
+        if isinstance(chunk, bytes):
+            return self._decoder.decode(chunk)
+        return chunk
+
+    def _file_reader(self, fp):
+        async def read(amount):
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, fp.read, max(amount, CHUNK_SIZE))
+
+        return read
+
+    def _iterator_reader(self, iterator):
+        async def read(amount):
+            try:
+                return await iterator.__anext__()
+            except StopAsyncIteration:
+                return ""
+
+        return read
+
+    async def _fill(self, end):
+        """Reads until the text reaches end or the source runs out."""
+        if self._read is None or len(self.text) >= end:
+            return
+        # Read ahead as much again as is held so appending stays linear
+        target = max(end, 2 * len(self.text))
+        size = len(self.text)
+        chunks = [self.text]
+        while size < target:
+            chunk = await self._read(target - size)
+            if not chunk:
+                chunks.append(self._decoder.decode(b"", final=True))
+                self._read = None
+                break
+            chunk = self._decode(chunk)
+            chunks.append(chunk)
+            size += len(chunk)
+        self.text = "".join(chunks)
+        if self._read is None:
+            self.size = len(self.text)
+
+    def _build(self, start):
+        """Page starting at offset start, and where the next one starts."""
+        text = self.text
+        limit = self.max_size - len(self.suffix or "")
+        count = len(self.prefix) + 1 if self.prefix is not None else 0
+        lines = []
+        position = start
+        while position <= len(text):
+            end = text.find("\n", position)
+            if end == -1:
+                end = len(text)
+            if end - position > self.width:
+                end = position + self.width
+                following = end  # The rest of the line starts the next one
+            else:
+                following = end + 1
+            line = text[position:end]
+            if lines and count + len(line) + 1 > limit:
+                break
+            lines.append(line)
+            count += len(line) + 1
+            position = following
+
+        if not lines:
+            return None, position
+        if self.prefix is not None:
+            lines.insert(0, self.prefix)
+        if self.suffix is not None:
+            lines.append(self.suffix)
+        return "\n".join(lines), position
+
+    async def page(self, number):
+        """Page number, or None past the last page."""
+        while len(self.starts) <= number and not self.done:
+            await self._page_at(len(self.starts) - 1)
+        if number >= len(self.starts):
+            return None
+        return await self._page_at(number)
+
+    async def _page_at(self, index):
+        start = self.starts[index]
+        # A page never consumes more than max_size characters
+        await self._fill(start + self.max_size + 1)
+        content, following = self._build(start)
+        if index == len(self.starts) - 1 and not self.done:
+            if following > len(self.text) and self._read is None:
+                self.done = True
+            else:
+                self.starts.append(following)
+        return content
+
+    @property
+    def pages(self):
+        """Page count once the last page is found, None before."""
+        if not self.done:
+            return None
+        return len(self.starts)
+
+    @property
+    def estimate(self):
+        """Likely page count from the characters paged so far."""
+        if self.done:
+            return len(self.starts)
+        known = len(self.starts) - 1
+        if not self.size or not known:
+            return None
+        per_page = self.starts[-1] / known
+        return max(math.ceil(self.size / per_page), len(self.starts))
@@ -0,0 +1,114 @@
+"""
+Fixed memory per second event counters.
+Each series is a ring of one counter per second over the last
+hour, so bursts stay visible after the lifetime totals smooth them out.
+"""
+import time
+
+from array import array
+
+SPAN = 3600  # Seconds of history kept per series
+
+
+class RateSeries:
+    """Ring buffer of per second counts over the last SPAN seconds."""
+
+    __slots__ = ("counts", "last")
+
+    def __init__(self, now=None):
+        self.counts = array("L", bytes(array("L").itemsize * SPAN))
+        self.last = int(time.time() if now is None else now)
+
+    def _advance(self, second):
+        # Zero the slots for the seconds nothing was recorded in
+        gap = second - self.last
+        if gap <= 0:
+            return
+        if gap >= SPAN:
+            self.counts = array("L", bytes(self.counts.itemsize * SPAN))
+        else:
+            for stamp in range(self.last + 1, second + 1):
+                self.counts[stamp % SPAN] = 0
+        self.last = second
+
+    def add(self, second, amount=1):
+        """Count amount events in the whole second since the epoch."""
+        if second != self.last:
+            self._advance(second)
+        self.counts[second % SPAN] += amount
+
+    def window(self, seconds, now=None):
+        """Counts for the last complete seconds, oldest first."""
+        current = int(time.time() if now is None else now)
+        self._advance(current)
+        seconds = min(seconds, SPAN - 1)
+        return [self.counts[s % SPAN] for s in range(current - seconds, current)]
+
+    def rate(self, seconds=10, now=None):
+        """Mean events per second over the last complete seconds."""
+        counts = self.window(seconds, now)
+        return sum(counts) / len(counts) if counts else 0.0
+
+    def peak(self, now=None):
+        """Busiest complete second within the last hour."""
+        return max(self.window(SPAN, now), default=0)
+
+
+class SocketRates:
+    """
+    RateSeries per gateway event type, kept on the
+    bot so they survive cog reloads. Totals across every
+    event type are summed from the series when queried
+    so recording only touches one series.
+    """
+
+    def __init__(self):
+        self.events = {}  # event type -> RateSeries
+
+    def record(self, event_type):
+        # Inlined RateSeries.add, this runs for every gateway event
+        second = int(time.time())
+        series = self.events.get(event_type)
+        if series is None:
+            series = self.events[event_type] = RateSeries(second)
+        if second != series.last:
+            series._advance(second)
+        series.counts[second % SPAN] += 1
+
+    def total(self, seconds=SPAN, now=None):
+        """Summed counts across every event type, oldest first."""
+        now = time.time() if now is None else now
+        windows = [series.window(seconds, now) for series in self.events.values()]
+        if not windows:
+            return [0] * min(seconds, SPAN - 1)
+        return [sum(counts) for counts in zip(*windows)]
+
+    def total_rate(self, seconds=10):
+        counts = self.total(seconds)
+        return sum(counts) / len(counts) if counts else 0.0
+
+    def total_peak(self):
+        return max(self.total(), default=0)
+
+    def rates(self, seconds=10):
+        """{event type: (current rate, peak)} sorted busiest first."""
+        now = time.time()
+        rates = {
+            event_type: (series.rate(seconds, now), series.peak(now))
+            for event_type, series in self.events.items()
+        }
+        return dict(sorted(rates.items(), key=lambda item: item[1], reverse=True))
+
+    def to_csv(self):
+        """Per second counts for the last hour, one column per event type."""
+        now = time.time()
+        start = int(now) - (SPAN - 1)
+        names = sorted(self.events)
+        columns = [self.events[name].window(SPAN, now) for name in names]
+        totals = self.total(SPAN, now)
+        lines = [",".join(["timestamp", "total"] + names)]
+        for offset, total in enumerate(totals):
+            row = [str(start + offset), str(total)]
+            row.extend(str(column[offset]) for column in columns)
+            lines.append(",".join(row))
+        return "\n".join(lines)
@@ -1,6 +1,5 @@
 import asyncio
 import calendar
-import difflib
 import json
 import re
 import time
@@ -17,6 +16,8 @@ import timeago as timesince
 
 from discord.iterators import HistoryIterator
 
+from utilities import fuzzy
+
 
 # Some funcs and ideas from corpbot.py and discord_bot.py
 
@@ -196,24 +197,15 @@ def write_json(file_path, data):
         json.dump(data, fp, indent=2)
 
 
-def disambiguate(term, list_to_search, key: str = None, limit: int = 3):
-    """Searches the provided list for the searchTerm - using a keyName if provided for dicts."""
-    if len(list_to_search) < 1:
+def disambiguate(term, index, limit: int = 3, within=None):
+    """
+    Searches a kept fuzzy.FuzzyIndex for term, only among the
+    idents in within if provided. Build the index once and keep it
+    current rather than indexing a list for every search.
+    """
+    if len(index) < 1:
         return None
-    # Iterate through the list and create a list of items
-    findings = []
-    for item in list_to_search:
-        if key:
-            name = item[key]
-        else:
-            name = item
-        match_ratio = difflib.SequenceMatcher(None, term.lower(), name.lower()).ratio()
-        findings.append({"result": item, "ratio": match_ratio})
-    # sort the servers by population
-    findings = sorted(findings, key=lambda x: x["ratio"], reverse=True)
-    if limit > len(findings):
-        limit = len(findings)
-    return findings[:limit]
+    return index.search(term, limit, within=within)
 
 
 def getClockForTime(time_string):
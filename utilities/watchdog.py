@@ -0,0 +1,99 @@
+"""
+Event loop lag watchdog.
+A coroutine on the loop stamps a heartbeat every interval.
+A side thread checks the stamp and, whenever the loop has been
+stuck for longer than the threshold, samples the loop thread's
+stack so the blocking code can be attributed by location.
+"""
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+import traceback
+
+ROOT = os.getcwd()
+
+
+class LoopWatchdog:
+    """
+    Measures scheduling lag into bot.latencies under "loop"
+    and aggregates blocking stack samples by code location.
+    """
+
+    def __init__(self, bot, interval=0.1, threshold=0.1):
+        self.bot = bot
+        self.interval = interval
+        self.threshold = threshold
+        self.beat = time.perf_counter()
+        self.loop_thread = None
+        self.blocked = collections.Counter()  # (file, line, function) -> samples
+        self.stacks = {}  # (file, line, function) -> last formatted stack
+        self.stalls = 0  # Times the loop went over the threshold
+        self._task = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        if self._task is not None:
+            return
+        self.loop_thread = threading.get_ident()
+        self.beat = time.perf_counter()
+        self._task = self.bot.loop.create_task(self.heartbeat())
+        self._thread = threading.Thread(
+            target=self.watch, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def reset(self):
+        self.blocked.clear()
+        self.stacks.clear()
+        self.stalls = 0
+
+    async def heartbeat(self):
+        while True:
+            start = time.perf_counter()
+            self.beat = start
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - start - self.interval
+            self.bot.latencies.record("loop", max(lag, 0))
+
+    def watch(self):
+        # Sample at a fraction of the threshold so short stalls are still caught
+        period = self.threshold / 2
+        stalled = False
+        while not self._stopped.wait(period):
+            late = time.perf_counter() - self.beat - self.interval
+            if late < self.threshold:
+                stalled = False
+                continue
+            if not stalled:
+                self.stalls += 1
+                stalled = True
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is not None:
+                self.record(traceback.extract_stack(frame))
+
+    def record(self, stack):
+        # Blame the innermost frame in our own code, library
+        # frames only say where the loop was when it blocked.
+        blamed = stack[-1]
+        for entry in reversed(stack):
+            filename = os.path.abspath(entry.filename)
+            if filename.startswith(ROOT) and "site-packages" not in filename:
+                blamed = entry
+                break
+        location = (os.path.relpath(blamed.filename, ROOT), blamed.lineno, blamed.name)
+        self.blocked[location] += 1
+        self.stacks[location] = "".join(traceback.format_list(stack[-8:]))
+
+    def blocked_seconds(self, location):
+        """Rough time spent blocked at a location."""
+        return self.blocked[location] * self.threshold / 2